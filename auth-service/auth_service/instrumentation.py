@@ -0,0 +1,78 @@
+"""
+Instrumentación de rendimiento por petición.
+
+``PerformanceMiddleware`` mide el tiempo total de todas las peticiones y lo
+acumula en un histograma de latencias por vista (``/metrics``). En las
+peticiones muestreadas (``PERFORMANCE_INSTRUMENTATION['SAMPLE_RATE']``)
+desglosa además:
+
+- SQL: número de consultas y tiempo, con ``connection.execute_wrapper``.
+- Redis: llamadas, tiempo y aciertos/fallos de GET/MGET, con el cliente
+  ``InstrumentedRedis`` (``OPTIONS['REDIS_CLIENT_CLASS']`` de cada caché).
+- Serialización: los bloques ``timed_serialization`` de las vistas
+  (``users.views.serialize_user``).
+- Hash de contraseñas: tiempo esperando al pool de ``users.hashing``.
+
+La parte común con blog-service (métricas base, wrappers de SQL y Redis,
+histogramas y log) está en ``service_core.instrumentation``; aquí solo el
+tiempo de hash y los rechazos, que son de auth.
+
+El desglose se devuelve en la cabecera ``Server-Timing`` y en una línea de
+log ``key=value`` del logger ``performance``. Las peticiones no muestreadas
+no instalan ningún wrapper.
+
+Las peticiones rechazadas para proteger la CPU (límites de intentos y pool
+de hashing lleno) se cuentan siempre en ``rejections``, también en
+``/metrics``.
+"""
+import threading
+from service_core import instrumentation as base
+from service_core.instrumentation import (  # noqa: F401 (el servicio los importa desde aquí)
+    InstrumentedRedis, current_metrics, get_view_name, histograms, instrumentation_settings, log_request,
+    timed, timed_serialization,
+)
+
+
+class RequestMetrics(base.RequestMetrics):
+    """Contadores de una petición muestreada, más el tiempo de hash de contraseñas."""
+
+    __slots__ = ('hash_ms',)
+
+    def __init__(self):
+        super().__init__()
+        self.hash_ms = 0.0
+
+    def timing_entries(self):
+        return [*super().timing_entries(), f'hash;dur={self.hash_ms:.2f}']
+
+    def log_fields(self):
+        return {**super().log_fields(), 'hash_ms': round(self.hash_ms, 2)}
+
+
+def timed_hashing():
+    """Suma al tiempo de hash de contraseñas de la petición lo que tarde el bloque."""
+    return timed('hash_ms')
+
+
+def sample_request():
+    """``service_core.instrumentation.sample_request`` con el ``RequestMetrics`` de auth."""
+    return base.sample_request(RequestMetrics)
+
+
+class RejectionCounters:
+    """Peticiones rechazadas por motivo, acumuladas en memoria del proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, reason):
+        with self._lock:
+            self._counts[reason] = self._counts.get(reason, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(sorted(self._counts.items()))
+
+
+rejections = RejectionCounters()
@@ -0,0 +1,48 @@
+import random
+import time
+from django.core.exceptions import MiddlewareNotUsed
+from .instrumentation import (
+    get_view_name, histograms, instrumentation_settings, log_request, sample_request,
+)
+
+
+class PerformanceMiddleware:
+    """
+    Mide cada petición (ver ``auth_service.instrumentation``): tiempo total en
+    el histograma de su vista y, en las muestreadas, desglose de SQL, Redis y
+    serialización en la cabecera ``Server-Timing`` y en el log.
+
+    Va la primera en ``MIDDLEWARE`` para que el total incluya el resto.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = instrumentation_settings()
+        if not self.options['ENABLED']:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        if random.random() >= self.options['SAMPLE_RATE']:
+            response = self.get_response(request)
+            histograms.observe(get_view_name(request), (time.perf_counter() - started) * 1000)
+            return response
+
+        with sample_request() as metrics:
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        view = get_view_name(request)
+        histograms.observe(view, total_ms)
+
+        if self.options['SERVER_TIMING']:
+            response['Server-Timing'] = metrics.server_timing(total_ms)
+        if self.options['LOG']:
+            fields = {
+                'view': view,
+                'method': request.method,
+                'status': response.status_code,
+                'total_ms': round(total_ms, 2),
+                **metrics.log_fields(),
+            }
+            log_request(fields)
+        return response
@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'auth_service.middleware.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -62,14 +63,25 @@ TEMPLATES = [
 WSGI_APPLICATION = 'auth_service.wsgi.application'
 
 # Database
+# Conexiones persistentes (CONN_MAX_AGE) con health check al reutilizarlas.
+# Con DB_POOL=1 las conexiones salen de un pool en el proceso de tamaño
+# DB_POOL_MAX_SIZE por worker (service_core.db.backends.postgresql_pool).
+DB_POOL = os.getenv('DB_POOL', '0') == '1'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'service_core.db.backends.postgresql_pool' if DB_POOL else 'django.db.backends.postgresql',
         'NAME': os.getenv('DB_NAME', 'main_db'),
         'USER': os.getenv('DB_USER', 'devuser'),
         'PASSWORD': os.getenv('DB_PASS', 'devpass'),
         'HOST': os.getenv('DB_HOST', 'postgres'),
         'PORT': '5432',
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', '4')),
+            'TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+        },
     }
 }
 
@@ -107,12 +119,43 @@ AUTH_USER_MODEL = 'users.User'
 
 # Django REST Framework
 REST_FRAMEWORK = {
+    # JWT con request.user sin consultas (users.identity)
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Proxies delante del servicio: la IP del cliente para los límites de
+    # intentos sale de X-Forwarded-For solo si hay alguno (0 = REMOTE_ADDR)
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
+}
+
+# Hash de contraseñas en un pool de procesos por worker (users.hashing):
+# WORKERS procesos, como mucho MAX_PENDING hashes en cola o en curso (el
+# resto, 503) y TIMEOUT segundos por hash. MAX_PENDING debe ser menor que
+# los hilos de gunicorn (--threads): cada hash pendiente ocupa un hilo y los
+# que sobran atienden /api/me/ y el refresh
+PASSWORD_HASHING = {
+    'WORKERS': int(os.getenv('PASSWORD_HASHING_WORKERS', '1')),
+    'MAX_PENDING': int(os.getenv('PASSWORD_HASHING_MAX_PENDING', '2')),
+    'TIMEOUT': float(os.getenv('PASSWORD_HASHING_TIMEOUT', '5')),
+    'RETRY_AFTER': 1,
+}
+
+# Identidad de request.user sin consultas (users.identity): caché por
+# versión del usuario durante CACHE_TIMEOUT segundos y, con
+# JWT_PROFILE_CLAIMS=1, el perfil dentro de los tokens
+USER_IDENTITY = {
+    'CACHE_TIMEOUT': int(os.getenv('USER_IDENTITY_CACHE_TIMEOUT', '3600')),
+    'PROFILE_CLAIMS': os.getenv('JWT_PROFILE_CLAIMS', '0') == '1',
+}
+
+# Límites de intentos de login, /api/token/ y registro (users.throttling),
+# en formato "intentos/periodo" de DRF; vacío = sin límite
+AUTH_THROTTLE_RATES = {
+    'ip': os.getenv('AUTH_THROTTLE_IP_RATE', '60/min') or None,
+    'email': os.getenv('AUTH_THROTTLE_EMAIL_RATE', '10/min') or None,
 }
 
 # JWT Settings
@@ -123,7 +166,8 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': 'HS256',
-    'SIGNING_KEY': SECRET_KEY,
+    # Compartida con blog-service, que valida los tokens localmente
+    'SIGNING_KEY': os.getenv('JWT_SIGNING_KEY', SECRET_KEY),
     'VERIFYING_KEY': None,
     'AUDIENCE': None,
     'ISSUER': None,
@@ -134,13 +178,16 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
     'USER_AUTHENTICATION_RULE': 'rest_framework_simplejwt.authentication.default_user_authentication_rule',
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    # Tokens y serializers con la blacklist en Redis (users.blacklist)
+    'AUTH_TOKEN_CLASSES': ('users.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
     'JTI_CLAIM': 'jti',
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.TokenRefreshSerializer',
 }
 
 # CORS settings
@@ -154,16 +201,79 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 # Cache configuration with Redis
+# - REDIS_HOST (noeviction, persistente): sesiones y blacklist de JWT, que
+#   comparte con blog-service y no se puede perder por falta de memoria.
+# - REDIS_CACHE_HOST (allkeys-lru): caché de datos, expulsable.
+# Sin REDIS_CACHE_HOST todo va a la misma instancia, en bases de datos distintas.
+REDIS_URL = f"redis://{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', '6379')}"
+REDIS_CACHE_URL = (
+    f"redis://{os.getenv('REDIS_CACHE_HOST', os.getenv('REDIS_HOST', 'redis'))}"
+    f":{os.getenv('REDIS_CACHE_PORT', os.getenv('REDIS_PORT', '6379'))}"
+)
+
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
-        'LOCATION': f"redis://{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', '6379')}/1",
+        'LOCATION': f"{REDIS_CACHE_URL}/3",
+        'KEY_PREFIX': 'auth:data',
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'REDIS_CLIENT_CLASS': 'auth_service.instrumentation.InstrumentedRedis',
         }
-    }
+    },
+    'sessions': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': f"{REDIS_URL}/0",
+        'KEY_PREFIX': 'auth:sessions',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'REDIS_CLIENT_CLASS': 'auth_service.instrumentation.InstrumentedRedis',
+        }
+    },
+    # Estado que no debe expulsarse; se usa con get_redis_connection('durable')
+    'durable': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': f"{REDIS_URL}/0",
+        'KEY_PREFIX': 'auth',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'REDIS_CLIENT_CLASS': 'auth_service.instrumentation.InstrumentedRedis',
+        }
+    },
+}
+
+# Instrumentación por petición (auth_service.instrumentation): el total de
+# todas las peticiones va al histograma de /metrics; el desglose
+# (Server-Timing y log) solo en la fracción PERF_SAMPLE_RATE
+PERFORMANCE_INSTRUMENTATION = {
+    'ENABLED': os.getenv('PERF_INSTRUMENTATION', '1') == '1',
+    'SAMPLE_RATE': float(os.getenv('PERF_SAMPLE_RATE', '1' if DEBUG else '0.05')),
 }
 
 # Session configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
-SESSION_CACHE_ALIAS = 'default'
\ No newline at end of file
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Logging configuration
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            'format': '{"time": "%(asctime)s", "level": "%(levelname)s", "message": "%(message)s", "path": "%(pathname)s", "line": %(lineno)d}',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
\ No newline at end of file
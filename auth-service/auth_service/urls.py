@@ -16,8 +16,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from .views import healthz, metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('healthz', healthz, name='healthz'),
+    path('metrics', metrics, name='metrics'),
     path('api/', include('users.urls')),
 ]
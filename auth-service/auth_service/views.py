@@ -0,0 +1,89 @@
+import logging
+from django.http import JsonResponse
+from django.db import connection
+from django_redis import get_redis_connection
+from users.hashing import pool as hashing_pool
+from .instrumentation import histograms, instrumentation_settings, rejections
+
+logger = logging.getLogger(__name__)
+
+# Check de healthz -> alias de caché cuya instancia de Redis se comprueba
+REDIS_CHECKS = {
+    'redis': 'durable',
+    'redis_cache': 'default',
+}
+
+
+def get_connection_stats():
+    """
+    Estado de las conexiones a PostgreSQL del proceso: estadísticas del pool
+    si se usa ``service_core.db.backends.postgresql_pool`` o, si no, la
+    configuración de conexiones persistentes.
+    """
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        return {'pooled': True, **pool.stats()}
+    return {
+        'pooled': False,
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+        'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+    }
+
+
+def healthz(request):
+    """
+    Endpoint de healthcheck que verifica:
+    - Conexión a PostgreSQL
+    - Conexión a Redis (instancia persistente y de caché)
+
+    Incluye además las estadísticas de conexiones a la base de datos.
+    """
+    status_code = 200
+    health_status = {
+        'status': 'healthy',
+        'checks': {}
+    }
+
+    # Verificar PostgreSQL
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            health_status['checks']['database'] = 'ok'
+    except Exception as e:
+        logger.error(f"Database check failed: {e}")
+        health_status['checks']['database'] = 'error'
+        status_code = 503
+
+    # Verificar Redis: la instancia persistente y la de caché
+    for check, alias in REDIS_CHECKS.items():
+        try:
+            redis_conn = get_redis_connection(alias)
+            redis_conn.ping()
+            health_status['checks'][check] = 'ok'
+        except Exception as e:
+            logger.error(f"Redis check failed for {alias}: {e}")
+            health_status['checks'][check] = 'error'
+            status_code = 503
+
+    health_status['database_connections'] = get_connection_stats()
+
+    if 'error' in [v for v in health_status['checks'].values()]:
+        health_status['status'] = 'unhealthy'
+
+    return JsonResponse(health_status, status=status_code)
+
+
+def metrics(request):
+    """
+    Histogramas de latencia por vista del proceso que responde (cada worker
+    lleva los suyos), con percentiles aproximados por bucket, más el estado
+    del pool de hashing y las peticiones rechazadas para proteger la CPU.
+    """
+    options = instrumentation_settings()
+    return JsonResponse({
+        'enabled': options['ENABLED'],
+        'sample_rate': options['SAMPLE_RATE'],
+        'views': histograms.snapshot(),
+        'password_hashing': hashing_pool.stats(),
+        'rejections': rejections.snapshot(),
+    })
@@ -3,6 +3,10 @@
 import os
 import sys
 
+# Código común a los servicios (shared/service_core); en Docker, /shared
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(os.path.dirname(BASE_DIR), 'shared'))
+
 
 def main():
     """Run administrative tasks."""
@@ -0,0 +1,34 @@
+"""
+``JWTAuthentication`` de simplejwt sin la consulta del usuario en cada
+petición: ``request.user`` sale de ``users.identity`` (claims del token o
+caché de identidad por versión del usuario).
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from . import identity
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Compara con el hash de la contraseña, que no está en la identidad
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = identity.get_user(
+            user_id,
+            validated_token.get(identity.VERSION_CLAIM),
+            validated_token.get(identity.PROFILE_CLAIM),
+        )
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
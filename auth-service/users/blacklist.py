@@ -0,0 +1,55 @@
+"""
+Blacklist de tokens JWT en Redis.
+
+Cada ``jti`` revocado se guarda como una clave ``jwt:blacklist:<jti>`` con
+TTL igual a la vida que le queda al token, así que Redis la borra sola cuando
+el token ya no sería válido de todos modos. blog-service consulta las mismas
+claves para rechazar los access tokens revocados.
+"""
+import logging
+import time
+
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+BLACKLIST_KEY = 'jwt:blacklist:{jti}'
+
+
+class BlacklistUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'No se pudo revocar el token, inténtalo de nuevo en unos segundos.'
+    default_code = 'blacklist_unavailable'
+
+
+def _get_redis():
+    return get_redis_connection('durable')
+
+
+def blacklist_jti(jti, exp):
+    """Revoca el ``jti`` hasta ``exp`` (epoch en segundos) con un único SET ... EX."""
+    ttl = int(exp - time.time())
+    if ttl > 0:
+        try:
+            _get_redis().set(BLACKLIST_KEY.format(jti=jti), 1, ex=ttl)
+        except RedisError as e:
+            # Sin Redis el token no se puede revocar: 503, no un logout aparente
+            logger.error(f"Token blacklist unavailable: {e}")
+            raise BlacklistUnavailable()
+
+
+def is_blacklisted(jti):
+    """
+    True si el ``jti`` está revocado.
+
+    Si Redis no responde se deja pasar el token, que ya está validado por
+    firma y expiración, y se registra el fallo.
+    """
+    try:
+        return bool(_get_redis().exists(BLACKLIST_KEY.format(jti=jti)))
+    except Exception as e:
+        logger.warning(f"Token blacklist unavailable: {e}")
+        return False
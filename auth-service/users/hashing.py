@@ -0,0 +1,183 @@
+"""
+Hash y verificación de contraseñas en un pool de procesos.
+
+PBKDF2 ocupa un núcleo durante cientos de ms por intento. Calculado en el
+hilo del worker, una ráfaga de logins deja a todos los workers hasheando y
+sin atender ``/api/me/`` ni el refresh. Con ``User.set_password`` y
+``User.check_password`` pasando por aquí:
+
+- El hash corre en ``PASSWORD_HASHING['WORKERS']`` procesos por worker de
+  gunicorn: es todo el CPU que puede gastar la autenticación.
+- El hilo del worker espera el resultado sin el GIL, así que el resto de
+  peticiones siguen atendiéndose.
+- Con ``MAX_PENDING`` hashes en cola o en curso en el worker, los siguientes
+  se rechazan con 503 y ``Retry-After`` en lugar de ocupar más hilos; igual
+  si un hash tarda más de ``TIMEOUT`` segundos.
+
+Los límites de intentos de ``users.throttling`` se aplican antes, en la
+vista, y no llegan a pedir ningún hash.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from auth_service.instrumentation import rejections, timed_hashing
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'WORKERS': 1,
+    'MAX_PENDING': 2,
+    'TIMEOUT': 5,
+    'RETRY_AFTER': 1,
+}
+
+
+def hashing_settings():
+    return {**DEFAULTS, **getattr(settings, 'PASSWORD_HASHING', {})}
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'El servicio de autenticación está saturado, inténtalo de nuevo en unos segundos.'
+    default_code = 'hashing_unavailable'
+
+    def __init__(self, wait):
+        super().__init__()
+        # DRF lo devuelve como Retry-After
+        self.wait = wait
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _make_password(password):
+    return hashers.make_password(password)
+
+
+def _verify_password(password, encoded):
+    return hashers.verify_password(password, encoded)
+
+
+class HashingPool:
+    """
+    ``ProcessPoolExecutor`` del worker con un límite de hashes pendientes.
+    Con ``WORKERS = 0`` hashea en el propio hilo (solo para desarrollo), pero
+    mantiene el límite.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.pending = 0
+        self.completed = 0
+
+    def get_executor(self, options):
+        # Uno por proceso: el de un proceso padre no sirve tras un fork
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                # spawn: hacer fork de un worker con hilos puede dejar locks tomados
+                self._executor = ProcessPoolExecutor(
+                    max_workers=options['WORKERS'],
+                    mp_context=get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(os.environ['DJANGO_SETTINGS_MODULE'],),
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, func, *args):
+        options = hashing_settings()
+        with self._lock:
+            if self.pending >= options['MAX_PENDING']:
+                rejections.record('hashing_overloaded')
+                raise HashingUnavailable(options['RETRY_AFTER'])
+            self.pending += 1
+
+        with timed_hashing():
+            result = self.execute(options, func, *args)
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def release(self, future=None):
+        """
+        Un hash menos pendiente. En el pool, cuando termina el proceso hijo y
+        no cuando se deja de esperar: uno que superó ``TIMEOUT`` sigue
+        ocupando el proceso y contando para ``MAX_PENDING``.
+        """
+        with self._lock:
+            self.pending -= 1
+
+    def execute(self, options, func, *args):
+        if not options['WORKERS']:
+            try:
+                return func(*args)
+            finally:
+                self.release()
+        executor = self.get_executor(options)
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            self.release()
+            self.broken(options, executor)
+        future.add_done_callback(self.release)
+        try:
+            return future.result(timeout=options['TIMEOUT'])
+        except TimeoutError:
+            # Solo surte efecto si aún no había empezado
+            future.cancel()
+            rejections.record('hashing_timeout')
+            raise HashingUnavailable(options['RETRY_AFTER'])
+        except BrokenProcessPool:
+            self.broken(options, executor)
+
+    def broken(self, options, executor):
+        logger.error("Password hashing pool broken, recreating it")
+        self.reset(executor)
+        rejections.record('hashing_unavailable')
+        raise HashingUnavailable(options['RETRY_AFTER'])
+
+    def stats(self):
+        options = hashing_settings()
+        with self._lock:
+            return {
+                'workers': options['WORKERS'],
+                'max_pending': options['MAX_PENDING'],
+                'pending': self.pending,
+                'completed': self.completed,
+            }
+
+
+pool = HashingPool()
+
+
+def make_password(password):
+    """``django.contrib.auth.hashers.make_password`` en el pool."""
+    if password is None:
+        # Contraseña inutilizable: no hay hash que calcular
+        return hashers.make_password(None)
+    return pool.run(_make_password, password)
+
+
+def verify_password(password, encoded):
+    """``django.contrib.auth.hashers.verify_password`` en el pool: ``(es_correcta, hay_que_rehashear)``."""
+    if password is None or not hashers.is_password_usable(encoded):
+        return False, False
+    return pool.run(_verify_password, password, encoded)
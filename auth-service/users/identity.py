@@ -0,0 +1,142 @@
+"""
+Identidad de los usuarios autenticados sin consultar la base de datos.
+
+``users.authentication.JWTAuthentication`` construye ``request.user`` con los
+campos de ``IDENTITY_FIELDS`` sacados de:
+
+- los claims del access token, con ``USER_IDENTITY['PROFILE_CLAIMS']``: el
+  login guarda en el token el perfil del usuario;
+- o la caché de identidad, ``user:<id>:identity:v<versión>``, que el login
+  deja escrita.
+
+Cada usuario tiene una versión (``user:<id>:version``, la hora en ms en que
+se creó, como las versiones de blog-service) que se borra al guardarlo o
+borrarlo (``users.signals``). El token lleva la versión con la que se emitió:
+si sigue siendo la vigente, el token o la entrada de caché valen y la
+petición cuesta una lectura de Redis y ninguna consulta; si no (usuario
+editado o desactivado), se relee de la base de datos.
+"""
+import logging
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.dateparse import parse_datetime
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'user:{user_id}:version'
+IDENTITY_KEY = 'user:{user_id}:identity:v{version}'
+
+VERSION_CLAIM = 'ver'
+PROFILE_CLAIM = 'profile'
+
+# Los campos de UserSerializer más is_admin; el resto (la contraseña) se
+# carga de la base de datos si algo accede a ellos
+IDENTITY_FIELDS = ('id', 'email', 'first_name', 'last_name', 'is_active', 'is_admin', 'date_joined', 'last_login')
+DATETIME_FIELDS = ('date_joined', 'last_login')
+
+DEFAULTS = {
+    'CACHE_TIMEOUT': 60 * 60,
+    'PROFILE_CLAIMS': False,
+}
+
+
+def identity_settings():
+    return {**DEFAULTS, **getattr(settings, 'USER_IDENTITY', {})}
+
+
+def get_version(user_id):
+    """Versión vigente del usuario; si no existe (o Redis la expulsó) se crea una nueva."""
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(key, version, None):
+            version = cache.get(key) or version
+    return version
+
+
+def invalidate(user_id):
+    """Los tokens y entradas de caché emitidos con la versión actual dejan de valer."""
+    cache.delete(VERSION_KEY.format(user_id=user_id))
+
+
+def get_identity(user):
+    return {field: getattr(user, field) for field in IDENTITY_FIELDS}
+
+
+def build_user(identity):
+    """``User`` con los campos de ``identity`` cargados, como si viniera de la base de datos."""
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in identity]
+    return User.from_db(DEFAULT_DB_ALIAS, fields, [identity[field] for field in fields])
+
+
+def token_claims(user):
+    """
+    Claims para el refresh token de ``user`` (y el access token que se
+    deriva de él). Deja además su identidad en caché: la primera petición
+    autenticada tampoco consulta la base de datos.
+    """
+    options = identity_settings()
+    identity = get_identity(user)
+    try:
+        version = get_version(user.pk)
+        cache.set(IDENTITY_KEY.format(user_id=user.pk, version=version), identity, options['CACHE_TIMEOUT'])
+    except Exception as e:
+        # Sin versión el token sigue valiendo: cada petición lee el usuario
+        logger.warning(f"User identity cache unavailable: {e}")
+        return {}
+
+    claims = {VERSION_CLAIM: version}
+    if options['PROFILE_CLAIMS']:
+        claims[PROFILE_CLAIM] = {
+            field: value.isoformat() if field in DATETIME_FIELDS and value else value
+            for field, value in identity.items() if field != 'id'
+        }
+    return claims
+
+
+def user_from_claims(user_id, profile):
+    identity = {'id': user_id, **profile}
+    for field in DATETIME_FIELDS:
+        if identity.get(field):
+            identity[field] = parse_datetime(identity[field])
+    return build_user(identity)
+
+
+def load_identity(user_id):
+    return User.objects.filter(pk=user_id).values(*IDENTITY_FIELDS).first()
+
+
+def get_user(user_id, token_version=None, profile=None):
+    """
+    Usuario ``user_id`` para un token emitido con ``token_version`` (y
+    ``profile`` si lleva el perfil), o ``None`` si no existe. La versión y,
+    sin perfil en el token, la entrada de caché se leen en un solo MGET.
+    """
+    version_key = VERSION_KEY.format(user_id=user_id)
+    identity_key = IDENTITY_KEY.format(user_id=user_id, version=token_version)
+    try:
+        keys = [version_key] if profile is not None else [version_key, identity_key]
+        cached = cache.get_many(keys)
+        version = cached.get(version_key) or get_version(user_id)
+        if version == token_version:
+            if profile is not None:
+                return user_from_claims(user_id, profile)
+            identity = cached.get(identity_key)
+        else:
+            identity_key = IDENTITY_KEY.format(user_id=user_id, version=version)
+            identity = cache.get(identity_key)
+    except Exception as e:
+        logger.warning(f"User identity cache unavailable: {e}")
+        identity = load_identity(user_id)
+        return build_user(identity) if identity else None
+
+    if identity is None:
+        identity = load_identity(user_id)
+        if identity is None:
+            return None
+        cache.set(identity_key, identity, identity_settings()['CACHE_TIMEOUT'])
+    return build_user(identity)
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+OUTSTANDING_TABLE = 'token_blacklist_outstandingtoken'
+BLACKLISTED_TABLE = 'token_blacklist_blacklistedtoken'
+
+
+class Command(BaseCommand):
+    help = 'Delete rows from the legacy token_blacklist tables in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows deleted per statement (default: 5000)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Also delete tokens that have not expired yet (the blacklist now lives in Redis)',
+        )
+
+    def handle(self, *args, **options):
+        tables = set(connection.introspection.table_names())
+        if OUTSTANDING_TABLE not in tables:
+            self.stdout.write('Legacy token_blacklist tables not found, nothing to prune')
+            return
+
+        outstanding = connection.ops.quote_name(OUTSTANDING_TABLE)
+        if options['all']:
+            expired, params = 'TRUE', []
+        else:
+            expired, params = 'expires_at < %s', [timezone.now()]
+
+        # Primero los blacklisted, que tienen FK a los outstanding
+        deleted_blacklisted = 0
+        if BLACKLISTED_TABLE in tables:
+            deleted_blacklisted = self.delete_in_batches(
+                BLACKLISTED_TABLE,
+                f"token_id IN (SELECT id FROM {outstanding} WHERE {expired})",
+                params,
+                options['batch_size'],
+            )
+        deleted_outstanding = self.delete_in_batches(
+            OUTSTANDING_TABLE, expired, params, options['batch_size'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted_blacklisted} blacklisted and {deleted_outstanding} outstanding tokens'
+        ))
+
+    def delete_in_batches(self, table, condition, params, batch_size):
+        """
+        Borra las filas que cumplen ``condition`` en sentencias de como mucho
+        ``batch_size`` filas, cada una en su propia transacción, para no
+        mantener bloqueos largos ni generar un único WAL enorme.
+        """
+        quoted = connection.ops.quote_name(table)
+        sql = (
+            f"DELETE FROM {quoted} WHERE id IN "
+            f"(SELECT id FROM {quoted} WHERE {condition} LIMIT %s)"
+        )
+        total = 0
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(sql, [*params, batch_size])
+                deleted = cursor.rowcount
+            total += deleted
+            if deleted:
+                self.stdout.write(f'{table}: {total} rows deleted')
+            if deleted < batch_size:
+                return total
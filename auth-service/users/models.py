@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.db import models
+from . import hashing
 
 
 class UserManager(BaseUserManager):
@@ -39,6 +40,21 @@ class User(AbstractBaseUser):
     def __str__(self):
         return self.email
 
+    # Los hashes se calculan en el pool de procesos de users.hashing, fuera
+    # del hilo del worker (registro, login, /api/token/ y admin)
+    def set_password(self, raw_password):
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        is_correct, must_update = hashing.verify_password(raw_password, self.password)
+        if is_correct and must_update:
+            self.set_password(raw_password)
+            # Actualizar el hash no es un cambio de contraseña
+            self._password = None
+            self.save(update_fields=['password'])
+        return is_correct
+
     def has_perm(self, perm, obj=None):
         return True
 
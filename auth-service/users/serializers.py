@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from rest_framework_simplejwt import serializers as jwt_serializers
 from .models import User
+from .tokens import RefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -47,3 +49,13 @@ class LoginSerializer(serializers.Serializer):
             return attrs
         else:
             raise serializers.ValidationError('Debe incluir email y contraseña')
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    # Con BLACKLIST_AFTER_ROTATION la rotación revoca el refresh usado con
+    # un SETEX en Redis en vez de insertar filas en Postgres
+    token_class = RefreshToken
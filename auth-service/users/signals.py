@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from . import identity
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_identity(sender, instance, **kwargs):
+    """Invalida la identidad cacheada y los tokens emitidos con la versión actual."""
+    user_id = instance.pk
+    transaction.on_commit(lambda: identity.invalidate(user_id))
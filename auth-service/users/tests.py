@@ -1,3 +1,236 @@
-from django.test import TestCase
+"""
+Presupuestos de consultas SQL de los endpoints de autenticación, y límites
+de intentos y del pool de hashing.
 
-# Create your tests here.
+Login, refresh y /api/me/ se llaman en cada sesión de cada cliente: una
+consulta de más aquí se multiplica por todo el tráfico.
+
+    docker exec -it auth_service python manage.py test users
+"""
+import re
+import time
+from unittest import mock
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from redis.exceptions import ConnectionError as RedisConnectionError
+from auth_service.instrumentation import rejections
+from .hashing import HashingUnavailable, pool
+from .models import User
+
+# Base de datos de Redis solo para tests (blacklist de tokens)
+TEST_REDIS_DB = 15
+
+
+def isolated_caches():
+    """Las cachés del servicio, todas en ``TEST_REDIS_DB`` y con prefijo propio."""
+    return {
+        alias: {
+            **conf,
+            'LOCATION': re.sub(r'/\d+$', f'/{TEST_REDIS_DB}', conf['LOCATION']),
+            'KEY_PREFIX': f'test:{alias}',
+        }
+        for alias, conf in settings.CACHES.items()
+    }
+
+
+def reset_caches():
+    """Todas las cachés vacías: cada alias puede estar en un Redis distinto (``REDIS_CACHE_HOST``)."""
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+@override_settings(CACHES=isolated_caches())
+class AuthQueryBudgetTests(TestCase):
+    email = 'budget@example.com'
+    password = 'budget-password-123'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email=cls.email, password=cls.password)
+
+    def setUp(self):
+        reset_caches()
+
+    def login(self):
+        response = self.client.post(
+            '/api/login/', {'email': self.email, 'password': self.password}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['tokens']
+
+    def test_login(self):
+        # SELECT del usuario por email
+        with self.assertNumQueries(1):
+            self.login()
+
+    def test_token_refresh(self):
+        tokens = self.login()
+        # Rotación y blacklist en Redis: sin consultas
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                '/api/token/refresh/', {'refresh': tokens['refresh']}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def me(self, tokens):
+        return self.client.get('/api/me/', HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def test_me(self):
+        tokens = self.login()
+        # Identidad cacheada en el login (users.identity): sin consultas
+        with self.assertNumQueries(0):
+            response = self.me(tokens)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['email'], self.email)
+
+    def test_me_after_identity_eviction(self):
+        tokens = self.login()
+        caches['default'].clear()
+        # Versión nueva: SELECT del usuario, que vuelve a quedar en caché
+        with self.assertNumQueries(1):
+            self.assertEqual(self.me(tokens).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.me(tokens).status_code, 200)
+
+    def test_me_reflects_profile_changes(self):
+        tokens = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Nuevo'
+            self.user.save()
+        response = self.me(tokens)
+        self.assertEqual(response.json()['first_name'], 'Nuevo')
+
+    def test_deactivated_user_is_rejected(self):
+        tokens = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.me(tokens).status_code, 401)
+
+    def test_logout_without_redis(self):
+        tokens = self.login()
+        with mock.patch('users.blacklist._get_redis', side_effect=RedisConnectionError('down')):
+            response = self.client.post(
+                '/api/logout/', {'refresh': tokens['refresh']}, content_type='application/json',
+                HTTP_AUTHORIZATION=f"Bearer {tokens['access']}",
+            )
+        self.assertEqual(response.status_code, 503)
+
+    @override_settings(USER_IDENTITY={'PROFILE_CLAIMS': True})
+    def test_me_with_profile_claims(self):
+        tokens = self.login()
+        expected = self.me(tokens).json()
+        # El perfil viene en el token: ni consultas ni caché de identidad
+        caches['default'].delete_pattern('user:*:identity:*')
+        with self.assertNumQueries(0):
+            response = self.me(tokens)
+        self.assertEqual(response.json(), expected)
+
+    @override_settings(USER_IDENTITY={'PROFILE_CLAIMS': True})
+    def test_profile_claims_are_invalidated(self):
+        tokens = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.me(tokens).status_code, 401)
+
+
+@override_settings(CACHES=isolated_caches(), AUTH_THROTTLE_RATES={'ip': '3/min', 'email': '2/min'})
+class AuthThrottleTests(TestCase):
+    email = 'throttle@example.com'
+    password = 'throttle-password-123'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email=cls.email, password=cls.password)
+
+    def setUp(self):
+        reset_caches()
+
+    def post(self, url, email, password=None, ip='10.0.0.1'):
+        return self.client.post(
+            url, {'email': email, 'password': password or self.password},
+            content_type='application/json', REMOTE_ADDR=ip,
+        )
+
+    def assertThrottled(self, response, scope, before):
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(rejections.snapshot().get(f'throttle_{scope}', 0), before + 1)
+
+    def test_email_limit_rejects_before_hashing(self):
+        self.assertEqual(self.post('/api/login/', self.email).status_code, 200)
+        self.assertEqual(self.post('/api/login/', self.email, 'wrong-password').status_code, 400)
+        before = rejections.snapshot().get('throttle_email', 0)
+        with mock.patch('users.hashing.pool.run') as run:
+            # Desde otra IP: el límite es por cuenta
+            response = self.post('/api/login/', self.email.upper(), ip='10.0.0.2')
+        run.assert_not_called()
+        self.assertThrottled(response, 'email', before)
+
+    def test_ip_limit_across_emails(self):
+        for i in range(3):
+            self.post('/api/login/', f'user{i}@example.com')
+        before = rejections.snapshot().get('throttle_ip', 0)
+        self.assertThrottled(self.post('/api/login/', 'other@example.com'), 'ip', before)
+        self.assertEqual(self.post('/api/login/', self.email, ip='10.0.0.2').status_code, 200)
+
+    def test_limits_are_shared_by_token_endpoint(self):
+        self.post('/api/login/', self.email)
+        self.assertEqual(self.post('/api/token/', self.email).status_code, 200)
+        before = rejections.snapshot().get('throttle_email', 0)
+        self.assertThrottled(self.post('/api/token/', self.email), 'email', before)
+
+    def test_registration_is_limited_by_ip(self):
+        for i in range(3):
+            self.post('/api/login/', f'user{i}@example.com')
+        before = rejections.snapshot().get('throttle_ip', 0)
+        response = self.client.post('/api/register/', {
+            'email': 'new@example.com', 'password': self.password, 'password_confirm': self.password,
+        }, content_type='application/json', REMOTE_ADDR='10.0.0.1')
+        self.assertThrottled(response, 'ip', before)
+        self.assertFalse(User.objects.filter(email='new@example.com').exists())
+
+
+@override_settings(CACHES=isolated_caches())
+class HashingPoolTests(TestCase):
+    email = 'pool@example.com'
+    password = 'pool-password-123'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email=cls.email, password=cls.password)
+
+    def setUp(self):
+        reset_caches()
+
+    def login(self):
+        return self.client.post(
+            '/api/login/', {'email': self.email, 'password': self.password}, content_type='application/json'
+        )
+
+    def test_login_hashes_in_pool(self):
+        completed = pool.stats()['completed']
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(pool.stats()['completed'], completed + 1)
+
+    def test_full_pool_rejects_with_503(self):
+        before = rejections.snapshot().get('hashing_overloaded', 0)
+        with override_settings(PASSWORD_HASHING={'MAX_PENDING': 0}):
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(rejections.snapshot()['hashing_overloaded'], before + 1)
+
+    def test_timed_out_hash_stays_pending(self):
+        pending = pool.stats()['pending']
+        with override_settings(PASSWORD_HASHING={'TIMEOUT': 0.1}):
+            with self.assertRaises(HashingUnavailable):
+                pool.run(time.sleep, 1)
+        # El proceso sigue ocupado: cuenta para MAX_PENDING hasta que termine
+        self.assertEqual(pool.stats()['pending'], pending + 1)
+        deadline = time.monotonic() + 30
+        while pool.stats()['pending'] > pending and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(pool.stats()['pending'], pending)
@@ -0,0 +1,98 @@
+"""
+Límites de intentos de los endpoints que calculan hashes de contraseñas
+(login, ``/api/token/`` y registro), por IP y por email.
+
+Son throttles de DRF, así que se comprueban en ``APIView.initial``, antes de
+la vista: un intento rechazado (429 con ``Retry-After``) no llega a pedir
+ningún hash al pool de ``users.hashing``. Los intentos se cuentan con una
+ventana deslizante en Redis (un ZSET por IP o email con un miembro por
+intento aceptado), compartida por todos los workers y los tres endpoints.
+"""
+import hashlib
+import logging
+import time
+import uuid
+from django.conf import settings
+from django_redis import get_redis_connection
+from rest_framework.throttling import SimpleRateThrottle
+from auth_service.instrumentation import rejections
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_KEY = 'throttle:{scope}:{ident}'
+
+
+def sliding_window(key, limit, duration):
+    """
+    Registra un intento en la ventana de ``duration`` segundos de ``key`` si
+    hay menos de ``limit``. Devuelve ``(permitido, segundos_de_espera)``.
+    """
+    redis = get_redis_connection('durable')
+    now = time.time()
+    member = f'{now}:{uuid.uuid4().hex}'
+    pipe = redis.pipeline()
+    pipe.zremrangebyscore(key, '-inf', now - duration)
+    pipe.zadd(key, {member: now})
+    pipe.zcard(key)
+    pipe.zrange(key, 0, 0, withscores=True)
+    pipe.expire(key, duration)
+    _, _, count, oldest, _ = pipe.execute()
+    if count <= limit:
+        return True, 0
+    # Los rechazados no cuentan: la ventana sigue admitiendo ``limit`` por periodo
+    redis.zrem(key, member)
+    return False, max(oldest[0][1] + duration - now, 0)
+
+
+class AuthRateThrottle(SimpleRateThrottle):
+    """
+    Base: el límite de ``AUTH_THROTTLE_RATES[scope]`` (``"intentos/periodo"``,
+    como los de DRF; ``None`` = sin límite). Si Redis no responde se deja
+    pasar la petición, que sigue limitada por el pool de hashing.
+    """
+
+    def get_rate(self):
+        return getattr(settings, 'AUTH_THROTTLE_RATES', {}).get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        ident = self.get_cache_key(request, view)
+        if ident is None:
+            return True
+
+        key = THROTTLE_KEY.format(scope=self.scope, ident=ident)
+        try:
+            allowed, self.wait_seconds = sliding_window(key, self.num_requests, self.duration)
+        except Exception as e:
+            logger.warning(f"Auth throttle unavailable: {e}")
+            return True
+        if not allowed:
+            rejections.record(f'throttle_{self.scope}')
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPRateThrottle(AuthRateThrottle):
+    scope = 'ip'
+
+    def get_cache_key(self, request, view):
+        # Con proxies delante, REST_FRAMEWORK['NUM_PROXIES'] decide qué
+        # dirección de X-Forwarded-For es la del cliente
+        return self.get_ident(request)
+
+
+class EmailRateThrottle(AuthRateThrottle):
+    """Por cuenta: frena el credential stuffing repartido entre muchas IPs."""
+    scope = 'email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+AUTH_THROTTLES = [IPRateThrottle, EmailRateThrottle]
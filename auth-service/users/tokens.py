@@ -0,0 +1,41 @@
+"""
+Tokens de simplejwt con la blacklist en Redis (``users.blacklist``) en lugar
+de las tablas ``OutstandingToken``/``BlacklistedToken`` de la app
+``token_blacklist``, y con la versión (y opcionalmente el perfil) del
+usuario de ``users.identity``.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from . import identity
+from .blacklist import blacklist_jti, is_blacklisted
+
+
+class RedisBlacklistMixin:
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        self.check_blacklist()
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        blacklist_jti(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+
+
+class AccessToken(RedisBlacklistMixin, tokens.AccessToken):
+    pass
+
+
+class RefreshToken(RedisBlacklistMixin, tokens.RefreshToken):
+    access_token_class = AccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        # Se copian al access token, también en cada refresh
+        for claim, value in identity.token_claims(user).items():
+            token[claim] = value
+        return token
@@ -1,17 +1,27 @@
 from rest_framework import status, generics
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt import views as jwt_views
+from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth import authenticate
+from auth_service.instrumentation import timed_serialization
 from .models import User
 from .serializers import UserRegistrationSerializer, UserSerializer, LoginSerializer
+from .throttling import AUTH_THROTTLES
+from .tokens import RefreshToken
+
+
+def serialize_user(user):
+    with timed_serialization():
+        return UserSerializer(user).data
 
 
 class UserRegistrationView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLES
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -19,7 +29,7 @@ class UserRegistrationView(generics.CreateAPIView):
             user = serializer.save()
             refresh = RefreshToken.for_user(user)
             return Response({
-                'user': UserSerializer(user).data,
+                'user': serialize_user(user),
                 'tokens': {
                     'refresh': str(refresh),
                     'access': str(refresh.access_token),
@@ -30,13 +40,14 @@ class UserRegistrationView(generics.CreateAPIView):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes(AUTH_THROTTLES)
 def login_view(request):
     serializer = LoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
         refresh = RefreshToken.for_user(user)
         return Response({
-            'user': UserSerializer(user).data,
+            'user': serialize_user(user),
             'tokens': {
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -45,11 +56,14 @@ def login_view(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class TokenObtainPairView(jwt_views.TokenObtainPairView):
+    throttle_classes = AUTH_THROTTLES
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def me_view(request):
-    serializer = UserSerializer(request.user)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(serialize_user(request.user), status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -59,6 +73,8 @@ def logout_view(request):
         refresh_token = request.data["refresh"]
         token = RefreshToken(refresh_token)
         token.blacklist()
+        # El access token sigue siendo válido hasta su exp: se revoca también
+        request.auth.blacklist()
         return Response({'message': 'Logout exitoso'}, status=status.HTTP_200_OK)
-    except Exception as e:
+    except (KeyError, TokenError):
         return Response({'error': 'Token inválido'}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
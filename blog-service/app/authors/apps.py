@@ -5,3 +5,5 @@ class AuthorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authors'
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.cache_helpers import invalidate_namespaces
+from .models import Author
+
+
+@receiver([post_save, post_delete], sender=Author)
+def invalidate_author_cache(sender, instance, **kwargs):
+    """Invalida todo lo que anida el nombre de un autor."""
+    transaction.on_commit(lambda: invalidate_namespaces('authors'))
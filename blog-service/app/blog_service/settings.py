@@ -24,6 +24,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'core',
@@ -33,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -40,6 +42,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReadYourWritesMiddleware',
 ]
 
 ROOT_URLCONF = 'blog_service.urls'
@@ -63,17 +66,52 @@ TEMPLATES = [
 WSGI_APPLICATION = 'blog_service.wsgi.application'
 
 # Database
+# Conexiones persistentes (CONN_MAX_AGE) con health check al reutilizarlas.
+# Con DB_POOL=1 las conexiones salen de un pool en el proceso de tamaño
+# DB_POOL_MAX_SIZE por worker (service_core.db.backends.postgresql_pool).
+DB_POOL = os.getenv('DB_POOL', '0') == '1'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'service_core.db.backends.postgresql_pool' if DB_POOL else 'django.db.backends.postgresql',
         'NAME': os.getenv('DB_NAME', 'main_db'),
         'USER': os.getenv('DB_USER', 'devuser'),
         'PASSWORD': os.getenv('DB_PASS', 'devpass'),
         'HOST': os.getenv('DB_HOST', 'postgres'),
         'PORT': '5432',
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', '4')),
+            'TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+        },
     }
 }
 
+# Réplicas de lectura: DB_REPLICA_HOSTS=host1,host2:5433. Las lecturas de las
+# peticiones HTTP van a una réplica sana (core.db_router.ReplicaRouter).
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+
+for index, replica_host in enumerate(DB_REPLICA_HOSTS, start=1):
+    replica_host, _, replica_port = replica_host.partition(':')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+REPLICA_ROUTING = {
+    # Réplicas con más retraso que esto dejan de recibir lecturas
+    'MAX_LAG_SECONDS': float(os.getenv('DB_REPLICA_MAX_LAG', '5')),
+    'LAG_CHECK_INTERVAL': 5,
+    # Tras una escritura, el cliente lee del primario durante esta ventana
+    'READ_YOUR_WRITES_SECONDS': int(os.getenv('DB_READ_YOUR_WRITES_SECONDS', '10')),
+    'COOKIE_NAME': 'db_primary',
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -105,32 +143,132 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'core.authentication.JWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'core.pagination.StandardResultsSetPagination',
     'PAGE_SIZE': 10,
+    # La búsqueda de posts es FullTextSearchFilter, declarado en PostViewSet
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
     ],
+    # La API navegable solo en desarrollo: en producción no se negocia
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
+        'core.renderers.ORJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
 }
 
+# Listado de posts serializado desde .values() (posts.fast_serialization)
+FAST_LIST_SERIALIZATION = os.getenv('FAST_LIST_SERIALIZATION', '0') == '1'
+
+# Listado de posts montado con fragmentos cacheados por post (posts.cache);
+# tiene prioridad sobre FAST_LIST_SERIALIZATION
+LIST_FRAGMENT_CACHE = os.getenv('LIST_FRAGMENT_CACHE', '1') == '1'
+
+# Endpoints públicos de lectura servidos por vistas async (core.async_views);
+# solo tiene sentido con un servidor ASGI (ver el servicio blog-async)
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', '0') == '1'
+
+# JWT emitidos por auth-service (core.authentication.JWTAuthentication).
+# JWT_SIGNING_KEY debe coincidir con el SIGNING_KEY de SIMPLE_JWT en auth-service.
+JWT_AUTH = {
+    'SIGNING_KEY': os.getenv('JWT_SIGNING_KEY', 'django-insecure-jwt-signing-key-change-me'),
+    'ALGORITHM': 'HS256',
+    'USER_ID_CLAIM': 'user_id',
+    'BLACKLIST_KEY': 'jwt:blacklist:{jti}',
+    'REVOCATION_CHECK_INTERVAL': int(os.getenv('JWT_REVOCATION_CHECK_INTERVAL', '5')),
+    'CLAIMS_CACHE_SIZE': 10000,
+}
+
+# Conteo de resultados paginados (core.pagination.CountingPaginator)
+PAGINATION_COUNT = {
+    'APPROXIMATE_THRESHOLD': int(os.getenv('PAGINATION_APPROXIMATE_THRESHOLD', '10000')),
+    'CACHE_TIMEOUT': 60 * 5,
+}
+
+# Full-text search: configuraciones de Postgres combinadas en Post.search_vector
+FULL_TEXT_SEARCH_CONFIGS = ['spanish', 'english']
+
 # Cache configuration with Redis
+# Redis: dos instancias con políticas de expulsión distintas.
+# - REDIS_HOST (noeviction, persistente): sesiones, blacklist de JWT y
+#   contadores de views, que no se pueden perder por falta de memoria.
+# - REDIS_CACHE_HOST (allkeys-lru): datos y páginas cacheadas, que se pueden
+#   expulsar sin más coste que un fallo de caché.
+# Sin REDIS_CACHE_HOST todo va a la misma instancia, en bases de datos distintas.
+REDIS_URL = f"redis://{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', '6379')}"
+REDIS_CACHE_URL = (
+    f"redis://{os.getenv('REDIS_CACHE_HOST', os.getenv('REDIS_HOST', 'redis'))}"
+    f":{os.getenv('REDIS_CACHE_PORT', os.getenv('REDIS_PORT', '6379'))}"
+)
+
+# Las cachés de datos y páginas usan dos niveles: LRU en memoria de cada
+# proceso (L1) delante de Redis (L2), invalidada entre workers por pub/sub
+# (ver core/cache_backends.py). CACHE_L1=0 vuelve a usar solo Redis.
+CACHE_L1 = os.getenv('CACHE_L1', '1') == '1'
+CACHE_BACKEND = 'core.cache_backends.TwoTierRedisCache' if CACHE_L1 else 'django_redis.cache.RedisCache'
+CACHE_L1_OPTIONS = {
+    'MAX_ENTRIES': int(os.getenv('CACHE_L1_MAX_ENTRIES', '1000')),
+    'TIMEOUT': int(os.getenv('CACHE_L1_TIMEOUT', '30')),
+}
+
 CACHES = {
+    # Datos: cache_result, versiones de namespace, detalle de posts, conteos
     'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': f"{REDIS_CACHE_URL}/1",
+        'KEY_PREFIX': 'blog:data',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'REDIS_CLIENT_CLASS': 'core.instrumentation.InstrumentedRedis',
+            'L1': CACHE_L1_OPTIONS,
+        }
+    },
+    # Respuestas completas de cache_page (CacheMixin)
+    'pages': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': f"{REDIS_CACHE_URL}/2",
+        'KEY_PREFIX': 'blog:pages',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'REDIS_CLIENT_CLASS': 'core.instrumentation.InstrumentedRedis',
+            'L1': CACHE_L1_OPTIONS,
+        }
+    },
+    'sessions': {
         'BACKEND': 'django_redis.cache.RedisCache',
-        'LOCATION': f"redis://{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', '6379')}/1",
+        'LOCATION': f"{REDIS_URL}/0",
+        'KEY_PREFIX': 'blog:sessions',
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'REDIS_CLIENT_CLASS': 'core.instrumentation.InstrumentedRedis',
         }
-    }
+    },
+    # Estado que no debe expulsarse; se usa con get_redis_connection('durable')
+    'durable': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': f"{REDIS_URL}/0",
+        'KEY_PREFIX': 'blog',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'REDIS_CLIENT_CLASS': 'core.instrumentation.InstrumentedRedis',
+        }
+    },
+}
+
+# Instrumentación por petición (core.instrumentation): el total de todas las
+# peticiones va al histograma de /metrics; el desglose (Server-Timing y log)
+# solo en la fracción PERF_SAMPLE_RATE
+PERFORMANCE_INSTRUMENTATION = {
+    'ENABLED': os.getenv('PERF_INSTRUMENTATION', '1') == '1',
+    'SAMPLE_RATE': float(os.getenv('PERF_SAMPLE_RATE', '1' if DEBUG else '0.05')),
 }
 
 # Session configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
-SESSION_CACHE_ALIAS = 'default'
+SESSION_CACHE_ALIAS = 'sessions'
 
 # Logging configuration
 LOGGING = {
@@ -164,6 +302,11 @@ LOGGING = {
             'handlers': ['console'],
             'level': 'DEBUG',
         },
+        'performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
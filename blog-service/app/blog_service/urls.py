@@ -1,10 +1,11 @@
 """
 URL configuration for blog_service project.
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from core.views import healthz
+from core.views import healthz, metrics
 from categories.views import CategoryViewSet
 from posts.views import PostViewSet
 
@@ -15,6 +16,21 @@ router.register(r'posts', PostViewSet, basename='post')
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('healthz', healthz, name='healthz'),
+    path('metrics', metrics, name='metrics'),
     path('api/', include(router.urls)),
 ]
 
+if settings.ASYNC_READ_VIEWS:
+    # Van delante del router: las lecturas públicas se resuelven con las
+    # vistas async y el resto de rutas y métodos siguen en los ViewSets
+    from core import async_views
+    from categories.async_views import category_list
+    from posts.async_views import post_detail, post_list
+
+    urlpatterns[1:1] = [
+        path('healthz', async_views.healthz, name='healthz'),
+        path('api/categories/', category_list, name='category-list'),
+        path('api/posts/', post_list, name='post-list'),
+        path('api/posts/<int:pk>/', post_detail, name='post-detail'),
+    ]
+
@@ -5,3 +5,5 @@ class CategoriesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'categories'
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,20 @@
+"""
+Versión async de ``CategoryViewSet.list`` (ver ``core.async_views``).
+"""
+from core.async_views import afilter_queryset, apaginated_data, async_read_view, get_view
+from core.instrumentation import timed_serialization
+from .views import CategoryViewSet
+
+sync_list = CategoryViewSet.as_view({'get': 'list'}, basename='category', detail=False)
+
+
+@async_read_view(CategoryViewSet.cache_namespaces, cache_timeout=CategoryViewSet.cache_timeout, fallback=sync_list)
+async def category_list(request):
+    view = get_view(CategoryViewSet, request, 'list')
+    queryset = await afilter_queryset(view, view.get_queryset())
+
+    async def serialize(categories):
+        with timed_serialization():
+            return view.get_serializer(categories, many=True).data
+
+    return await apaginated_data(view, queryset, serialize)
@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.cache_helpers import invalidate_namespaces
+from .models import Category
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    """Invalida categorías y todo lo que anida el nombre de una categoría."""
+    transaction.on_commit(lambda: invalidate_namespaces('categories'))
@@ -1,18 +1,19 @@
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny
+from core.mixins import CacheMixin, ConditionalGetMixin, TimedSerializationMixin
 from .models import Category
 from .serializers import CategorySerializer
 
 
-@method_decorator(cache_page(120), name='dispatch')
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, CacheMixin, TimedSerializationMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para listar categorías activas.
-    Cacheo: 120 segundos
+    Cacheo: 6 horas, invalidado al guardar una categoría
+    Responde 304 a peticiones condicionales sin tocar la caché ni la BD
     """
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
+    cache_timeout = 60 * 60 * 6
+    cache_namespaces = ['categories']
 
@@ -0,0 +1,159 @@
+"""
+Acceso async (``redis.asyncio``) a las cachés de ``django_redis``.
+
+Las vistas async (``core.async_views``) leen y escriben las mismas claves,
+con el mismo prefijo, versión y serialización que la caché síncrona del
+alias, así que ambos modos comparten las entradas. Con
+``core.cache_backends.TwoTierRedisCache`` también comparten la L1 del
+proceso: las lecturas miran primero en memoria y las escrituras publican la
+invalidación para el resto de procesos.
+
+Los métodos de caché de Django con prefijo ``a`` (``cache.aget``...) no
+sirven aquí: django_redis no los implementa y Django los ejecuta en un hilo.
+"""
+import weakref
+from asyncio import get_running_loop
+from django.conf import settings
+from django.core.cache import caches
+from redis.asyncio import ConnectionPool
+from .instrumentation import InstrumentedAsyncRedis, record_l1_hits
+
+# Un cliente por event loop y alias: las conexiones de redis.asyncio no se
+# pueden usar desde otro loop
+_clients = weakref.WeakKeyDictionary()
+
+
+def create_client(location, options):
+    pool = ConnectionPool.from_url(location, **options.get('CONNECTION_POOL_KWARGS', {}))
+    return InstrumentedAsyncRedis(connection_pool=pool)
+
+
+def get_async_redis_connection(alias='default'):
+    """Cliente ``redis.asyncio`` de la instancia de Redis del alias (equivalente a ``get_redis_connection``)."""
+    loop_clients = _clients.setdefault(get_running_loop(), {})
+    client = loop_clients.get(alias)
+    if client is None:
+        conf = settings.CACHES[alias]
+        location = conf['LOCATION']
+        if isinstance(location, (list, tuple)):
+            location = location[0]
+        client = loop_clients[alias] = create_client(location, conf.get('OPTIONS', {}))
+    return client
+
+
+class AsyncCache:
+    """
+    Subconjunto async de la API de caché (``get``, ``get_many``, ``set``,
+    ``set_many``, ``add``) sobre la caché ``alias``. Los timeouts son
+    segundos (``None`` = sin caducidad). Un fallo de Redis se trata como un
+    fallo de caché: la petición sigue contra la base de datos.
+    """
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def redis(self):
+        return get_async_redis_connection(self.alias)
+
+    def make_key(self, key):
+        return str(self.backend.client.make_key(key))
+
+    def local_key(self, key):
+        """Clave de L1, o ``None`` si el alias no tiene L1 o la clave no entra."""
+        backend = self.backend
+        if not hasattr(backend, 'local'):
+            return None
+        return backend._local_key(key)
+
+    async def get(self, key, default=None):
+        result = await self.get_many([key])
+        return result.get(key, default)
+
+    async def get_many(self, keys):
+        backend = self.backend
+        result = {}
+        pending = {}
+        for key in keys:
+            local_key = self.local_key(key)
+            if local_key is not None:
+                hit, value = backend.local.get(local_key)
+                if hit:
+                    record_l1_hits()
+                    result[key] = value
+                    continue
+            pending[key] = local_key
+        if not pending:
+            return result
+
+        tier = backend.local if hasattr(backend, 'local') else None
+        epoch = tier.epoch if tier is not None else None
+        redis_keys = [self.make_key(key) for key in pending]
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.mget(redis_keys)
+            if tier is not None:
+                for redis_key in redis_keys:
+                    pipe.pttl(redis_key)
+            raw_values, *pttls = await pipe.execute()
+        except Exception:
+            return result
+
+        for index, (key, local_key) in enumerate(pending.items()):
+            raw = raw_values[index]
+            if raw is None:
+                if tier is not None:
+                    tier.count('l2_misses')
+                continue
+            value = backend.client.decode(raw)
+            result[key] = value
+            if tier is not None:
+                tier.count('l2_hits')
+                if local_key is not None:
+                    pttl = pttls[index]
+                    ttl = pttl / 1000 if pttl is not None and pttl >= 0 else None
+                    tier.set(local_key, value, ttl, epoch=epoch)
+        return result
+
+    async def set(self, key, value, timeout, nx=False):
+        return bool(await self._set({key: value}, timeout, nx=nx))
+
+    async def add(self, key, value, timeout):
+        return await self.set(key, value, timeout, nx=True)
+
+    async def set_many(self, data, timeout):
+        await self._set(data, timeout)
+
+    async def _set(self, data, timeout, nx=False):
+        """SET de cada clave en un pipeline, más la invalidación de L1 de los demás procesos."""
+        backend = self.backend
+        local_keys = {key: self.local_key(key) for key in data}
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in data.items():
+                pipe.set(self.make_key(key), backend.client.encode(value), ex=timeout, nx=nx)
+            published = [local_key for local_key in local_keys.values() if local_key is not None]
+            if published:
+                pipe.publish(*backend.invalidation_message(published))
+            results = await pipe.execute()
+        except Exception:
+            return 0
+
+        stored = 0
+        for (key, value), result in zip(data.items(), results):
+            local_key = local_keys[key]
+            if result:
+                stored += 1
+                if local_key is not None:
+                    backend.local.set(local_key, value, timeout)
+            elif local_key is not None:
+                backend.local.delete([local_key])
+        return stored
+
+
+# Equivalente async de ``django.core.cache.cache``
+cache = AsyncCache('default')
@@ -0,0 +1,167 @@
+"""
+Modo async de los endpoints de lectura (``ASYNC_READ_VIEWS``, con ASGI).
+
+Las vistas async reutilizan los ViewSets de DRF para construir querysets,
+serializers y paginación, pero hacen la E/S con el ORM async y
+``core.async_cache``: mientras una petición espera a Postgres o a Redis, el
+worker atiende otras. Devuelven el mismo JSON y los mismos validadores
+(ETag/Last-Modified) que las vistas síncronas y comparten sus entradas de
+caché, salvo la página completa, que se guarda con su propia clave.
+
+Solo responden JSON (sin la API navegable) y no autentican: sirven los
+endpoints públicos de lectura. El resto de métodos (OPTIONS, escrituras) se
+delegan en la vista síncrona del ViewSet.
+"""
+import asyncio
+import hashlib
+import logging
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_response_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+from .async_cache import AsyncCache, get_async_redis_connection
+from .cache_helpers import aget_namespace_versions
+from .mixins import conditional_validators, set_validators
+from .renderers import ORJSONRenderer
+from .views import REDIS_CHECKS, check_database, health_response
+
+logger = logging.getLogger(__name__)
+
+PAGE_KEY = 'async:page:{prefix}:{fingerprint}'
+
+READ_METHODS = ('GET', 'HEAD')
+
+renderer = ORJSONRenderer()
+pages = AsyncCache('pages')
+
+
+def json_response(data, status=200):
+    return HttpResponse(renderer.render(data), status=status, content_type='application/json')
+
+
+def exception_response(exc, request):
+    """Respuesta de error con el mismo formato que el manejador de excepciones de DRF."""
+    response = exception_handler(exc, {'request': request, 'view': None})
+    if response is None:
+        raise exc
+    return json_response(response.data, response.status_code)
+
+
+def get_view(viewset, request, action, **kwargs):
+    """
+    Instancia de ``viewset`` para la petición, para usar su queryset,
+    filtros, serializers y paginación sin pasar por ``dispatch``.
+    """
+    return viewset(action=action, request=Request(request), format_kwarg=None, args=(), kwargs=kwargs)
+
+
+async def afilter_queryset(view, queryset):
+    """
+    ``view.filter_queryset``. django-filter valida los ids de los filtros
+    contra la base de datos, así que si la petición filtra se ejecuta en un
+    hilo; el resto de filtros solo construyen el queryset.
+    """
+    fields = getattr(view, 'filterset_fields', None) or ()
+    if any(field in view.request.query_params for field in fields):
+        return await sync_to_async(view.filter_queryset)(queryset)
+    return view.filter_queryset(queryset)
+
+
+async def apaginated_data(view, queryset, serialize):
+    """
+    Datos de la respuesta paginada, como ``get_paginated_response``.
+    ``serialize(items)`` es async y devuelve la lista de resultados.
+    """
+    paginator = view.paginator
+    page = await paginator.apaginate_queryset(queryset, view.request, view=view)
+    if page is None:
+        return await serialize([item async for item in queryset])
+    return paginator.get_paginated_response(await serialize(page)).data
+
+
+async def delegate(fallback, request, *args, **kwargs):
+    """Petición que no es de lectura: a ``fallback`` (vista síncrona) en un hilo, o 405 si no hay."""
+    if fallback is None:
+        return exception_response(MethodNotAllowed(request.method), request)
+    return await sync_to_async(fallback)(request, *args, **kwargs)
+
+
+def async_read_view(namespaces, cache_timeout=None, fallback=None, validator_namespaces=()):
+    """
+    Convierte ``func(request, *args, **kwargs) -> datos`` (async) en una
+    vista async con lo que ``ConditionalGetMixin`` y ``CacheMixin`` hacen en
+    las vistas síncronas:
+
+    - 304 con los validadores de las versiones de ``namespaces`` y
+      ``validator_namespaces`` (una sola lectura de Redis), iguales a los de
+      la vista síncrona.
+    - La respuesta se cachea ``cache_timeout`` segundos en la caché
+      ``pages``, con las versiones en la clave (None = sin caché).
+    - Las excepciones de DRF se devuelven como JSON.
+    - El resto de métodos van a ``fallback`` (ver ``delegate``).
+    """
+    def decorator(func):
+        @csrf_exempt
+        @wraps(func)
+        async def view(request, *args, **kwargs):
+            if request.method not in READ_METHODS:
+                return await delegate(fallback, request, *args, **kwargs)
+
+            versions = await aget_namespace_versions([*namespaces, *validator_namespaces])
+            etag, last_modified = conditional_validators(request, versions)
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                return set_validators(not_modified, etag, last_modified)
+
+            key = None
+            body = None
+            if cache_timeout:
+                fingerprint = hashlib.md5(
+                    f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}".encode()
+                ).hexdigest()
+                prefix = ':'.join(f'{ns}.{versions[ns]}' for ns in namespaces)
+                key = PAGE_KEY.format(prefix=prefix, fingerprint=fingerprint)
+                body = await pages.get(key)
+
+            if body is None:
+                try:
+                    data = await func(request, *args, **kwargs)
+                except Exception as exc:
+                    return exception_response(exc, request)
+                body = renderer.render(data)
+                if key:
+                    await pages.set(key, body, cache_timeout)
+
+            response = HttpResponse(body, content_type='application/json')
+            if cache_timeout:
+                patch_response_headers(response, cache_timeout)
+            return set_validators(response, etag, last_modified)
+        return view
+    return decorator
+
+
+async def check_redis(alias):
+    try:
+        await get_async_redis_connection(alias).ping()
+        return 'ok'
+    except Exception as e:
+        logger.error(f"Redis check failed for {alias}: {e}")
+        return 'error'
+
+
+async def healthz(request):
+    """
+    ``core.views.healthz`` con los PING a Redis en paralelo en el event
+    loop; la base de datos y las estadísticas se comprueban en un hilo.
+    """
+    results = await asyncio.gather(*(check_redis(alias) for alias in REDIS_CHECKS.values()))
+    redis_checks = dict(zip(REDIS_CHECKS, results))
+
+    def build_response():
+        return health_response({'database': check_database(), **redis_checks})
+
+    return await sync_to_async(build_response)()
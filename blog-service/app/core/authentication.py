@@ -0,0 +1,175 @@
+"""
+Autenticación JWT local para el Blog Service.
+
+Valida en el propio proceso los access tokens HS256 que emite auth-service
+(``rest_framework_simplejwt``), sin llamarlo en cada petición. Los claims ya
+verificados se guardan en memoria por hash del token hasta su ``exp``, y la
+revocación se consulta en la blacklist compartida en Redis (claves
+``jwt:blacklist:<jti>`` con TTL hasta el ``exp`` del token), que escribe
+auth-service.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from django.conf import settings
+from django_redis import get_redis_connection
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'SIGNING_KEY': None,
+    'ALGORITHM': 'HS256',
+    'LEEWAY': 0,
+    'USER_ID_CLAIM': 'user_id',
+    'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_TYPE': 'access',
+    'JTI_CLAIM': 'jti',
+    'BLACKLIST_KEY': 'jwt:blacklist:{jti}',
+    # Segundos durante los que se confía en una comprobación de revocación
+    'REVOCATION_CHECK_INTERVAL': 5,
+    'CLAIMS_CACHE_SIZE': 10000,
+}
+
+
+def jwt_settings():
+    return {**DEFAULTS, **getattr(settings, 'JWT_AUTH', {})}
+
+
+class TokenUser:
+    """
+    Usuario sin fila en la base de datos del blog, construido a partir de los
+    claims del token. Los usuarios viven en auth-service.
+    """
+    is_authenticated = True
+    is_anonymous = False
+    is_staff = False
+    is_superuser = False
+
+    def __init__(self, claims, user_id_claim='user_id'):
+        self.claims = claims
+        self.id = self.pk = claims.get(user_id_claim)
+
+    def __str__(self):
+        return f'TokenUser {self.id}'
+
+
+class ClaimsCache:
+    """
+    LRU acotado de claims verificados, por hash del token. Cada entrada
+    caduca con el ``exp`` del token. Es por proceso y thread-safe.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry['exp'] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, claims):
+        with self._lock:
+            self._entries[key] = {'claims': claims, 'exp': claims['exp'], 'checked_at': 0.0}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+claims_cache = ClaimsCache(jwt_settings()['CLAIMS_CACHE_SIZE'])
+
+
+def is_token_revoked(jti):
+    """
+    True si el ``jti`` está en la blacklist compartida en Redis.
+
+    Si Redis no responde se deja pasar el token (ya validado por firma y
+    expiración) y se registra el fallo, para no tumbar el servicio.
+    """
+    if not jti:
+        return False
+    try:
+        redis_conn = get_redis_connection('durable')
+        return bool(redis_conn.exists(jwt_settings()['BLACKLIST_KEY'].format(jti=jti)))
+    except Exception as e:
+        logger.warning(f"Token blacklist unavailable: {e}")
+        return False
+
+
+class JWTAuthentication(BaseAuthentication):
+    """
+    Autenticación ``Authorization: Bearer <token>`` con validación local.
+
+    Uso:
+        class MyViewSet(viewsets.ModelViewSet):
+            authentication_classes = [JWTAuthentication]
+            permission_classes = [IsAuthenticated]
+    """
+    keyword = b'bearer'
+
+    def authenticate(self, request):
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword:
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed('Cabecera de autorización inválida')
+
+        token = header[1].decode('latin-1')
+        options = jwt_settings()
+        claims = self.get_validated_claims(token, options)
+        return TokenUser(claims, options['USER_ID_CLAIM']), token
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="api"'
+
+    def get_validated_claims(self, token, options):
+        cache_key = hashlib.sha256(token.encode()).hexdigest()
+        entry = claims_cache.get(cache_key)
+        if entry is None:
+            claims = self.decode(token, options)
+            claims_cache.set(cache_key, claims)
+            entry = claims_cache.get(cache_key)
+
+        now = time.time()
+        if now - entry['checked_at'] >= options['REVOCATION_CHECK_INTERVAL']:
+            if is_token_revoked(entry['claims'].get(options['JTI_CLAIM'])):
+                raise exceptions.AuthenticationFailed('Token revocado')
+            entry['checked_at'] = now
+        return entry['claims']
+
+    def decode(self, token, options):
+        try:
+            claims = jwt.decode(
+                token,
+                options['SIGNING_KEY'],
+                algorithms=[options['ALGORITHM']],
+                leeway=options['LEEWAY'],
+                options={'require': ['exp']},
+            )
+        except jwt.ExpiredSignatureError:
+            raise exceptions.AuthenticationFailed('Token expirado')
+        except jwt.InvalidTokenError:
+            raise exceptions.AuthenticationFailed('Token inválido')
+
+        if claims.get(options['TOKEN_TYPE_CLAIM']) != options['TOKEN_TYPE']:
+            raise exceptions.AuthenticationFailed('Tipo de token inválido')
+        if options['USER_ID_CLAIM'] not in claims:
+            raise exceptions.AuthenticationFailed('El token no identifica al usuario')
+        return claims
@@ -0,0 +1,425 @@
+"""
+Backend de caché en dos niveles: una LRU en memoria del proceso (L1) delante
+de Redis (L2, ``django_redis``).
+
+Las claves calientes (versiones de namespace, la lista de categorías, páginas
+de ``cache_page``) se sirven sin salir del proceso. Cada escritura o borrado
+se publica en un canal de Redis pub/sub y un hilo por proceso descarta esas
+claves de su L1, así ningún worker de gunicorn sigue sirviendo un valor viejo.
+Como pub/sub no garantiza la entrega, las entradas de L1 caducan además a los
+``TIMEOUT`` segundos (o antes, si la clave caduca antes en Redis).
+
+Configuración (``CACHES[alias]['OPTIONS']['L1']``):
+    MAX_ENTRIES: entradas máximas en L1 por proceso (LRU).
+    TIMEOUT: segundos máximos que una entrada vive en L1.
+    MAX_VALUE_BYTES: valores serializados más grandes no entran en L1.
+    EXCLUDE_PREFIXES: claves (sin prefijo ni versión) que nunca van a L1.
+    CHANNEL: canal de pub/sub para las invalidaciones (por defecto uno por
+        ``KEY_PREFIX``, porque los canales no dependen de la base de datos).
+"""
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache, omit_exception
+from .instrumentation import record_l1_hits
+
+logger = logging.getLogger(__name__)
+
+L1_DEFAULTS = {
+    'MAX_ENTRIES': 1000,
+    'TIMEOUT': 30,
+    'MAX_VALUE_BYTES': 256 * 1024,
+    # Las sesiones cambian en cada login/logout: siempre desde Redis
+    'EXCLUDE_PREFIXES': ('django.contrib.sessions',),
+    'CHANNEL': None,
+}
+
+# Tipos inmutables que se guardan tal cual; el resto se guarda serializado
+# para que quien lo lea no pueda modificar la copia compartida
+IMMUTABLE_TYPES = (int, float, str, bytes, bool, type(None))
+
+RECONNECT_DELAY = 1.0
+
+
+class LocalTier:
+    """
+    L1 de un proceso: LRU acotada con caducidad por entrada, compartida por
+    todos los hilos (las instancias de caché de Django son por hilo).
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.sender = uuid.uuid4().hex
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Cambia con cada invalidación recibida: un relleno desde L2 que
+        # empezó antes no debe guardar un valor que ya se invalidó
+        self.epoch = 0
+        self.listener = None
+        self.listening = False
+        self.counters = {
+            'l1_hits': 0,
+            'l1_misses': 0,
+            'l2_hits': 0,
+            'l2_misses': 0,
+            'evictions': 0,
+            'invalidations_received': 0,
+            'listener_reconnects': 0,
+        }
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def get(self, key):
+        """Devuelve ``(True, valor)`` si la clave está en L1 y no ha caducado."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.counters['l1_misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.counters['l1_hits'] += 1
+        expires_at, pickled, data = entry
+        return True, pickle.loads(data) if pickled else data
+
+    def set(self, key, value, ttl, epoch=None):
+        """
+        Guarda ``value`` durante ``ttl`` segundos como mucho. Si se pasa
+        ``epoch`` y desde entonces llegó una invalidación, no se guarda.
+        """
+        ttl = min(ttl, self.options['TIMEOUT']) if ttl is not None else self.options['TIMEOUT']
+        if ttl <= 0:
+            self.delete([key])
+            return
+        if isinstance(value, IMMUTABLE_TYPES):
+            entry = (time.monotonic() + ttl, False, value)
+        else:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            if len(data) > self.options['MAX_VALUE_BYTES']:
+                self.delete([key])
+                return
+            entry = (time.monotonic() + ttl, True, data)
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.options['MAX_ENTRIES']:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, keys=None, received=True):
+        """Invalidación recibida de otro proceso (``keys=None``: todo)."""
+        with self._lock:
+            self.epoch += 1
+            if received:
+                self.counters['invalidations_received'] += 1
+            if keys is None:
+                self._entries.clear()
+            else:
+                for key in keys:
+                    self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            size = len(self._entries)
+        l1_total = counters['l1_hits'] + counters['l1_misses']
+        l2_total = counters['l2_hits'] + counters['l2_misses']
+        return {
+            'l1': {
+                'hits': counters['l1_hits'],
+                'misses': counters['l1_misses'],
+                'hit_rate': round(counters['l1_hits'] / l1_total, 3) if l1_total else None,
+                'size': size,
+                'max_entries': self.options['MAX_ENTRIES'],
+                'evictions': counters['evictions'],
+            },
+            'l2': {
+                'hits': counters['l2_hits'],
+                'misses': counters['l2_misses'],
+                'hit_rate': round(counters['l2_hits'] / l2_total, 3) if l2_total else None,
+            },
+            'invalidations_received': counters['invalidations_received'],
+            'listener': 'ok' if self.listening else 'down',
+            'listener_reconnects': counters['listener_reconnects'],
+        }
+
+
+# L1 por (pid, alias de configuración): tras un fork cada worker crea la suya
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+def get_local_tier(name, options):
+    key = (os.getpid(), name)
+    with _tiers_lock:
+        tier = _tiers.get(key)
+        if tier is None:
+            tier = _tiers[key] = LocalTier(options)
+        return tier
+
+
+class TwoTierRedisCache(RedisCache):
+    """
+    ``django_redis.cache.RedisCache`` con una L1 en memoria del proceso.
+
+    Mantiene la API de ``django_redis`` (``get_redis_connection``,
+    ``delete_pattern``, ``get_master_client``...). Las lecturas miran primero
+    en L1; las escrituras van a Redis, actualizan la L1 propia y se publican
+    para que los demás procesos descarten la clave.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        options = params.get('OPTIONS', {})
+        self._l1_options = {**L1_DEFAULTS, **options.get('L1', {})}
+        self._l1_options['EXCLUDE_PREFIXES'] = tuple(self._l1_options['EXCLUDE_PREFIXES'])
+        if not self._l1_options['CHANNEL']:
+            self._l1_options['CHANNEL'] = f"cache:l1:invalidate:{self.key_prefix}"
+        self._l1_name = f"{server}|{self.key_prefix}|{self._l1_options['CHANNEL']}"
+
+    @property
+    def local(self):
+        tier = get_local_tier(self._l1_name, self._l1_options)
+        if tier.listener is None or not tier.listener.is_alive():
+            self._start_listener(tier)
+        return tier
+
+    def _start_listener(self, tier):
+        with _tiers_lock:
+            if tier.listener is not None and tier.listener.is_alive():
+                return
+            tier.listener = threading.Thread(
+                target=self._listen, args=(tier,), name='cache-l1-invalidation', daemon=True,
+            )
+            tier.listener.start()
+
+    def _listen(self, tier):
+        """Hilo del proceso que aplica las invalidaciones publicadas por otros."""
+        channel = self._l1_options['CHANNEL']
+        while True:
+            try:
+                pubsub = self.client.get_client(write=True).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(channel)
+                # Mientras no estábamos suscritos se pudieron perder mensajes
+                tier.invalidate(received=False)
+                tier.listening = True
+                for message in pubsub.listen():
+                    if message.get('type') != 'message':
+                        continue
+                    payload = json.loads(message['data'])
+                    if payload.get('sender') == tier.sender:
+                        continue
+                    tier.invalidate(payload.get('keys'))
+            except Exception as e:
+                logger.warning(f"Cache L1 invalidation listener error, reconnecting: {e}")
+            tier.listening = False
+            tier.count('listener_reconnects')
+            time.sleep(RECONNECT_DELAY)
+
+    def invalidation_message(self, keys=None):
+        """
+        Canal y mensaje que descartan ``keys`` (claves finales; ``None`` para
+        todas) de la L1 de los demás procesos. Para quien publica por su
+        cuenta, como ``core.async_cache``.
+        """
+        payload = {'sender': self.local.sender, 'keys': None if keys is None else [str(k) for k in keys]}
+        return self._l1_options['CHANNEL'], json.dumps(payload)
+
+    def _publish(self, keys=None):
+        try:
+            self.client.get_client(write=True).publish(*self.invalidation_message(keys))
+        except Exception as e:
+            logger.warning(f"Cache L1 invalidation publish failed: {e}")
+
+    def _local_key(self, key, version=None):
+        """Clave final de Redis, o ``None`` si la clave no debe ir a L1."""
+        if isinstance(key, str) and key.startswith(self._l1_options['EXCLUDE_PREFIXES']):
+            return None
+        return str(self.client.make_key(key, version=version))
+
+    def get(self, key, default=None, version=None, client=None):
+        local_key = self._local_key(key, version)
+        if local_key is None or client is not None:
+            return super().get(key, default=default, version=version, client=client)
+
+        tier = self.local
+        hit, value = tier.get(local_key)
+        if hit:
+            record_l1_hits()
+            return value
+
+        epoch = tier.epoch
+        found, value, ttl = self._get_with_ttl(local_key)
+        if not found:
+            tier.count('l2_misses')
+            return default
+        tier.count('l2_hits')
+        tier.set(local_key, value, ttl, epoch=epoch)
+        return value
+
+    @omit_exception(return_value=(False, None, None))
+    def _get_with_ttl(self, local_key):
+        """GET y PTTL en un solo viaje a Redis; el TTL acota la vida en L1."""
+        pipe = self.client.get_client(write=False).pipeline(transaction=False)
+        pipe.get(local_key)
+        pipe.pttl(local_key)
+        raw, pttl = pipe.execute()
+        if raw is None:
+            return False, None, None
+        ttl = pttl / 1000 if pttl is not None and pttl >= 0 else None
+        return True, self.client.decode(raw), ttl
+
+    def get_many(self, keys, version=None, client=None):
+        if client is not None:
+            return super().get_many(keys, version=version, client=client)
+
+        tier = self.local
+        result = OrderedDict()
+        pending = OrderedDict()
+        for key in keys:
+            local_key = self._local_key(key, version)
+            if local_key is not None:
+                hit, value = tier.get(local_key)
+                if hit:
+                    record_l1_hits()
+                    result[key] = value
+                    continue
+            pending[key] = local_key
+        if not pending:
+            return result
+
+        epoch = tier.epoch
+        fetched = self._get_many_with_ttl(pending, version)
+        for key, local_key in pending.items():
+            if key not in fetched:
+                tier.count('l2_misses')
+                continue
+            value, ttl = fetched[key]
+            tier.count('l2_hits')
+            if local_key is not None:
+                tier.set(local_key, value, ttl, epoch=epoch)
+            result[key] = value
+        return result
+
+    @omit_exception(return_value={})
+    def _get_many_with_ttl(self, pending, version):
+        redis_keys = [str(self.client.make_key(key, version=version)) for key in pending]
+        pipe = self.client.get_client(write=False).pipeline(transaction=False)
+        pipe.mget(redis_keys)
+        for redis_key in redis_keys:
+            pipe.pttl(redis_key)
+        raw_values, *pttls = pipe.execute()
+        fetched = {}
+        for key, raw, pttl in zip(pending, raw_values, pttls):
+            if raw is None:
+                continue
+            ttl = pttl / 1000 if pttl is not None and pttl >= 0 else None
+            fetched[key] = (self.client.decode(raw), ttl)
+        return fetched
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        result = super().set(key, value, timeout=timeout, version=version, client=client, nx=nx, xx=xx)
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            if result:
+                self._publish([local_key])
+                self.local.set(local_key, value, timeout)
+            else:
+                self.local.delete([local_key])
+        return result
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        return self.set(key, value, timeout=timeout, version=version, client=client, nx=True)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        result = super().set_many(data, timeout=timeout, version=version, client=client)
+        local_keys = {key: self._local_key(key, version) for key in data}
+        local_keys = {key: local_key for key, local_key in local_keys.items() if local_key is not None}
+        if local_keys:
+            self._publish(local_keys.values())
+            for key, local_key in local_keys.items():
+                self.local.set(local_key, data[key], timeout)
+        return result
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        result = super().delete(key, version=version, prefix=prefix, client=client)
+        if prefix is None:
+            self._drop([self._local_key(key, version)])
+        else:
+            self.clear_local()
+        return result
+
+    def delete_many(self, keys, version=None):
+        result = super().delete_many(keys, version=version)
+        self._drop([self._local_key(key, version) for key in keys])
+        return result
+
+    def delete_pattern(self, *args, **kwargs):
+        result = super().delete_pattern(*args, **kwargs)
+        self.clear_local()
+        return result
+
+    def incr(self, key, delta=1, version=None, client=None, ignore_key_check=False):
+        result = super().incr(key, delta=delta, version=version, client=client, ignore_key_check=ignore_key_check)
+        self._drop([self._local_key(key, version)])
+        return result
+
+    def decr(self, key, delta=1, version=None, client=None):
+        result = super().decr(key, delta=delta, version=version, client=client)
+        self._drop([self._local_key(key, version)])
+        return result
+
+    def clear(self):
+        result = super().clear()
+        self.clear_local()
+        return result
+
+    def _drop(self, local_keys):
+        local_keys = [key for key in local_keys if key is not None]
+        if local_keys:
+            self.local.delete(local_keys)
+            self._publish(local_keys)
+
+    def invalidate_local(self, redis_keys):
+        """
+        Descartar de la L1 de todos los procesos claves que se borraron
+        directamente en Redis (claves finales, con prefijo y versión).
+        """
+        redis_keys = [k.decode() if isinstance(k, bytes) else str(k) for k in redis_keys]
+        if redis_keys:
+            self.local.delete(redis_keys)
+            self._publish(redis_keys)
+
+    def clear_local(self):
+        """Vaciar la L1 de todos los procesos."""
+        self.local.clear()
+        self._publish(None)
+
+    def tier_stats(self):
+        """Aciertos y fallos por nivel de este proceso."""
+        return self.local.stats()
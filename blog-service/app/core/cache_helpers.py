@@ -1,8 +1,122 @@
-from django.core.cache import cache
+from collections import namedtuple
+from django.conf import settings
+from django.core.cache import cache, caches
 from functools import wraps
+import logging
+import math
+import random
+import time
+from .async_cache import cache as async_cache
+from .db_router import pin_if_recent_change
 
+logger = logging.getLogger(__name__)
 
-def cache_result(prefix='cache', timeout=60):
+# Lo que cache_result guarda en Redis: el valor, lo que tardó en calcularse
+# (para el refresco anticipado) y cuándo deja de estar fresco
+CachedResult = namedtuple('CachedResult', ['value', 'delta', 'expires_at'])
+
+
+def should_refresh_early(entry, beta=1.0, now=None):
+    """
+    Refresco anticipado probabilístico (XFetch): cuanto más cerca está la
+    entrada de caducar y más caro es recalcularla, más probable es que una
+    petición la recalcule antes de tiempo, así no caducan todas a la vez.
+    """
+    if beta <= 0:
+        return False
+    now = time.time() if now is None else now
+    return now - entry.delta * beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+
+def new_entry(value, started, ttl):
+    """``CachedResult`` de ``value``, calculado desde ``started`` y fresco durante ``ttl`` segundos."""
+    finished = time.time()
+    return CachedResult(value, finished - started, finished + ttl)
+
+
+def get_or_compute(cache_key, func, timeout=60, stale_timeout=0, negative_timeout=0,
+                   lock_timeout=10, beta=1.0):
+    """
+    ``func()`` cacheado en ``cache_key``, protegido contra estampidas.
+
+    - Single-flight: al faltar la entrada, solo quien obtiene el lock de Redis
+      (``<clave>:lock``, caduca a los ``lock_timeout`` segundos) ejecuta la
+      función; el resto espera el lock y lee el valor que dejó en la caché.
+    - Refresco anticipado (``beta``, 0 lo desactiva): antes de caducar, una
+      petición al azar recalcula la entrada mientras las demás siguen
+      leyéndola (ver ``should_refresh_early``).
+    - Stale-while-revalidate: durante ``stale_timeout`` segundos después de
+      caducar, la entrada se sigue sirviendo mientras una sola petición la
+      recalcula.
+    - Caché negativa: si la función devuelve ``None``, se guarda durante
+      ``negative_timeout`` segundos (0 = no se guarda).
+    """
+    def compute():
+        started = time.time()
+        result = func()
+        ttl = negative_timeout if result is None else timeout
+        if ttl:
+            stale = 0 if result is None else stale_timeout
+            cache.set(cache_key, new_entry(result, started, ttl), ttl + stale)
+        return result
+
+    def acquire_lock(blocking):
+        """Devuelve el lock adquirido, o ``None`` si lo tiene otro proceso."""
+        try:
+            lock = cache.lock(f"{cache_key}:lock", timeout=lock_timeout,
+                              blocking_timeout=lock_timeout if blocking else None)
+            return lock if lock.acquire(blocking=blocking) else None
+        except Exception as e:
+            # Sin Redis no hay lock: mejor recalcular que fallar
+            logger.warning(f"cache_result lock unavailable for {cache_key}: {e}")
+            return False
+
+    def release_lock(lock):
+        if lock:
+            try:
+                lock.release()
+            except Exception:
+                # Caducó mientras se calculaba: ya lo puede tener otro
+                pass
+
+    entry = cache.get(cache_key)
+    if isinstance(entry, CachedResult):
+        now = time.time()
+        if now < entry.expires_at and not should_refresh_early(entry, beta, now):
+            return entry.value
+        # Refresco anticipado o entrada en la ventana stale: recalcula
+        # solo quien obtiene el lock, el resto sirve lo que hay
+        lock = acquire_lock(blocking=False)
+        if lock is None:
+            return entry.value
+        try:
+            return compute()
+        finally:
+            release_lock(lock)
+
+    # Fallo: un solo cálculo; los demás esperan y leen su resultado
+    lock = acquire_lock(blocking=True)
+    try:
+        if lock:
+            entry = cache.get(cache_key)
+            if isinstance(entry, CachedResult) and time.time() < entry.expires_at:
+                return entry.value
+        return compute()
+    finally:
+        release_lock(lock)
+
+
+def cache_result(prefix='cache', timeout=60, stale_timeout=0, negative_timeout=0,
+                 lock_timeout=10, beta=1.0):
+    """
+    Cachear el resultado de una función en Redis con ``get_or_compute``, con
+    la clave formada por ``prefix`` y los argumentos.
+
+    Uso:
+        @cache_result(prefix='author', timeout=300, stale_timeout=60, negative_timeout=30)
+        def get_author(author_id):
+            return Author.objects.filter(pk=author_id).first()
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -15,40 +129,181 @@ def cache_result(prefix='cache', timeout=60):
                 key_parts.extend(f"{k}={v}" for k, v in sorted_kwargs)
             
             cache_key = ":".join(key_parts)
-            
-            # Intentar obtener del cache
-            result = cache.get(cache_key)
-            if result is not None:
-                return result
-            
-            # Ejecutar función y guardar resultado
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result, timeout)
-            return result
+            return get_or_compute(
+                cache_key, lambda: func(*args, **kwargs), timeout=timeout, stale_timeout=stale_timeout,
+                negative_timeout=negative_timeout, lock_timeout=lock_timeout, beta=beta,
+            )
         
         return wrapper
     return decorator
 
 
-def invalidate_cache(pattern):
+def get_cache_versions(keys, timeout=60 * 60 * 24):
+    """
+    Obtener los contadores de versión de varias claves en una sola llamada.
+
+    Las claves que no existen se inicializan con la hora actual en
+    milisegundos, así una versión expirada o expulsada de Redis nunca vuelve a
+    un valor que ya se usó en claves de datos anteriores; perder una versión
+    solo cuesta un fallo de caché.
+
+    Mientras alguna versión sea más reciente que el retraso admitido a las
+    réplicas, la petición lee de ``default`` (ver ``_pin_recent_versions``).
+
+    Args:
+        keys: Lista de claves de versión (ej: ['posts:detail:version:1'])
+        timeout: TTL de las versiones recién creadas
+
+    Returns:
+        list: Versiones en el mismo orden que ``keys``
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            initial = int(time.time() * 1000)
+            cache.add(key, initial, timeout)
+            versions[key] = cache.get(key) or initial
+    _pin_recent_versions(versions.values())
+    return [versions[key] for key in keys]
+
+
+async def aget_cache_versions(keys, timeout=60 * 60 * 24):
+    """``get_cache_versions`` para las vistas async (``core.async_cache``)."""
+    versions = await async_cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            initial = int(time.time() * 1000)
+            await async_cache.add(key, initial, timeout)
+            versions[key] = await async_cache.get(key) or initial
+    _pin_recent_versions(versions.values())
+    return [versions[key] for key in keys]
+
+
+def _pin_recent_versions(versions):
     """
-    Invalidar cache basado en un patrón.
+    Cada versión es la hora (ms) en que se creó, la primera lectura tras
+    invalidarla. Lo que se cachee con una versión tan reciente debe leerse de
+    ``default``: una réplica atrasada devolvería los datos de antes de la
+    escritura, que quedarían guardados con la versión nueva hasta su TTL.
+    """
+    if versions:
+        pin_if_recent_change(max(versions) / 1000)
+
+
+def invalidate_cache_versions(keys):
+    """
+    Invalidar todas las entradas que dependen de las claves de versión dadas.
+
+    Borrar la versión hace que la siguiente lectura genere una nueva, por lo
+    que las entradas anteriores quedan inaccesibles y expiran solas por TTL.
+    """
+    cache.delete_many(keys)
+
+
+NAMESPACE_VERSION_KEY = 'ns:{namespace}:version'
+
+
+def get_namespace_versions(namespaces):
+    """
+    Obtener la versión actual de cada namespace (ej: 'posts', 'categories').
+
+    Returns:
+        dict: ``{namespace: version}``
+    """
+    keys = [NAMESPACE_VERSION_KEY.format(namespace=ns) for ns in namespaces]
+    return dict(zip(namespaces, get_cache_versions(keys)))
+
+
+async def aget_namespace_versions(namespaces):
+    keys = [NAMESPACE_VERSION_KEY.format(namespace=ns) for ns in namespaces]
+    return dict(zip(namespaces, await aget_cache_versions(keys)))
+
+
+def namespace_key_prefix(namespaces):
+    """
+    Prefijo de clave que cambia cada vez que se invalida alguno de los
+    namespaces, para usar como ``key_prefix`` de ``cache_page``.
+
+    Ejemplo:
+        namespace_key_prefix(['posts', 'authors'])  # 'posts.17:authors.3'
+    """
+    versions = get_namespace_versions(namespaces)
+    return ':'.join(f"{ns}.{versions[ns]}" for ns in namespaces)
+
+
+async def anamespace_key_prefix(namespaces):
+    versions = await aget_namespace_versions(namespaces)
+    return ':'.join(f"{ns}.{versions[ns]}" for ns in namespaces)
+
+
+def invalidate_namespaces(*namespaces):
+    """
+    Invalidar todas las entradas que dependen de los namespaces dados en O(1),
+    sin recorrer las claves de Redis.
+
+    Ejemplo:
+        invalidate_namespaces('posts')
+    """
+    invalidate_cache_versions([NAMESPACE_VERSION_KEY.format(namespace=ns) for ns in namespaces])
+
+
+# Alias con datos regenerables: las sesiones y 'durable' nunca se vacían
+CLEARABLE_CACHES = ('default', 'pages')
+
+SCAN_BATCH_SIZE = 500
+UNLINK_CHUNK_SIZE = 100
+
+
+def _unlink_batch(target, redis_conn, keys):
+    """
+    Borrar un lote de claves con UNLINK (la memoria se libera en segundo
+    plano) en un pipeline, y descartar sus copias en memoria de cada proceso.
+    """
+    pipe = redis_conn.pipeline(transaction=False)
+    for i in range(0, len(keys), UNLINK_CHUNK_SIZE):
+        pipe.unlink(*keys[i:i + UNLINK_CHUNK_SIZE])
+    deleted = sum(pipe.execute())
+    # Con core.cache_backends.TwoTierRedisCache, descartar también las copias
+    # en memoria de cada proceso
+    if hasattr(target, 'invalidate_local'):
+        target.invalidate_local(keys)
+    return deleted
+
+
+def invalidate_cache(pattern, alias='default', batch_size=SCAN_BATCH_SIZE):
+    """
+    Invalidar cache basado en un patrón, sin bloquear Redis.
+
+    Recorre las claves con ``SCAN`` incremental (no ``KEYS``) y las borra con
+    ``UNLINK`` en lotes de ``batch_size``. El patrón se aplica dentro del
+    ``KEY_PREFIX`` del alias, así que nunca toca las claves de otra caché.
     
     Args:
         pattern: Patrón para buscar claves (ej: 'posts:*', 'categories:*')
+        alias: Caché donde buscar (``default`` o ``pages``)
+        batch_size: Claves por iteración de SCAN y por lote de UNLINK
+
+    Returns:
+        int: Número de claves borradas
     
     Ejemplo:
         invalidate_cache('posts:*')
     """
+    target = caches[alias]
+    deleted = 0
     try:
-        redis_conn = cache.get_master_client()
-        keys = redis_conn.keys(pattern)
-        if keys:
-            redis_conn.delete(*keys)
-            return len(keys)
+        redis_conn = target.client.get_client(write=True)
+        batch = []
+        for key in redis_conn.scan_iter(match=target.client.make_pattern(pattern), count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                deleted += _unlink_batch(target, redis_conn, batch)
+                batch = []
+        if batch:
+            deleted += _unlink_batch(target, redis_conn, batch)
     except Exception as e:
-        print(f"Error invalidando cache: {e}")
-        return 0
+        logger.error(f"Cache invalidation failed for {alias}:{pattern}: {e}")
+    return deleted
 
 
 def get_cache_stats():
@@ -59,29 +314,52 @@ def get_cache_stats():
         dict: Estadísticas del cache o None si no hay Redis
     """
     try:
-        redis_conn = cache.get_master_client()
+        redis_conn = cache.client.get_client(write=True)
         info = redis_conn.info()
         return {
             'total_keys': redis_conn.dbsize(),
             'memory_used': info.get('used_memory_human', 'N/A'),
             'hits': info.get('keyspace_hits', 0),
             'misses': info.get('keyspace_misses', 0),
+            'tiers': get_cache_tier_stats(),
         }
     except Exception:
         return None
 
 
-def clear_all_cache():
+def get_cache_tier_stats():
+    """
+    Aciertos y fallos por nivel (L1 en memoria / L2 Redis) de este proceso,
+    para cada caché con L1.
+
+    Returns:
+        dict: ``{alias: estadísticas}`` o None si ninguna caché tiene L1
+    """
+    stats = {
+        alias: caches[alias].tier_stats()
+        for alias in CLEARABLE_CACHES
+        if alias in settings.CACHES and hasattr(caches[alias], 'tier_stats')
+    }
+    return stats or None
+
+
+def clear_all_cache(aliases=CLEARABLE_CACHES):
     """
-    Limpiar todo el cache.
+    Limpiar las cachés de datos y de páginas.
+
+    Solo borra las claves bajo el ``KEY_PREFIX`` de cada alias (con SCAN y
+    UNLINK, ver ``invalidate_cache``), nunca ``FLUSHDB``: las sesiones y el
+    estado en ``durable`` no se tocan.
     
     Returns:
         bool: True si se limpió correctamente
     """
     try:
-        cache.clear()
+        for alias in aliases:
+            invalidate_cache('*', alias=alias)
+            if hasattr(caches[alias], 'clear_local'):
+                caches[alias].clear_local()
         return True
     except Exception as e:
-        print(f"Error limpiando cache: {e}")
+        logger.error(f"Cache clear failed: {e}")
         return False
-
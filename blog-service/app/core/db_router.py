@@ -0,0 +1,187 @@
+"""
+Router de base de datos con réplicas de lectura.
+
+Las lecturas de las peticiones HTTP se reparten entre las réplicas
+configuradas (``DB_REPLICA_HOSTS``) siempre que su retraso de replicación
+esté por debajo de ``REPLICA_ROUTING['MAX_LAG_SECONDS']``. Todo lo demás va a
+``default``:
+
+- las escrituras, y las lecturas posteriores de la misma petición;
+- las peticiones dentro de la ventana de read-your-writes tras una escritura
+  (cookie que pone ``ReadYourWritesMiddleware``);
+- el código fuera de una petición (comandos, shell, tareas), para no leer
+  datos atrasados justo antes de escribir;
+- las peticiones que rellenan la caché justo después de invalidarla
+  (``pin_if_recent_change``), para no guardar en ella datos atrasados.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_LAG_SECONDS': 5,
+    'LAG_CHECK_INTERVAL': 5,
+    'READ_YOUR_WRITES_SECONDS': 10,
+    'COOKIE_NAME': 'db_primary',
+}
+
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Estado de enrutado de la petición en curso: None fuera de una petición
+_routing_state = ContextVar('db_routing_state', default=None)
+
+_lag_cache = {}
+_lag_lock = threading.Lock()
+
+
+def routing_settings():
+    return {**DEFAULTS, **getattr(settings, 'REPLICA_ROUTING', {})}
+
+
+def get_replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def start_request(pinned=False):
+    """Abre el estado de enrutado de una petición. Devuelve el token para ``end_request``."""
+    return _routing_state.set({'pinned': pinned, 'wrote': False})
+
+
+def end_request(token):
+    state = _routing_state.get()
+    _routing_state.reset(token)
+    return state
+
+
+def pin_to_primary():
+    """Hace que el resto de la petición lea de ``default``."""
+    state = _routing_state.get()
+    if state is not None:
+        state['pinned'] = True
+
+
+def max_replica_delay():
+    """
+    Segundos que una réplica sana puede ir por detrás de ``default``: el
+    retraso admitido más lo que puede crecer mientras está cacheado.
+    """
+    options = routing_settings()
+    return options['MAX_LAG_SECONDS'] + options['LAG_CHECK_INTERVAL']
+
+
+def pin_if_recent_change(changed_at):
+    """
+    Hace que el resto de la petición lea de ``default`` si ``changed_at``
+    (segundos desde epoch) es tan reciente que una réplica puede no tener
+    todavía ese cambio.
+    """
+    if time.time() - changed_at < max_replica_delay():
+        pin_to_primary()
+
+
+@contextmanager
+def use_primary():
+    """Lee de ``default`` dentro del bloque, aunque la petición pudiera ir a réplica."""
+    token = _routing_state.set({'pinned': True, 'wrote': False})
+    try:
+        yield
+    finally:
+        _routing_state.reset(token)
+
+
+def get_replica_lag(alias):
+    """
+    Retraso de replicación de ``alias`` en segundos, cacheado en el proceso
+    durante ``LAG_CHECK_INTERVAL``. None si la réplica no responde.
+    """
+    interval = routing_settings()['LAG_CHECK_INTERVAL']
+    now = time.monotonic()
+    cached = _lag_cache.get(alias)
+    if cached is not None and now - cached[0] < interval:
+        return cached[1]
+
+    with _lag_lock:
+        cached = _lag_cache.get(alias)
+        if cached is not None and now - cached[0] < interval:
+            return cached[1]
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_QUERY)
+                lag = float(cursor.fetchone()[0])
+        except Exception as e:
+            logger.warning(f"Replica {alias} unavailable: {e}")
+            lag = None
+        _lag_cache[alias] = (now, lag)
+    return lag
+
+
+def get_healthy_replicas():
+    max_lag = routing_settings()['MAX_LAG_SECONDS']
+    return [
+        alias for alias in get_replica_aliases()
+        if (lag := get_replica_lag(alias)) is not None and lag <= max_lag
+    ]
+
+
+def get_replica_status():
+    """Estado de cada réplica para ``/healthz``."""
+    max_lag = routing_settings()['MAX_LAG_SECONDS']
+    status = {}
+    for alias in get_replica_aliases():
+        lag = get_replica_lag(alias)
+        if lag is None:
+            state = 'error'
+        elif lag > max_lag:
+            state = 'lagging'
+        else:
+            state = 'ok'
+        status[alias] = {
+            'host': settings.DATABASES[alias]['HOST'],
+            'status': state,
+            'lag_seconds': None if lag is None else round(lag, 3),
+        }
+    return status
+
+
+class ReplicaRouter:
+    """
+    Uso en settings:
+        DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or state['pinned']:
+            return DEFAULT_DB_ALIAS
+        replicas = get_healthy_replicas()
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state['pinned'] = True
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las réplicas tienen los mismos datos que el primario
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -2,6 +2,8 @@
 Filtros personalizados para el Blog Service
 """
 import django_filters
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.db import models
 
 
@@ -71,3 +73,38 @@ class MultiFieldSearchFilter:
             queryset = queryset.filter(q_objects)
         return queryset
 
+
+
+class FullTextSearchFilter:
+    """
+    Búsqueda full-text sobre un ``SearchVectorField`` con resultados
+    ordenados por relevancia.
+
+    Combina una consulta por cada configuración de
+    ``FULL_TEXT_SEARCH_CONFIGS`` y admite la sintaxis de búsqueda web
+    (``"frase exacta"``, ``-excluir``, ``or``).
+
+    Uso:
+        class MyViewSet(viewsets.ReadOnlyModelViewSet):
+            search_vector_field = 'search_vector'
+            filter_backends = [FullTextSearchFilter]
+    """
+    search_param = 'search'
+
+    def get_search_query(self, search):
+        query = None
+        for config in getattr(settings, 'FULL_TEXT_SEARCH_CONFIGS', ['spanish', 'english']):
+            config_query = SearchQuery(search, config=config, search_type='websearch')
+            query = config_query if query is None else query | config_query
+        return query
+
+    def filter_queryset(self, request, queryset, view):
+        search = request.query_params.get(self.search_param, '').strip()
+        if not search:
+            return queryset
+        field = view.search_vector_field
+        query = self.get_search_query(search)
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.filter(**{field: query}).annotate(
+            search_rank=SearchRank(models.F(field), query)
+        ).order_by('-search_rank', *ordering)
@@ -0,0 +1,61 @@
+"""
+Instrumentación de rendimiento por petición.
+
+``PerformanceMiddleware`` mide el tiempo total de todas las peticiones y lo
+acumula en un histograma de latencias por vista (``/metrics``). En las
+peticiones muestreadas (``PERFORMANCE_INSTRUMENTATION['SAMPLE_RATE']``)
+desglosa además:
+
+- SQL: número de consultas y tiempo, con ``connection.execute_wrapper``.
+- Redis: llamadas, tiempo y aciertos/fallos de GET/MGET, con el cliente
+  ``InstrumentedRedis`` (``OPTIONS['REDIS_CLIENT_CLASS']`` de cada caché),
+  más los aciertos en la caché en memoria (``core.cache_backends``).
+- Serialización: los bloques ``timed_serialization`` de las vistas
+  (``serializer.data`` con ``TimedSerializationMixin`` y los caminos rápidos
+  del listado), sin la E/S, que cuenta en SQL y Redis.
+
+La parte común con auth-service (métricas base, wrappers de SQL y Redis,
+histogramas y log) está en ``service_core.instrumentation``; aquí solo los
+aciertos en memoria, que son del blog.
+
+El desglose se devuelve en la cabecera ``Server-Timing`` y en una línea de
+log ``key=value`` del logger ``performance``. Las peticiones no muestreadas
+no instalan ningún wrapper.
+
+Con ASGI las consultas del ORM async se ejecutan en otro hilo, con sus
+propias conexiones: ahí el wrapper se instala al crear cada conexión
+(``instrument_async_connections``) y no hace nada si la petición no se
+muestrea. El cliente async de Redis es ``InstrumentedAsyncRedis``.
+"""
+from service_core import instrumentation as base
+from service_core.instrumentation import (  # noqa: F401 (el servicio los importa desde aquí)
+    InstrumentedAsyncRedis, InstrumentedRedis, current_metrics, get_view_name, histograms,
+    instrument_async_connections, instrumentation_settings, log_request, timed_serialization,
+)
+
+
+class RequestMetrics(base.RequestMetrics):
+    """Contadores de una petición muestreada, más los aciertos en la caché en memoria."""
+
+    __slots__ = ('l1_hits',)
+
+    def __init__(self):
+        super().__init__()
+        self.l1_hits = 0
+
+    def timing_entries(self):
+        return [*super().timing_entries(), f'l1;desc="{self.l1_hits} hits"']
+
+    def log_fields(self):
+        return {**super().log_fields(), 'l1_hits': self.l1_hits}
+
+
+def record_l1_hits(count=1):
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.l1_hits += count
+
+
+def sample_request():
+    """``service_core.instrumentation.sample_request`` con el ``RequestMetrics`` del blog."""
+    return base.sample_request(RequestMetrics)
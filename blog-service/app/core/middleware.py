@@ -0,0 +1,129 @@
+import random
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.permissions import SAFE_METHODS
+from .db_router import end_request, routing_settings, start_request
+from .instrumentation import (
+    get_view_name, histograms, instrument_async_connections, instrumentation_settings,
+    log_request, sample_request,
+)
+
+
+class HybridMiddleware:
+    """
+    Base de los middleware del servicio: funcionan con WSGI y con ASGI sin
+    que Django tenga que adaptarlos (cada adaptación es un salto de hilo por
+    petición). Las subclases implementan ``__call__`` y ``__acall__``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+
+class ReadYourWritesMiddleware(HybridMiddleware):
+    """
+    Fija al primario las peticiones que escriben y, durante
+    ``READ_YOUR_WRITES_SECONDS``, las siguientes del mismo cliente (cookie),
+    para que no lean de una réplica que aún no tiene su escritura.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        options, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            state = end_request(token)
+        return self.finish(response, options, state)
+
+    async def __acall__(self, request):
+        options, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = end_request(token)
+        return self.finish(response, options, state)
+
+    def start(self, request):
+        options = routing_settings()
+        pinned = (
+            request.method not in SAFE_METHODS
+            or options['COOKIE_NAME'] in request.COOKIES
+        )
+        return options, start_request(pinned)
+
+    def finish(self, response, options, state):
+        if state['wrote'] and options['READ_YOUR_WRITES_SECONDS']:
+            response.set_cookie(
+                options['COOKIE_NAME'], '1',
+                max_age=options['READ_YOUR_WRITES_SECONDS'],
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class PerformanceMiddleware(HybridMiddleware):
+    """
+    Mide cada petición (ver ``core.instrumentation``): tiempo total en el
+    histograma de su vista y, en las muestreadas, desglose de SQL, Redis y
+    serialización en la cabecera ``Server-Timing`` y en el log.
+
+    Va la primera en ``MIDDLEWARE`` para que el total incluya el resto.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.options = instrumentation_settings()
+        if not self.options['ENABLED']:
+            raise MiddlewareNotUsed
+        if self.is_async:
+            instrument_async_connections()
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        if random.random() >= self.options['SAMPLE_RATE']:
+            response = self.get_response(request)
+            histograms.observe(get_view_name(request), (time.perf_counter() - started) * 1000)
+            return response
+
+        with sample_request() as metrics:
+            response = self.get_response(request)
+        return self.report(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        if random.random() >= self.options['SAMPLE_RATE']:
+            response = await self.get_response(request)
+            histograms.observe(get_view_name(request), (time.perf_counter() - started) * 1000)
+            return response
+
+        with sample_request() as metrics:
+            response = await self.get_response(request)
+        return self.report(request, response, metrics, started)
+
+    def report(self, request, response, metrics, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        view = get_view_name(request)
+        histograms.observe(view, total_ms)
+
+        if self.options['SERVER_TIMING']:
+            response['Server-Timing'] = metrics.server_timing(total_ms)
+        if self.options['LOG']:
+            fields = {
+                'view': view,
+                'method': request.method,
+                'status': response.status_code,
+                'total_ms': round(total_ms, 2),
+                **metrics.log_fields(),
+            }
+            log_request(fields)
+        return response
@@ -1,23 +1,60 @@
 """
 Mixins útiles para Views y ViewSets
 """
+import hashlib
 from django.views.decorators.cache import cache_page
+from django.utils.cache import get_conditional_response
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date
 from rest_framework import status
 from rest_framework.response import Response
+from .cache_helpers import get_namespace_versions, namespace_key_prefix
+from .instrumentation import timed_serialization
+
+
+def conditional_validators(request, versions):
+    """
+    ``(etag, last_modified)`` de una petición a partir de las versiones
+    ``{namespace: versión}`` de las que depende (ver ``ConditionalGetMixin``).
+    """
+    fingerprint = '|'.join([
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        *(f'{ns}.{version}' for ns, version in versions.items()),
+    ])
+    etag = f'W/"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+    last_modified = max(versions.values()) // 1000 if versions else None
+    return etag, last_modified
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
 
 
 class CacheMixin:
     """
     Mixin para agregar cache a los métodos de un ViewSet.
+
+    Las claves incluyen la versión de cada namespace de ``cache_namespaces``,
+    así que al invalidar un namespace (ver ``signals.py`` de cada app) todas las
+    páginas que dependen de él dejan de servirse sin esperar al TTL.
     
     Uso:
         class MyViewSet(CacheMixin, viewsets.ReadOnlyModelViewSet):
             cache_timeout = 60
             cache_actions = ['list', 'retrieve']
+            cache_namespaces = ['posts', 'categories']
+
+    Las páginas se guardan en la caché ``cache_alias`` (``pages``), separada
+    de los datos y de las sesiones.
     """
     cache_timeout = 60
     cache_actions = ['list', 'retrieve']
+    cache_namespaces = []
+    cache_alias = 'pages'
 
     def get_cache_timeout(self):
         """Override para retornar timeout dinámico."""
@@ -27,9 +64,15 @@ class CacheMixin:
         """
         Aplica cache según cache_actions.
         """
-        if self.action in self.cache_actions:
+        # self.action todavía no existe: DRF lo asigna dentro de dispatch()
+        action = self.action_map.get(request.method.lower())
+        if action in self.cache_actions:
             timeout = self.get_cache_timeout()
-            decorator = cache_page(timeout)
+            decorator = cache_page(
+                timeout,
+                cache=self.cache_alias,
+                key_prefix=namespace_key_prefix(self.cache_namespaces),
+            )
             # Aplicar decorador solo a métodos especificados
             original_dispatch = super().dispatch
             wrapper = decorator(original_dispatch)
@@ -37,6 +80,79 @@ class CacheMixin:
         return super().dispatch(request, *args, **kwargs)
 
 
+class ConditionalGetMixin:
+    """
+    Mixin que responde ``304 Not Modified`` a las peticiones condicionales
+    (``If-None-Match`` / ``If-Modified-Since``) antes de consultar la caché de
+    páginas, la base de datos o los serializers.
+
+    Los validadores salen de las versiones de ``cache_namespaces`` en Redis
+    (una sola lectura): el ETag combina las versiones con la URL completa y
+    la cabecera Accept, y como cada versión es el instante en milisegundos en
+    que se invalidó el namespace, la mayor sirve como Last-Modified.
+
+    ``validator_namespaces`` se suman solo a los validadores: cambian el
+    ETag sin invalidar las páginas cacheadas (p. ej. el volcado de views).
+
+    Debe ir antes de ``CacheMixin`` en la herencia y solo en endpoints
+    públicos, porque se evalúa antes de la autenticación.
+
+    Uso:
+        class MyViewSet(ConditionalGetMixin, CacheMixin, viewsets.ReadOnlyModelViewSet):
+            conditional_actions = ['list']
+            cache_namespaces = ['posts', 'categories']
+    """
+    conditional_actions = ['list', 'retrieve']
+    validator_namespaces = []
+
+    def get_conditional_validators(self, request):
+        """Devuelve ``(etag, last_modified)`` de la petición."""
+        namespaces = [*self.cache_namespaces, *self.validator_namespaces]
+        return conditional_validators(request, get_namespace_versions(namespaces))
+
+    def dispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        if action not in self.conditional_actions or request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = self.get_conditional_validators(request)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, last_modified)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            self.set_validators(response, etag, last_modified)
+        return response
+
+    def set_validators(self, response, etag, last_modified):
+        return set_validators(response, etag, last_modified)
+
+
+class TimedSerializationMixin:
+    """
+    ``list`` y ``retrieve`` de DRF midiendo solo ``serializer.data`` como
+    serialización (``Server-Timing``): la página o el objeto se cargan antes,
+    así que sus consultas cuentan como SQL.
+
+    Debe ir antes del ViewSet de DRF en la herencia.
+    """
+
+    def serialized_data(self, serializer):
+        with timed_serialization():
+            return serializer.data
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.serialized_data(self.get_serializer(page, many=True)))
+        return Response(self.serialized_data(self.get_serializer(list(queryset), many=True)))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.serialized_data(self.get_serializer(self.get_object())))
+
+
 class SoftDeleteMixin:
     """
     Mixin para soft delete de objetos.
@@ -1,21 +1,188 @@
 """
 Paginación personalizada para el Blog Service
 """
-from rest_framework.pagination import PageNumberPagination
+import base64
+import hashlib
+import json
+import time
+from datetime import date, datetime
+from functools import partial
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from .async_cache import cache as async_cache
+from .cache_helpers import (
+    CachedResult, anamespace_key_prefix, get_or_compute, namespace_key_prefix, new_entry,
+)
 
+DEFAULT_COUNT_OPTIONS = {
+    # Por encima de esta estimación se devuelve el conteo aproximado
+    'APPROXIMATE_THRESHOLD': 10000,
+    'CACHE_TIMEOUT': 60 * 5,
+}
 
-class StandardResultsSetPagination(PageNumberPagination):
+
+def count_options():
+    return {**DEFAULT_COUNT_OPTIONS, **getattr(settings, 'PAGINATION_COUNT', {})}
+
+
+class CountingPaginator(Paginator):
     """
-    Paginación estándar con 10 resultados por página.
+    Paginator de Django con una estrategia de conteo más barata que
+    ``COUNT(*)`` en cada petición.
+
+    El resultado se cachea por firma del queryset (SQL y parámetros) y por la
+    versión de los ``namespaces`` de los que depende, así que una escritura
+    lo invalida. Si la estimación del planificador de Postgres supera
+    ``PAGINATION_COUNT['APPROXIMATE_THRESHOLD']`` se usa la estimación en
+    lugar del conteo exacto y ``count_is_approximate`` queda a True.
     """
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+
+    def __init__(self, object_list, per_page, namespaces=(), **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.namespaces = list(namespaces)
+        self.count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        """
+        Con la caché, ``get_or_compute``: cada escritura cambia la clave del
+        conteo, y sin single-flight todos los workers lo recalcularían a la vez.
+        """
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+
+        options = count_options()
+        cache_key = self._get_cache_key(namespace_key_prefix(self.namespaces))
+        if cache_key:
+            self.count_is_approximate, count = get_or_compute(
+                cache_key, partial(self._count, options), timeout=options['CACHE_TIMEOUT']
+            )
+        else:
+            self.count_is_approximate, count = self._count(options)
+        return count
+
+    def _count(self, options):
+        """``(es_aproximado, conteo)`` del queryset, sin caché."""
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate > options['APPROXIMATE_THRESHOLD']:
+            return True, estimate
+        return False, self.object_list.count()
+
+    async def acount(self):
+        """
+        ``count`` con el ORM y la caché async (mismas entradas de caché, sin
+        el lock de single-flight). Deja el resultado en ``count``, así que el
+        resto del paginator lo usa sin volver a contar.
+        """
+        if 'count' in self.__dict__ or not isinstance(self.object_list, QuerySet):
+            return self.count
+
+        options = count_options()
+        cache_key = self._get_cache_key(await anamespace_key_prefix(self.namespaces))
+        entry = await async_cache.get(cache_key) if cache_key else None
+        if isinstance(entry, CachedResult) and time.time() < entry.expires_at:
+            self.count_is_approximate, count = entry.value
+        else:
+            started = time.time()
+            estimate = await aestimate_count(self.object_list)
+            if estimate is not None and estimate > options['APPROXIMATE_THRESHOLD']:
+                count, self.count_is_approximate = estimate, True
+            else:
+                count = await self.object_list.acount()
+            if cache_key:
+                value = (self.count_is_approximate, count)
+                ttl = options['CACHE_TIMEOUT']
+                await async_cache.set(cache_key, new_entry(value, started, ttl), ttl)
+
+        self.__dict__['count'] = count
+        return count
+
+    def _get_cache_key(self, namespace_prefix):
+        try:
+            sql, params = self.object_list.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        signature = hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+        return f'count:{signature}:{namespace_prefix}'
+
+
+def estimate_count(queryset):
+    """
+    Número de filas estimado por el planificador de Postgres para el
+    queryset (``EXPLAIN``, que usa ``reltuples`` y las estadísticas de la
+    tabla). Devuelve None si la base de datos no es Postgres o si falla.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    try:
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception:
+        return None
+
+
+async def aestimate_count(queryset):
+    """``estimate_count`` con el ORM async."""
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    try:
+        plan = json.loads(await queryset.order_by().aexplain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception:
+        return None
+
+
+class CountedPagination(PageNumberPagination):
+    """
+    Base de las paginaciones por número de página: conteo vía
+    ``CountingPaginator`` y bandera ``count_is_approximate`` en la respuesta.
+
+    Las vistas con ``cache_namespaces`` (ver ``CacheMixin``) invalidan el
+    conteo cacheado con los mismos namespaces que sus páginas.
+    """
+    count_namespaces = ()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_namespaces = getattr(view, 'cache_namespaces', None) or self.count_namespaces
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        ``paginate_queryset`` para las vistas async (``core.async_views``):
+        el conteo y la página se leen con el ORM async.
+        """
+        self.count_namespaces = getattr(view, 'cache_namespaces', None) or self.count_namespaces
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        await paginator.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [item async for item in self.page.object_list]
+        return list(self.page)
+
+    @property
+    def django_paginator_class(self):
+        return partial(CountingPaginator, namespaces=self.count_namespaces)
 
     def get_paginated_response(self, data):
         return Response({
             'count': self.page.paginator.count,
+            'count_is_approximate': self.page.paginator.count_is_approximate,
             'page_size': self.page_size,
             'total_pages': self.page.paginator.num_pages,
             'current_page': self.page.number,
@@ -25,7 +192,16 @@ class StandardResultsSetPagination(PageNumberPagination):
         })
 
 
-class LargeResultsSetPagination(PageNumberPagination):
+class StandardResultsSetPagination(CountedPagination):
+    """
+    Paginación estándar con 10 resultados por página.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class LargeResultsSetPagination(CountedPagination):
     """
     Paginación para grandes conjuntos de resultados.
     """
@@ -33,19 +209,8 @@ class LargeResultsSetPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 200
 
-    def get_paginated_response(self, data):
-        return Response({
-            'count': self.page.paginator.count,
-            'page_size': self.page_size,
-            'total_pages': self.page.paginator.num_pages,
-            'current_page': self.page.number,
-            'next': self.get_next_link(),
-            'previous': self.get_previous_link(),
-            'results': data
-        })
-
 
-class SmallResultsSetPagination(PageNumberPagination):
+class SmallResultsSetPagination(CountedPagination):
     """
     Paginación pequeña para listas cortas.
     """
@@ -53,14 +218,154 @@ class SmallResultsSetPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 20
 
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por keyset (cursor) para feeds de scroll infinito.
+
+    En lugar de ``OFFSET`` y ``COUNT(*)`` filtra por la posición del último
+    elemento visto según ``ordering``, así que cada página cuesta lo mismo a
+    cualquier profundidad. El último campo de ``ordering`` debe ser único
+    para desempatar. Los cursores son opacos (JSON en base64).
+
+    Las filas con NULL en algún campo de ``ordering`` no tienen posición en
+    el orden, así que no entran en el feed.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-published_at', '-created_at', '-id')
+    invalid_cursor_message = 'Cursor inválido'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position, reverse = self._page_queryset(queryset, request)
+        return self._set_page(list(queryset), position, reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` con el ORM async."""
+        queryset, position, reverse = self._page_queryset(queryset, request)
+        return self._set_page([item async for item in queryset], position, reverse)
+
+    def _page_queryset(self, queryset, request):
+        """Queryset de la página pedida, con un elemento más para saber si hay siguiente."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self._reverse_ordering() if reverse else self.ordering
+        queryset = queryset.filter(**{
+            f'{field.name}__isnull': False for field in self._ordering_fields(queryset.model) if field.null
+        }).order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after_position(position, ordering))
+        return queryset[:self.page_size + 1], position, reverse
+
+    def _set_page(self, results, position, reverse):
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else position is not None
+        self.page = results
+        return results
+
     def get_paginated_response(self, data):
         return Response({
-            'count': self.page.paginator.count,
             'page_size': self.page_size,
-            'total_pages': self.page.paginator.num_pages,
-            'current_page': self.page.number,
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'results': data
         })
 
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        """
+        Devuelve ``(posición, reverse)``; ``(None, False)`` en la primera
+        página. Cada valor de la posición se convierte al tipo de su campo de
+        ``model``: un cursor manipulado da 404, no un error en la consulta.
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            values = payload['p']
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            position = []
+            for field, value in zip(self._ordering_fields(model), values):
+                value = None if value is None else field.to_python(value)
+                if value is None:
+                    raise ValueError
+                position.append(value)
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _ordering_fields(self, model):
+        return [model._meta.get_field(field.lstrip('-')) for field in self.ordering]
+
+    def _reverse_ordering(self):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering)
+
+    def _position(self, item):
+        """Valores de los campos de ``ordering`` del elemento, serializables en JSON."""
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = item[name] if isinstance(item, dict) else getattr(item, name)
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def _after_position(self, position, ordering):
+        """
+        Condición "viene después de ``position``" para un orden compuesto:
+        ``a < p0 OR (a = p0 AND b < p1) OR (a = p0 AND b = p1 AND c < p2)``.
+
+        El primer campo se acota además por separado para que Postgres
+        recorra el índice compuesto como un rango.
+        """
+        names = [field.lstrip('-') for field in ordering]
+        lookups = ['lt' if field.startswith('-') else 'gt' for field in ordering]
+
+        condition = Q()
+        for i, name in enumerate(names):
+            step = Q(**{f'{name}__{lookups[i]}': position[i]})
+            for j in range(i):
+                step &= Q(**{names[j]: position[j]})
+            condition |= step
+
+        bound_lookup = 'lte' if lookups[0] == 'lt' else 'gte'
+        bound = Q(**{f'{names[0]}__{bound_lookup}': position[0]})
+        return bound & condition
@@ -0,0 +1,36 @@
+"""
+Renderers de la API.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` que serializa con orjson, varias veces más rápido que
+    el módulo ``json`` en listados grandes. La salida es el mismo JSON
+    compacto en UTF-8. Si orjson no está instalado se comporta como
+    ``JSONRenderer``.
+    """
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # Con "Accept: application/json; indent=4" se usa el renderer
+        # estándar, que sabe indentar con cualquier ancho
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Las fechas pasan por el encoder de DRF para mantener su formato
+        return orjson.dumps(
+            data,
+            default=self._encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME,
+        )
@@ -2,43 +2,100 @@ import logging
 from django.http import JsonResponse
 from django.db import connection
 from django_redis import get_redis_connection
+from .cache_helpers import get_cache_tier_stats
+from .db_router import get_replica_status
+from .instrumentation import histograms, instrumentation_settings
 
 logger = logging.getLogger(__name__)
 
+# Check de healthz -> alias de caché cuya instancia de Redis se comprueba
+REDIS_CHECKS = {
+    'redis': 'durable',
+    'redis_cache': 'default',
+}
 
-def healthz(request):
+
+def get_connection_stats():
     """
-    Endpoint de healthcheck que verifica:
-    - Conexión a PostgreSQL
-    - Conexión a Redis
+    Estado de las conexiones a PostgreSQL del proceso: estadísticas del pool
+    si se usa ``service_core.db.backends.postgresql_pool`` o, si no, la
+    configuración de conexiones persistentes.
     """
-    status_code = 200
-    health_status = {
-        'status': 'healthy',
-        'checks': {}
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        return {'pooled': True, **pool.stats()}
+    return {
+        'pooled': False,
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+        'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
     }
 
-    # Verificar PostgreSQL
+
+def check_database():
     try:
         with connection.cursor() as cursor:
             cursor.execute("SELECT 1")
-            health_status['checks']['database'] = 'ok'
+        return 'ok'
     except Exception as e:
         logger.error(f"Database check failed: {e}")
-        health_status['checks']['database'] = 'error'
-        status_code = 503
+        return 'error'
+
 
-    # Verificar Redis
+def check_redis(alias):
     try:
-        redis_conn = get_redis_connection('default')
-        redis_conn.ping()
-        health_status['checks']['redis'] = 'ok'
+        get_redis_connection(alias).ping()
+        return 'ok'
     except Exception as e:
-        logger.error(f"Redis check failed: {e}")
-        health_status['checks']['redis'] = 'error'
-        status_code = 503
+        logger.error(f"Redis check failed for {alias}: {e}")
+        return 'error'
+
+
+def health_response(checks):
+    """
+    Respuesta de healthz con el resultado de ``checks`` (503 si alguno
+    falla), las estadísticas de conexiones a la base de datos, los aciertos
+    por nivel de la caché y el estado de las réplicas de lectura.
+    """
+    health_status = {
+        'status': 'unhealthy' if 'error' in checks.values() else 'healthy',
+        'checks': checks,
+    }
 
-    if 'error' in [v for v in health_status['checks'].values()]:
-        health_status['status'] = 'unhealthy'
+    health_status['database_connections'] = get_connection_stats()
 
-    return JsonResponse(health_status, status=status_code)
+    cache_tiers = get_cache_tier_stats()
+    if cache_tiers:
+        health_status['cache'] = cache_tiers
+
+    # Las réplicas se informan pero no marcan el servicio como unhealthy:
+    # si fallan, las lecturas vuelven al primario
+    replicas = get_replica_status()
+    if replicas:
+        health_status['replicas'] = replicas
+
+    return JsonResponse(health_status, status=503 if health_status['status'] == 'unhealthy' else 200)
+
+
+def healthz(request):
+    """
+    Endpoint de healthcheck que verifica:
+    - Conexión a PostgreSQL
+    - Conexión a Redis (instancia persistente y de caché)
+    """
+    checks = {'database': check_database()}
+    for check, alias in REDIS_CHECKS.items():
+        checks[check] = check_redis(alias)
+    return health_response(checks)
+
+
+def metrics(request):
+    """
+    Histogramas de latencia por vista del proceso que responde (cada worker
+    lleva los suyos), con percentiles aproximados por bucket.
+    """
+    options = instrumentation_settings()
+    return JsonResponse({
+        'enabled': options['ENABLED'],
+        'sample_rate': options['SAMPLE_RATE'],
+        'views': histograms.snapshot(),
+    })
@@ -4,9 +4,19 @@ from .models import Post
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ['title', 'author', 'category', 'status', 'published_at', 'views']
+    list_display = ['title', 'author', 'category', 'status', 'published_at', 'views', 'reading_time']
     list_filter = ['status', 'category', 'author']
+    list_select_related = ['author', 'category']
     search_fields = ['title', 'body']
     prepopulated_fields = {'slug': ('title',)}
+    readonly_fields = ['excerpt', 'word_count', 'reading_time']
     date_hierarchy = 'published_at'
 
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith('_changelist'):
+            # El changelist no muestra el body: no cargarlo por cada fila
+            queryset = queryset.defer('body', 'search_vector')
+        return queryset
+
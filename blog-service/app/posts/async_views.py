@@ -0,0 +1,90 @@
+"""
+Versiones async de ``PostViewSet.list`` y ``PostViewSet.retrieve`` (ver
+``core.async_views``): mismo JSON, mismas cachés y mismos validadores.
+"""
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.csrf import csrf_exempt
+from core.async_views import (
+    READ_METHODS, afilter_queryset, apaginated_data, async_read_view, delegate, exception_response, get_view,
+    json_response,
+)
+from core.instrumentation import timed_serialization
+from .cache import (
+    aget_cached_detail, aget_detail_version, aget_list_fragments, aset_cached_detail, fragment_projection,
+)
+from .counters import aincrement_views
+from .fast_serialization import list_projection, serialize_list, serialize_list_row
+from .views import PostViewSet, detail_validators
+
+# Vistas síncronas (como las del router) para los métodos que no son de lectura
+sync_list = PostViewSet.as_view({'get': 'list'}, basename='post', detail=False)
+sync_detail = PostViewSet.as_view({'get': 'retrieve'}, basename='post', detail=True)
+
+
+@async_read_view(
+    PostViewSet.cache_namespaces, cache_timeout=PostViewSet.cache_timeout, fallback=sync_list,
+    validator_namespaces=PostViewSet.validator_namespaces,
+)
+async def post_list(request):
+    """Listado con los mismos modos que la vista síncrona: fragmentos, camino rápido o serializer."""
+    view = get_view(PostViewSet, request, 'list')
+    queryset = await afilter_queryset(view, view.get_queryset())
+
+    if view.list_fragment_cache:
+        async def serialize_missing(ids):
+            rows = [row async for row in list_projection(view.get_queryset().filter(pk__in=ids))]
+            with timed_serialization():
+                return {row['id']: serialize_list_row(row) for row in rows}
+
+        async def serialize(rows):
+            return await aget_list_fragments(rows, serialize_missing)
+
+        return await apaginated_data(view, fragment_projection(queryset), serialize)
+
+    if view.fast_list_serialization:
+        async def serialize(rows):
+            with timed_serialization():
+                return serialize_list(rows)
+
+        return await apaginated_data(view, list_projection(queryset), serialize)
+
+    async def serialize(posts):
+        with timed_serialization():
+            return view.get_serializer(posts, many=True).data
+
+    return await apaginated_data(view, queryset, serialize)
+
+
+@csrf_exempt
+async def post_detail(request, pk):
+    """
+    Detalle con incremento de views. Como en la vista síncrona, solo se
+    cachea el payload; las views y los validadores se resuelven siempre.
+    """
+    if request.method not in READ_METHODS:
+        return await delegate(sync_detail, request, pk=pk)
+
+    try:
+        version = await aget_detail_version(pk)
+        data = await aget_cached_detail(pk, version)
+        if data is None:
+            view = get_view(PostViewSet, request, 'retrieve', pk=pk)
+            instance = await view.get_queryset().filter(pk=pk).afirst()
+            if instance is None:
+                raise Http404
+            with timed_serialization():
+                data = view.get_serializer(instance).data
+            await aset_cached_detail(pk, version, data)
+    except Exception as exc:
+        return exception_response(exc, request)
+
+    data = dict(data)
+    data['views'] += await aincrement_views(data['id'])
+
+    response = json_response(data)
+    etag, last_modified = detail_validators(data, version)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
@@ -0,0 +1,175 @@
+"""
+Generación masiva de posts para pruebas de carga (``seed_blog --bulk``).
+
+Los textos siguen distribuciones de longitud parecidas a las de un blog real
+(cuerpos log-normales, títulos de 4 a 12 palabras) y los slugs se calculan en
+memoria con un sufijo único por ejecución y por fila, así que no hace falta
+consultar la base de datos para evitar colisiones.
+"""
+import csv
+import io
+import random
+import string
+import time
+from datetime import timedelta
+from django.db import connection, connections
+from django.utils import timezone
+from slugify import slugify
+from .models import Post
+from .text_stats import text_stats
+
+WORDS = (
+    'django python api rest caché redis postgres consulta índice servidor cliente '
+    'datos modelo vista plantilla prueba despliegue contenedor docker servicio '
+    'microservicio arquitectura rendimiento latencia memoria proceso hilo cola '
+    'mensaje evento usuario sesión token seguridad autenticación permiso error '
+    'registro métrica monitoreo escalado réplica transacción bloqueo lectura '
+    'escritura migración esquema tabla columna fila clave valor búsqueda texto '
+    'documento página listado detalle filtro orden cursor paginación respuesta '
+    'petición cabecera json formato serialización objeto clase función método '
+    'módulo paquete dependencia versión entorno configuración variable archivo '
+    'directorio red puerto protocolo http frontend backend navegador componente '
+    'estado interfaz diseño patrón práctica ejemplo guía tutorial introducción '
+    'avanzado básico rápido seguro simple eficiente moderno completo práctico '
+    'aprender construir optimizar implementar configurar desplegar medir probar '
+    'el la los las un una de del en con para por sobre entre como que es son y o'
+).split()
+
+COLUMNS = [
+    'title', 'slug', 'body', 'excerpt', 'word_count', 'reading_time',
+    'author_id', 'category_id', 'status',
+    'published_at', 'views', 'created_at', 'updated_at',
+]
+
+
+def make_run_tag():
+    """Identificador corto de la ejecución, para que los slugs no choquen con los de ejecuciones anteriores."""
+    value = int(time.time() * 1000)
+    digits = string.digits + string.ascii_lowercase
+    tag = ''
+    while value:
+        value, remainder = divmod(value, 36)
+        tag = digits[remainder] + tag
+    return tag
+
+
+def make_title(rng):
+    words = rng.choices(WORDS, k=rng.randint(4, 12))
+    return ' '.join(words).capitalize()[:200]
+
+
+def make_body(rng):
+    """Cuerpo con longitud log-normal (mediana ~500 palabras) en párrafos de 3 a 8 frases."""
+    word_count = max(30, min(int(rng.lognormvariate(6.2, 0.6)), 8000))
+    words = rng.choices(WORDS, k=word_count)
+    paragraphs = []
+    sentence = []
+    paragraph = []
+    for word in words:
+        sentence.append(word)
+        if len(sentence) >= rng.randint(8, 20):
+            paragraph.append(' '.join(sentence).capitalize() + '.')
+            sentence = []
+            if len(paragraph) >= rng.randint(3, 8):
+                paragraphs.append(' '.join(paragraph))
+                paragraph = []
+    if sentence:
+        paragraph.append(' '.join(sentence).capitalize() + '.')
+    if paragraph:
+        paragraphs.append(' '.join(paragraph))
+    return '\n\n'.join(paragraphs)
+
+
+def make_slug(title, run_tag, index):
+    """
+    Slug único sin consultar la base de datos: el índice es único dentro de
+    la ejecución y ``run_tag`` entre ejecuciones.
+    """
+    suffix = f'-{run_tag}-{index}'
+    return slugify(title)[:200 - len(suffix)].rstrip('-') + suffix
+
+
+def generate_rows(rng, start, count, author_ids, category_ids, run_tag, days):
+    now = timezone.now()
+    for index in range(start, start + count):
+        title = make_title(rng)
+        if rng.random() < 0.8:
+            status = 'published'
+            published_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+            created_at = published_at - timedelta(seconds=rng.randint(0, 7 * 86400))
+            # Visitas con cola larga: pocos posts concentran la mayoría
+            views = min(int(rng.paretovariate(1.2) * 20) - 20, 1_000_000)
+        else:
+            status = 'draft'
+            published_at = None
+            created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+            views = 0
+        body = make_body(rng)
+        yield {
+            'title': title,
+            'slug': make_slug(title, run_tag, index),
+            'body': body,
+            **text_stats(body),
+            'author_id': rng.choice(author_ids),
+            'category_id': rng.choice(category_ids),
+            'status': status,
+            'published_at': published_at,
+            'views': views,
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+
+def insert_bulk_create(rows):
+    # bulk_create no llama a save(): sin slug automático ni search_vector,
+    # y created_at/updated_at toman la hora actual por auto_now.
+    Post.objects.bulk_create([Post(**row) for row in rows])
+
+
+def insert_copy(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            r'\N' if row[column] is None else row[column]
+            for column in COLUMNS
+        ])
+    buffer.seek(0)
+
+    table = connection.ops.quote_name(Post._meta.db_table)
+    sql = f"COPY {table} ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, 'copy_expert'):
+            # psycopg2
+            raw_cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with raw_cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+INSERT_METHODS = {
+    'bulk_create': insert_bulk_create,
+    'copy': insert_copy,
+}
+
+
+def seed_chunk(start, count, author_ids, category_ids, run_tag, options):
+    """
+    Genera e inserta ``count`` posts a partir del índice ``start``, en lotes
+    de ``options['batch_size']``. Con varios workers se ejecuta en un
+    proceso hijo (fork) que abre su propia conexión; el padre cierra las
+    suyas antes de crear los procesos.
+    """
+    rng = random.Random(f"{options['seed']}-{start}")
+    insert = INSERT_METHODS[options['method']]
+    batch_size = options['batch_size']
+    inserted = 0
+    rows = generate_rows(rng, start, count, author_ids, category_ids, run_tag, options['days'])
+    while inserted < count:
+        batch = [next(rows) for _ in range(min(batch_size, count - inserted))]
+        insert(batch)
+        inserted += len(batch)
+    connections.close_all()
+    return inserted
@@ -0,0 +1,156 @@
+"""
+Caché del payload serializado de los posts: el detalle completo y los
+fragmentos de cada post en el listado.
+"""
+from django.core.cache import cache
+from core.async_cache import cache as async_cache
+from core.cache_helpers import (
+    NAMESPACE_VERSION_KEY, aget_cache_versions, get_cache_versions, invalidate_cache_versions,
+)
+
+# Las señales invalidan el detalle al guardar, así que el TTL solo acota
+# la memoria ocupada por posts que ya nadie visita.
+DETAIL_CACHE_TIMEOUT = 60 * 60
+# s2: formato del payload. Subirlo al cambiar los campos de
+# PostDetailSerializer para no servir entradas con la forma anterior.
+DETAIL_KEY = 'posts:detail:s2:{pk}:v{version}'
+DETAIL_VERSION_KEY = 'posts:detail:version:{pk}'
+# El detalle anida el nombre de la categoría y del autor
+DETAIL_NAMESPACES = ['categories', 'authors']
+
+
+def _detail_version_keys(pk):
+    keys = [DETAIL_VERSION_KEY.format(pk=pk)]
+    keys += [NAMESPACE_VERSION_KEY.format(namespace=ns) for ns in DETAIL_NAMESPACES]
+    return keys
+
+
+def get_detail_version(pk):
+    """
+    Versión actual del detalle del post ``pk``: combina la versión propia del
+    post con la de los namespaces de los que depende.
+    """
+    return '.'.join(str(version) for version in get_cache_versions(_detail_version_keys(pk)))
+
+
+async def aget_detail_version(pk):
+    return '.'.join(str(version) for version in await aget_cache_versions(_detail_version_keys(pk)))
+
+
+def get_cached_detail(pk, version):
+    """Payload de ``PostDetailSerializer`` cacheado, o None si no está."""
+    return cache.get(DETAIL_KEY.format(pk=pk, version=version))
+
+
+async def aget_cached_detail(pk, version):
+    return await async_cache.get(DETAIL_KEY.format(pk=pk, version=version))
+
+
+def set_cached_detail(pk, version, data):
+    cache.set(DETAIL_KEY.format(pk=pk, version=version), dict(data), DETAIL_CACHE_TIMEOUT)
+
+
+async def aset_cached_detail(pk, version, data):
+    await async_cache.set(DETAIL_KEY.format(pk=pk, version=version), dict(data), DETAIL_CACHE_TIMEOUT)
+
+
+def invalidate_post_detail(*pks):
+    """Hace inaccesible el detalle cacheado de los posts indicados."""
+    if pks:
+        invalidate_cache_versions([DETAIL_VERSION_KEY.format(pk=pk) for pk in pks])
+
+
+# Fragmentos del listado: la representación de cada post en
+# PostListSerializer, reutilizable entre páginas, filtros y búsquedas.
+# Se identifican por id y updated_at, así que guardar un post crea un
+# fragmento nuevo sin invalidar los del resto.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 6
+# f1: formato del fragmento. Subirlo al cambiar PostListSerializer.
+FRAGMENT_KEY = 'posts:fragment:f1:{pk}:{updated}:v{version}'
+# Para cambios que no tocan updated_at (bulk_update, comandos de backfill)
+FRAGMENT_VERSION_KEY = 'posts:fragment:version'
+# El fragmento anida el nombre de la categoría y del autor
+FRAGMENT_NAMESPACES = ['categories', 'authors']
+# Lo único que se consulta por página: el id y updated_at para la clave, las
+# views (que no van en el fragmento porque cambian sin tocar updated_at) y
+# las columnas del cursor de KeysetPagination
+FRAGMENT_VALUES = ('id', 'updated_at', 'views', 'published_at', 'created_at')
+
+
+def fragment_projection(queryset):
+    """Proyección mínima del listado; el resto sale de los fragmentos."""
+    return queryset.values(*FRAGMENT_VALUES)
+
+
+FRAGMENT_VERSION_KEYS = [FRAGMENT_VERSION_KEY] + [
+    NAMESPACE_VERSION_KEY.format(namespace=ns) for ns in FRAGMENT_NAMESPACES
+]
+
+
+def get_fragment_version():
+    return '.'.join(str(version) for version in get_cache_versions(FRAGMENT_VERSION_KEYS))
+
+
+async def aget_fragment_version():
+    return '.'.join(str(version) for version in await aget_cache_versions(FRAGMENT_VERSION_KEYS))
+
+
+def _fragment_keys(rows, version):
+    return {
+        row['id']: FRAGMENT_KEY.format(
+            pk=row['id'], updated=int(row['updated_at'].timestamp() * 1_000_000), version=version,
+        )
+        for row in rows
+    }
+
+
+def _merge_fragments(rows, keys, fragments):
+    results = []
+    for row in rows:
+        fragment = fragments.get(keys[row['id']])
+        # Borrado o despublicado entre las dos consultas
+        if fragment is None:
+            continue
+        results.append({**fragment, 'views': row['views']})
+    return results
+
+
+def get_list_fragments(rows, serialize_missing):
+    """
+    Representación en el listado de las filas de ``fragment_projection``.
+
+    Lee todos los fragmentos con un solo ``get_many`` y solo serializa los
+    que faltan, con ``serialize_missing(ids) -> {id: datos}``, guardándolos
+    con un ``set_many``. Las views salen siempre de la fila.
+    """
+    keys = _fragment_keys(rows, get_fragment_version())
+    fragments = cache.get_many(list(keys.values()))
+
+    missing = [pk for pk, key in keys.items() if key not in fragments]
+    if missing:
+        fresh = {keys[pk]: data for pk, data in serialize_missing(missing).items() if pk in keys}
+        if fresh:
+            cache.set_many(fresh, FRAGMENT_CACHE_TIMEOUT)
+            fragments.update(fresh)
+
+    return _merge_fragments(rows, keys, fragments)
+
+
+async def aget_list_fragments(rows, serialize_missing):
+    """``get_list_fragments`` con ``core.async_cache``; ``serialize_missing`` es async."""
+    keys = _fragment_keys(rows, await aget_fragment_version())
+    fragments = await async_cache.get_many(list(keys.values()))
+
+    missing = [pk for pk, key in keys.items() if key not in fragments]
+    if missing:
+        fresh = {keys[pk]: data for pk, data in (await serialize_missing(missing)).items() if pk in keys}
+        if fresh:
+            await async_cache.set_many(fresh, FRAGMENT_CACHE_TIMEOUT)
+            fragments.update(fresh)
+
+    return _merge_fragments(rows, keys, fragments)
+
+
+def invalidate_post_fragments():
+    """Hace inaccesibles todos los fragmentos del listado."""
+    invalidate_cache_versions([FRAGMENT_VERSION_KEY])
@@ -0,0 +1,181 @@
+"""
+Contador de visitas con escritura diferida (write-behind) en Redis.
+
+Cada visita incrementa de forma atómica un campo de un hash en Redis en lugar
+de hacer un UPDATE sobre la fila del post. El comando ``flush_post_views``
+vuelca periódicamente los deltas acumulados a ``Post.views`` con un único
+``UPDATE ... FROM (VALUES ...)`` por lote.
+"""
+import logging
+import time
+import uuid
+
+from django.db import connection, transaction
+from django.db.models import F
+from django_redis import get_redis_connection
+
+from core.async_cache import get_async_redis_connection
+from core.cache_helpers import invalidate_namespaces
+from .cache import invalidate_post_detail
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+PENDING_VIEWS_KEY = 'posts:views:pending'
+# Con la hora (epoch) del volcado que la creó, para reconocer las abandonadas
+PROCESSING_VIEWS_KEY = 'posts:views:processing:{started}:{token}'
+PROCESSING_VIEWS_PATTERN = 'posts:views:processing:*'
+# Un volcado tarda segundos: una clave de procesamiento más antigua es de un
+# flusher que murió entre el RENAME y el DELETE
+ABANDONED_AFTER = 10 * 60
+# Namespace que cambia con cada volcado: entra en el ETag del listado, que
+# si no seguiría validando views antiguas mientras no cambie ningún post
+VIEWS_NAMESPACE = 'views'
+
+
+def _get_redis():
+    return get_redis_connection('durable')
+
+
+def increment_views(post_id):
+    """
+    Registra una visita y devuelve el número de visitas pendientes de volcar.
+
+    Si Redis no está disponible se hace un UPDATE atómico con ``F()`` para no
+    perder la visita; en ese caso devuelve 1, la visita recién escrita que aún
+    no refleja la instancia ya cargada.
+    """
+    try:
+        return _get_redis().hincrby(PENDING_VIEWS_KEY, post_id, 1)
+    except Exception as e:
+        logger.warning(f"View counter unavailable, writing to database: {e}")
+        Post.objects.filter(pk=post_id).update(views=F('views') + 1)
+        return 1
+
+
+async def aincrement_views(post_id):
+    """``increment_views`` para las vistas async."""
+    try:
+        return await get_async_redis_connection('durable').hincrby(PENDING_VIEWS_KEY, post_id, 1)
+    except Exception as e:
+        logger.warning(f"View counter unavailable, writing to database: {e}")
+        await Post.objects.filter(pk=post_id).aupdate(views=F('views') + 1)
+        return 1
+
+
+def get_pending_views(post_id):
+    """Visitas acumuladas en Redis que aún no están en ``Post.views``."""
+    try:
+        value = _get_redis().hget(PENDING_VIEWS_KEY, post_id)
+    except Exception:
+        return 0
+    return int(value) if value else 0
+
+
+def _apply_deltas(deltas):
+    """
+    Suma los deltas ``[(post_id, delta), ...]`` a ``Post.views`` con un único
+    UPDATE usando una lista de VALUES.
+    """
+    table = connection.ops.quote_name(Post._meta.db_table)
+    placeholders = ', '.join(['(%s, %s)'] * len(deltas))
+    params = [value for pair in deltas for value in pair]
+    sql = (
+        f"UPDATE {table} SET views = {table}.views + v.delta "
+        f"FROM (VALUES {placeholders}) AS v(id, delta) "
+        f"WHERE {table}.id = v.id"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def _new_processing_key():
+    return PROCESSING_VIEWS_KEY.format(started=int(time.time()), token=uuid.uuid4().hex)
+
+
+def _claim(redis_conn, key):
+    """Renombra ``key`` a una clave de procesamiento nueva; None si ya no existe."""
+    processing_key = _new_processing_key()
+    try:
+        redis_conn.rename(key, processing_key)
+    except Exception:
+        # Otro proceso la reclamó o la vació antes
+        return None
+    return processing_key
+
+
+def _claim_abandoned(redis_conn):
+    """Claves de procesamiento de volcados interrumpidos, reclamadas para este."""
+    threshold = time.time() - ABANDONED_AFTER
+    claimed = []
+    for key in redis_conn.scan_iter(match=PROCESSING_VIEWS_PATTERN, count=100):
+        key = key.decode() if isinstance(key, bytes) else key
+        try:
+            started = int(key.split(':')[3])
+        except (IndexError, ValueError):
+            # Formato anterior, sin hora: ningún volcado en curso la usa
+            started = 0
+        if started < threshold:
+            processing_key = _claim(redis_conn, key)
+            if processing_key:
+                logger.warning(f"Recovering abandoned view counts from {key}")
+                claimed.append(processing_key)
+    return claimed
+
+
+def _flush_processing_key(redis_conn, processing_key, batch_size):
+    pending = redis_conn.hgetall(processing_key)
+    deltas = [(int(post_id), int(delta)) for post_id, delta in pending.items() if int(delta)]
+
+    updated = 0
+    try:
+        with transaction.atomic():
+            for start in range(0, len(deltas), batch_size):
+                updated += _apply_deltas(deltas[start:start + batch_size])
+    except Exception:
+        pipe = redis_conn.pipeline()
+        for post_id, delta in deltas:
+            pipe.hincrby(PENDING_VIEWS_KEY, post_id, delta)
+        pipe.delete(processing_key)
+        pipe.execute()
+        raise
+
+    redis_conn.delete(processing_key)
+    # El detalle cacheado guarda las views de la BD; tras el volcado hay que
+    # regenerarlo para no restar las visitas que acaban de salir de Redis.
+    invalidate_post_detail(*(post_id for post_id, _ in deltas))
+    return updated
+
+
+def flush_views(batch_size=1000):
+    """
+    Vuelca las visitas pendientes a la base de datos.
+
+    El hash de pendientes se renombra atómicamente a una clave de
+    procesamiento, de modo que las visitas que lleguen durante el volcado se
+    acumulan en un hash nuevo y no se pierden ni se cuentan dos veces. Si el
+    UPDATE falla, los deltas se devuelven al hash de pendientes.
+
+    Si un volcado anterior murió con su clave de procesamiento a medias, se
+    recupera pasados ``ABANDONED_AFTER`` segundos. Si murió justo después del
+    commit y antes del DELETE, esas visitas se cuentan dos veces: se prefiere
+    eso a perderlas.
+
+    Returns:
+        int: Número de posts actualizados
+    """
+    redis_conn = _get_redis()
+    processing_keys = _claim_abandoned(redis_conn)
+    if redis_conn.exists(PENDING_VIEWS_KEY):
+        processing_key = _claim(redis_conn, PENDING_VIEWS_KEY)
+        if processing_key:
+            processing_keys.append(processing_key)
+
+    updated = sum(
+        _flush_processing_key(redis_conn, processing_key, batch_size)
+        for processing_key in processing_keys
+    )
+    if updated:
+        invalidate_namespaces(VIEWS_NAMESPACE)
+    return updated
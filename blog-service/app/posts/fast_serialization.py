@@ -0,0 +1,48 @@
+"""
+Serialización rápida del listado de posts.
+
+Produce el mismo JSON que ``PostListSerializer`` a partir de una proyección
+``.values()``: sin instancias de modelo ni serializers anidados por fila.
+"""
+from rest_framework import serializers
+
+LIST_VALUES = (
+    'id', 'title', 'slug', 'excerpt',
+    'author_id', 'author__display_name', 'category_id', 'category__name',
+    # created_at no se devuelve, pero lo necesita el cursor de KeysetPagination
+    'published_at', 'created_at', 'views', 'word_count', 'reading_time',
+)
+
+# Mismo formato de fechas que los serializers (zona horaria y sufijo Z)
+_datetime_field = serializers.DateTimeField()
+
+
+def list_projection(queryset):
+    """Proyección ``.values()`` del queryset con las columnas del listado."""
+    return queryset.values(*LIST_VALUES)
+
+
+def serialize_list_row(row):
+    """Equivalente a ``PostListSerializer(post).data`` para una fila de ``list_projection``."""
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'slug': row['slug'],
+        'excerpt': row['excerpt'],
+        'author': {
+            'id': row['author_id'],
+            'display_name': row['author__display_name'],
+        },
+        'category': None if row['category_id'] is None else {
+            'id': row['category_id'],
+            'name': row['category__name'],
+        },
+        'published_at': _datetime_field.to_representation(row['published_at']),
+        'views': row['views'],
+        'word_count': row['word_count'],
+        'reading_time': row['reading_time'],
+    }
+
+
+def serialize_list(rows):
+    return [serialize_list_row(row) for row in rows]
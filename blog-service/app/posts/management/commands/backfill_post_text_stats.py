@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from core.cache_helpers import invalidate_namespaces
+from posts.cache import invalidate_post_fragments
+from posts.models import Post
+from posts.text_stats import TEXT_STATS_FIELDS, text_stats
+
+
+class Command(BaseCommand):
+    help = 'Backfill Post.excerpt, word_count and reading_time in primary-key batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Posts loaded and updated per batch (default: 1000)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every post, not only those without an excerpt',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Post.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(excerpt='').exclude(body='')
+
+        self.stdout.write('Backfilling post text stats...')
+        total = 0
+        last_pk = 0
+        while True:
+            # Solo id y body por lote: el resto de columnas no hace falta
+            posts = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'body')[:batch_size]
+            )
+            if not posts:
+                break
+            for post in posts:
+                for field, value in text_stats(post.body).items():
+                    setattr(post, field, value)
+            # bulk_update no llama a save(): no toca updated_at ni las señales
+            total += Post.objects.bulk_update(posts, TEXT_STATS_FIELDS)
+            last_pk = posts[-1].pk
+            self.stdout.write(f'  {total} posts updated (last id {last_pk})')
+
+        if total:
+            # bulk_update no cambia updated_at: invalidar también los fragmentos
+            invalidate_namespaces('posts')
+            invalidate_post_fragments()
+        self.stdout.write(self.style.SUCCESS(f'Backfilled text stats for {total} posts'))
@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.renderers import ORJSONRenderer
+from posts.fast_serialization import list_projection, serialize_list
+from posts.serializers import PostListSerializer
+from posts.views import PostViewSet
+import json
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    help = 'Compare PostListSerializer + JSONRenderer against the .values() fast path + ORJSONRenderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=100,
+            help='Posts per page (default: 100)',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Timed iterations per path (default: 50)',
+        )
+        parser.add_argument(
+            '--search',
+            default='',
+            help='Optional search term, to benchmark ranked search pages',
+        )
+
+    def handle(self, *args, **options):
+        params = {'search': options['search']} if options['search'] else {}
+        request = Request(APIRequestFactory().get('/', params))
+        view = PostViewSet(action='list', request=request, format_kwarg=None, args=(), kwargs={})
+        queryset = view.filter_queryset(view.get_queryset())
+        page_size = options['page_size']
+
+        paths = {
+            'serializer': (
+                lambda: list(queryset[:page_size]),
+                lambda page: PostListSerializer(page, many=True).data,
+                JSONRenderer(),
+            ),
+            'fast': (
+                lambda: list(list_projection(queryset)[:page_size]),
+                serialize_list,
+                ORJSONRenderer(),
+            ),
+        }
+
+        rendered = {}
+        results = {}
+        for name, (fetch, serialize, renderer) in paths.items():
+            with CaptureQueriesContext(connection) as queries:
+                rendered[name] = renderer.render(serialize(fetch()))
+            timings = {'query': [], 'serialize': [], 'render': []}
+            for _ in range(options['iterations']):
+                started = time.perf_counter()
+                page = fetch()
+                fetched = time.perf_counter()
+                data = serialize(page)
+                serialized = time.perf_counter()
+                renderer.render(data)
+                finished = time.perf_counter()
+                timings['query'].append(fetched - started)
+                timings['serialize'].append(serialized - fetched)
+                timings['render'].append(finished - serialized)
+            results[name] = {
+                step: statistics.median(values) * 1000 for step, values in timings.items()
+            }
+            results[name]['total'] = sum(results[name].values())
+            results[name]['queries'] = len(queries)
+            results[name]['bytes'] = len(rendered[name])
+
+        if json.loads(rendered['serializer']) != json.loads(rendered['fast']):
+            raise CommandError('The fast path output differs from PostListSerializer')
+
+        self.stdout.write(
+            f"{'path':<12}{'query ms':>10}{'serialize ms':>14}{'render ms':>11}"
+            f"{'total ms':>10}{'queries':>9}{'bytes':>9}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<12}{result['query']:>10.2f}{result['serialize']:>14.2f}"
+                f"{result['render']:>11.2f}{result['total']:>10.2f}"
+                f"{result['queries']:>9}{result['bytes']:>9}"
+            )
+        speedup = results['serializer']['total'] / results['fast']['total']
+        self.stdout.write(self.style.SUCCESS(
+            f'Fast path: {speedup:.1f}x faster for {page_size} posts (same JSON output)'
+        ))
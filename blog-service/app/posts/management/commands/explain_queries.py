@@ -0,0 +1,189 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from authors.models import Author
+from categories.models import Category
+from categories.views import CategoryViewSet
+from core.pagination import KeysetPagination
+from posts.cache import fragment_projection
+from posts.fast_serialization import list_projection
+from posts.models import Post
+from posts.views import PostViewSet
+import json
+import os
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the queries behind the public endpoints and flag plan regressions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--baseline',
+            default='explain_baseline.json',
+            help='JSON file with the reference plan costs (default: explain_baseline.json)',
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Write the current costs to the baseline file',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.5,
+            help='Allowed cost increase over the baseline, as a fraction (default: 0.5)',
+        )
+        parser.add_argument(
+            '--seq-scan-rows',
+            type=int,
+            default=10000,
+            help='Flag sequential scans on tables with more estimated rows than this (default: 10000)',
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Use EXPLAIN ANALYZE (runs the SELECTs and reports real timings)',
+        )
+        parser.add_argument(
+            '--deep-page',
+            type=int,
+            default=100,
+            help='Page number used for the deep OFFSET scenario (default: 100)',
+        )
+        parser.add_argument(
+            '--search',
+            default='django',
+            help='Term used for the search scenario (default: django)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('explain_queries requires PostgreSQL')
+
+        baseline = {}
+        if os.path.exists(options['baseline']):
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        results = {}
+        regressions = []
+        for name, queryset in self.get_scenarios(options):
+            plan = json.loads(queryset.explain(format='json', analyze=options['analyze']))[0]
+            root = plan['Plan']
+            cost = root['Total Cost']
+            problems = self.find_problems(root, options['seq_scan_rows'])
+
+            reference = baseline.get(name)
+            if reference is not None and cost > reference * (1 + options['tolerance']):
+                problems.append(f'cost {cost:.1f} > baseline {reference:.1f}')
+
+            timing = f" {plan['Execution Time']:.2f}ms" if options['analyze'] else ''
+            line = f'{name:<24} cost={cost:<10.1f}{timing} {self.describe(root)}'
+            if problems:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(f'{line}  <-- {"; ".join(problems)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+            results[name] = cost
+
+        if options['update_baseline']:
+            with open(options['baseline'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Baseline written to {options['baseline']}")
+
+        if regressions:
+            raise CommandError(f'Plan regressions in: {", ".join(regressions)}')
+
+    def get_scenarios(self, options):
+        """
+        Querysets construidos con los mismos filtros y paginación que las
+        vistas. Con ``LIST_FRAGMENT_CACHE`` (el modo por defecto) el listado
+        consulta la proyección de ``fragment_projection`` y, en
+        ``posts_fragments``, los posts cuyo fragmento no está en caché.
+        """
+        post = Post.objects.filter(status='published').order_by('-published_at').first()
+        category = Category.objects.filter(posts__status='published').first()
+        author = Author.objects.filter(posts__status='published').first()
+        page_size = PostViewSet.pagination_class.page_size
+
+        posts = self.list_queryset(self.view_queryset(PostViewSet, 'list'))
+        yield 'posts_list', posts[:page_size]
+        if PostViewSet.list_fragment_cache:
+            ids = [row['id'] for row in posts[:page_size]]
+            view = self.get_view(PostViewSet, 'list')
+            yield 'posts_fragments', list_projection(view.get_queryset().filter(pk__in=ids))
+
+        offset = (options['deep_page'] - 1) * page_size
+        yield 'posts_list_deep_offset', posts[offset:offset + page_size]
+
+        if category:
+            yield 'posts_by_category', self.list_queryset(self.view_queryset(
+                PostViewSet, 'list', {'category': category.pk}
+            ))[:page_size]
+        if author:
+            yield 'posts_by_author', self.list_queryset(self.view_queryset(
+                PostViewSet, 'list', {'author': author.pk}
+            ))[:page_size]
+
+        yield 'posts_search', self.list_queryset(self.view_queryset(
+            PostViewSet, 'list', {'search': options['search']}
+        ))[:page_size]
+
+        if post:
+            # La segunda página del feed, por el mismo camino que la vista
+            paginator = KeysetPagination()
+            paginator.base_url = 'http://testserver/'
+            url = paginator.encode_cursor(paginator._position(post), reverse=False)
+            request = Request(APIRequestFactory().get(url, {'page_size': page_size}))
+            queryset, _, _ = paginator._page_queryset(posts, request)
+            yield 'posts_cursor', queryset
+            yield 'post_detail', self.view_queryset(PostViewSet, 'retrieve').filter(pk=post.pk)
+
+        yield 'categories_list', self.view_queryset(CategoryViewSet, 'list')[:page_size]
+
+    def list_queryset(self, queryset):
+        """La proyección que consulta ``PostViewSet.list`` en el modo configurado."""
+        if PostViewSet.list_fragment_cache:
+            return fragment_projection(queryset)
+        if PostViewSet.fast_list_serialization:
+            return list_projection(queryset)
+        return queryset
+
+    def get_view(self, viewset, action, params=None):
+        request = Request(APIRequestFactory().get('/', params or {}))
+        return viewset(action=action, request=request, format_kwarg=None, args=(), kwargs={})
+
+    def view_queryset(self, viewset, action, params=None):
+        view = self.get_view(viewset, action, params)
+        return view.filter_queryset(view.get_queryset())
+
+    def find_problems(self, node, seq_scan_rows):
+        problems = []
+        if node['Node Type'] == 'Seq Scan' and self.table_rows(node['Relation Name']) > seq_scan_rows:
+            problems.append(f"seq scan on {node['Relation Name']}")
+        if node['Node Type'] == 'Sort' and node.get('Plan Rows', 0) > seq_scan_rows:
+            problems.append(f"sort of {node['Plan Rows']} rows")
+        for child in node.get('Plans', []):
+            problems.extend(self.find_problems(child, seq_scan_rows))
+        return problems
+
+    def table_rows(self, table):
+        """Filas estimadas de la tabla según las estadísticas de Postgres."""
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def describe(self, node):
+        """Resumen de los accesos a tablas del plan (tipo de nodo e índice)."""
+        return ', '.join(self.table_accesses(node))
+
+    def table_accesses(self, node):
+        accesses = []
+        if 'Relation Name' in node:
+            index = f" using {node['Index Name']}" if 'Index Name' in node else ''
+            accesses.append(f"{node['Node Type']} {node['Relation Name']}{index}")
+        for child in node.get('Plans', []):
+            accesses.extend(self.table_accesses(child))
+        return accesses
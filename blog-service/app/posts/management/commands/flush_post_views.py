@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from posts.counters import flush_views
+import signal
+import time
+
+
+class Command(BaseCommand):
+    help = 'Flush buffered post views from Redis into Post.views'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Seconds between flushes; 0 flushes once and exits (default: 0)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Posts per UPDATE statement (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        batch_size = options['batch_size']
+
+        if not interval:
+            updated = flush_views(batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f'Flushed views for {updated} posts'))
+            return
+
+        self.running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write(f'Flushing post views every {interval}s...')
+        while self.running:
+            try:
+                updated = flush_views(batch_size=batch_size)
+                if updated:
+                    self.stdout.write(f'Flushed views for {updated} posts')
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f'Flush failed: {e}'))
+            deadline = time.monotonic() + interval
+            while self.running and time.monotonic() < deadline:
+                time.sleep(1)
+
+        # Último volcado para no dejar visitas pendientes al apagar
+        updated = flush_views(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Flushed views for {updated} posts before exit'))
+
+    def _stop(self, signum, frame):
+        self.running = False
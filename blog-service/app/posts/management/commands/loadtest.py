@@ -0,0 +1,323 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+from authors.models import Author
+from categories.models import Category
+from posts.models import Post
+from posts.views import PostViewSet
+import itertools
+import json
+import os
+import threading
+import time
+
+
+class Command(BaseCommand):
+    help = 'Load-test the public endpoints with concurrent clients and report throughput and latency percentiles'
+
+    AUTH_SCENARIOS = ('login', 'token_refresh', 'me')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--blog-url',
+            default=os.getenv('LOADTEST_BLOG_URL', 'http://localhost:8001'),
+            help='Base URL of blog-service (default: http://localhost:8001)',
+        )
+        parser.add_argument(
+            '--auth-url',
+            default=os.getenv('LOADTEST_AUTH_URL', 'http://localhost:8000'),
+            help='Base URL of auth-service (default: http://localhost:8000; http://auth:8000 inside docker)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='Concurrent clients per endpoint (default: 16)',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10.0,
+            help='Seconds of load per endpoint (default: 10)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=10.0,
+            help='Per-request timeout in seconds (default: 10)',
+        )
+        parser.add_argument(
+            '--endpoints',
+            nargs='+',
+            help='Only run these scenarios (default: all)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed this many posts with seed_blog --bulk before the run (default: 0, use the existing data)',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Add a unique query parameter to every blog request to bypass the page cache',
+        )
+        parser.add_argument(
+            '--email',
+            default='loadtest@example.com',
+            help='User for the auth scenarios; registered if it does not exist',
+        )
+        parser.add_argument(
+            '--password',
+            default='loadtest-password-123',
+            help='Password of the load-test user',
+        )
+        parser.add_argument(
+            '--output',
+            default='loadtest_results.json',
+            help='JSON file for the results (default: loadtest_results.json)',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Previous results file to compare against',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Allowed p95 increase over --compare, as a fraction (default: 0.25)',
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.stdout.write(f"Seeding {options['seed']} posts...")
+            call_command(
+                'seed_blog', posts=options['seed'], categories=20, authors=50, bulk=True, stdout=self.stdout
+            )
+
+        self.timeout = options['timeout']
+        self.counter = itertools.count()
+        self.cold = options['cold']
+        self.credentials = {'email': options['email'], 'password': options['password']}
+        self.auth_url = options['auth_url'].rstrip('/')
+
+        scenarios = self.get_scenarios(options['blog_url'].rstrip('/'))
+        if options['endpoints']:
+            unknown = set(options['endpoints']) - {scenario[0] for scenario in scenarios}
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            scenarios = [scenario for scenario in scenarios if scenario[0] in options['endpoints']]
+        # Solo las pruebas de auth-service necesitan el usuario (y el servicio)
+        if any(scenario[0] in self.AUTH_SCENARIOS for scenario in scenarios):
+            self.ensure_user()
+
+        self.stdout.write(
+            f"{'scenario':<22} {'requests':>8} {'errors':>6} {'rps':>8} "
+            f"{'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'max_ms':>8}"
+        )
+        results = {}
+        for name, run, authenticated in scenarios:
+            stats = self.run_scenario(run, authenticated, options['concurrency'], options['duration'])
+            results[name] = stats
+            line = (
+                f"{name:<22} {stats['requests']:>8} {stats['errors']:>6} {stats['rps']:>8.1f} "
+                f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f}"
+            )
+            self.stdout.write(self.style.ERROR(line) if stats['errors'] else line)
+
+        report = {
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'config': {
+                key: options[key] for key in ('blog_url', 'auth_url', 'concurrency', 'duration', 'cold')
+            },
+            'dataset': {
+                'posts': Post.objects.count(),
+                'categories': Category.objects.count(),
+                'authors': Author.objects.count(),
+            },
+            'endpoints': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def get_scenarios(self, blog_url):
+        """
+        Escenarios ``(nombre, función, autenticado)``; cada función hace una
+        petición con el estado de su cliente (un dict por hilo) y devuelve el
+        status HTTP. Los autenticados hacen login antes de medir.
+        """
+        post = Post.objects.filter(status='published').order_by('-published_at').first()
+        category = Category.objects.filter(posts__status='published').first()
+        author = Author.objects.filter(posts__status='published').first()
+        page_size = PostViewSet.pagination_class.page_size
+        published = Post.objects.filter(status='published').count()
+        deep_page = max(1, (published + page_size - 1) // page_size)
+
+        def blog_get(path, **params):
+            return lambda state: self.request('GET', f'{blog_url}{path}', params=params, bust=self.cold)[0]
+
+        scenarios = [
+            ('posts_list', blog_get('/api/posts/'), False),
+            ('posts_search', blog_get('/api/posts/', search='django'), False),
+            ('posts_deep_page', blog_get('/api/posts/', page=deep_page), False),
+            ('categories_list', blog_get('/api/categories/'), False),
+        ]
+        if category:
+            scenarios.append(('posts_by_category', blog_get('/api/posts/', category=category.pk), False))
+        if author:
+            scenarios.append(('posts_by_author', blog_get('/api/posts/', author=author.pk), False))
+        if post:
+            scenarios.append(('post_detail', blog_get(f'/api/posts/{post.pk}/'), False))
+        scenarios += [
+            ('login', self.login, False),
+            ('token_refresh', self.refresh, True),
+            ('me', self.me, True),
+        ]
+        return scenarios
+
+    def request(self, method, url, params=None, body=None, token=None, bust=False):
+        """Una petición HTTP; devuelve ``(status, json)`` (status 0 si no hubo respuesta)."""
+        params = dict(params or {})
+        if bust:
+            params['_lt'] = next(self.counter)
+        if params:
+            url = f'{url}?{urlencode(params)}'
+        headers = {'Accept': 'application/json'}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        try:
+            with urlopen(Request(url, data=data, headers=headers, method=method), timeout=self.timeout) as response:
+                return response.status, json.loads(response.read() or b'null')
+        except HTTPError as e:
+            e.read()
+            return e.code, None
+        except (URLError, OSError):
+            return 0, None
+
+    def ensure_user(self):
+        status, _ = self.request('POST', f'{self.auth_url}/api/login/', body=self.credentials)
+        if status == 200:
+            return
+        status, _ = self.request('POST', f'{self.auth_url}/api/register/', body={
+            **self.credentials, 'password_confirm': self.credentials['password'],
+        })
+        if status != 201:
+            raise CommandError(f'Could not log in or register {self.credentials["email"]} (HTTP {status})')
+
+    def login(self, state):
+        status, data = self.request('POST', f'{self.auth_url}/api/login/', body=self.credentials)
+        if status == 200:
+            state['tokens'] = data['tokens']
+        return status
+
+    def refresh(self, state):
+        # Los refresh tokens rotan: cada cliente encadena el que recibe
+        if 'tokens' not in state and self.login(state) != 200:
+            return 0
+        status, data = self.request(
+            'POST', f'{self.auth_url}/api/token/refresh/', body={'refresh': state['tokens']['refresh']}
+        )
+        if status == 200:
+            state['tokens'] = {**state['tokens'], **data}
+        else:
+            state.pop('tokens', None)
+        return status
+
+    def me(self, state):
+        if 'tokens' not in state and self.login(state) != 200:
+            return 0
+        status, _ = self.request('GET', f'{self.auth_url}/api/me/', token=state['tokens']['access'])
+        return status
+
+    def run_scenario(self, run, authenticated, concurrency, duration):
+        """Clientes en bucle cerrado durante ``duration`` segundos."""
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+        clock = {}
+
+        def start():
+            # Lo ejecuta un solo hilo cuando todos los clientes están listos
+            clock['started'] = time.perf_counter()
+            clock['deadline'] = clock['started'] + duration
+
+        ready = threading.Barrier(concurrency + 1, action=start)
+
+        def client():
+            nonlocal errors
+            state = {}
+            if authenticated:
+                self.login(state)
+            ready.wait()
+            own, own_errors = [], 0
+            while time.perf_counter() < clock['deadline']:
+                started = time.perf_counter()
+                status = run(state)
+                elapsed = (time.perf_counter() - started) * 1000
+                if 200 <= status < 300:
+                    own.append(elapsed)
+                else:
+                    own_errors += 1
+            with lock:
+                latencies.extend(own)
+                errors += own_errors
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(concurrency):
+                executor.submit(client)
+            ready.wait()
+        elapsed = time.perf_counter() - clock['started']
+
+        latencies.sort()
+        return {
+            'requests': len(latencies) + errors,
+            'errors': errors,
+            'rps': round(len(latencies) / elapsed, 1),
+            'avg_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            'p50_ms': self.percentile(latencies, 0.50),
+            'p95_ms': self.percentile(latencies, 0.95),
+            'p99_ms': self.percentile(latencies, 0.99),
+            'max_ms': round(latencies[-1], 2) if latencies else 0.0,
+        }
+
+    def percentile(self, ordered, quantile):
+        """Percentil por rango más cercano sobre latencias ordenadas."""
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, max(0, int(round(quantile * len(ordered))) - 1))
+        return round(ordered[index], 2)
+
+    def compare(self, results, path, tolerance):
+        with open(path) as f:
+            previous = json.load(f)['endpoints']
+
+        regressions = []
+        self.stdout.write(f'\nCompared with {path}:')
+        for name, stats in results.items():
+            reference = previous.get(name)
+            if not reference:
+                continue
+            p95_change = (stats['p95_ms'] - reference['p95_ms']) / reference['p95_ms'] if reference['p95_ms'] else 0
+            rps_change = (stats['rps'] - reference['rps']) / reference['rps'] if reference['rps'] else 0
+            line = f'{name:<22} p95 {p95_change:+7.1%}  rps {rps_change:+7.1%}  errors {stats["errors"]}'
+            # Con errores las latencias no son comparables (solo cuentan las respuestas 2xx)
+            if p95_change > tolerance or stats['errors'] > reference['errors']:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+
+        if regressions:
+            raise CommandError(f'Regressions in: {", ".join(regressions)}')
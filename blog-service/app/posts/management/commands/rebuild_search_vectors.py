@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from posts.models import Post
+from posts.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Backfill Post.search_vector in primary-key batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Posts updated per statement (default: 5000)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild every post, not only those without a vector',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Post.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        self.stdout.write('Rebuilding search vectors...')
+        total = 0
+        last_pk = 0
+        while True:
+            # Rango de claves por lote: cada UPDATE es corto y no bloquea la tabla
+            pks = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            total += update_search_vectors(Post.objects.filter(pk__gte=pks[0], pk__lte=pks[-1]))
+            last_pk = pks[-1]
+            self.stdout.write(f'  {total} posts updated (last id {last_pk})')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search vectors for {total} posts'))
@@ -1,9 +1,15 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.db import connection, connections
 from categories.models import Category
 from authors.models import Author
+from core.cache_helpers import invalidate_namespaces
 from posts.models import Post
+from posts.bulk_seed import make_run_tag, seed_chunk
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from django.utils import timezone
 from datetime import timedelta
+import multiprocessing
 import random
 
 
@@ -29,6 +35,46 @@ class Command(BaseCommand):
             default=30,
             help='Number of posts to create (default: 30)',
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Generate posts with realistic text lengths and insert them in batches',
+        )
+        parser.add_argument(
+            '--method',
+            choices=['copy', 'bulk_create'],
+            default='copy',
+            help='Bulk insert method (default: copy)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Posts per insert batch in bulk mode (default: 5000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Processes generating and inserting posts in bulk mode (default: 1)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3 * 365,
+            help='Spread of publication dates in bulk mode, in days (default: 1095)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for bulk mode (default: 0)',
+        )
+        parser.add_argument(
+            '--skip-search-vectors',
+            action='store_true',
+            help='Do not rebuild search vectors after a bulk insert',
+        )
 
     def handle(self, *args, **options):
         num_categories = options['categories']
@@ -64,8 +110,11 @@ class Command(BaseCommand):
             {'name': 'Laura Martínez', 'email': 'laura@example.com'},
         ]
 
-        for i in range(min(num_authors, len(authors_data))):
-            data = authors_data[i]
+        for i in range(num_authors if options['bulk'] else min(num_authors, len(authors_data))):
+            if i < len(authors_data):
+                data = authors_data[i]
+            else:
+                data = {'name': f'Autor {i + 1}', 'email': f'autor{i + 1}@example.com'}
             author, created = Author.objects.get_or_create(
                 email=data['email'],
                 defaults={'display_name': data['name']}
@@ -74,6 +123,11 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f'Created/Retrieved {len(authors)} authors'))
 
+        if options['bulk']:
+            posts_created = self.seed_bulk(num_posts, authors, categories, options)
+            self.write_summary(categories, authors, posts_created)
+            return
+
         # Create posts
         posts_data = [
             {
@@ -155,7 +209,58 @@ class Command(BaseCommand):
             posts_created += 1
 
         self.stdout.write(self.style.SUCCESS(f'Created {posts_created} posts'))
+        self.write_summary(categories, authors, posts_created)
+
+    def seed_bulk(self, num_posts, authors, categories, options):
+        """
+        Inserta ``num_posts`` posts por lotes (COPY o bulk_create), repartidos
+        entre ``--workers`` procesos.
+        """
+        author_ids = [author.pk for author in authors]
+        category_ids = [category.pk for category in categories]
+        run_tag = make_run_tag()
+        # Solo lo que necesitan los workers (options incluye objetos no serializables)
+        bulk_options = {key: options[key] for key in ('method', 'batch_size', 'seed', 'days')}
+        workers = max(1, options['workers'])
+        chunk_size = max(options['batch_size'], -(-num_posts // (workers * 4)))
+        chunks = [
+            (start, min(chunk_size, num_posts - start))
+            for start in range(0, num_posts, chunk_size)
+        ]
+
+        self.stdout.write(
+            f"Bulk inserting {num_posts} posts with {options['method']} "
+            f"({workers} workers, batches of {options['batch_size']})..."
+        )
+        posts_created = 0
+        if workers == 1:
+            for start, count in chunks:
+                posts_created += seed_chunk(start, count, author_ids, category_ids, run_tag, bulk_options)
+                self.stdout.write(f'  {posts_created}/{num_posts} posts')
+        else:
+            # Los hijos (fork) no deben heredar conexiones abiertas del padre
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [
+                    pool.submit(seed_chunk, start, count, author_ids, category_ids, run_tag, bulk_options)
+                    for start, count in chunks
+                ]
+                for future in as_completed(futures):
+                    posts_created += future.result()
+                    self.stdout.write(f'  {posts_created}/{num_posts} posts')
+
+        self.stdout.write(self.style.SUCCESS(f'Created {posts_created} posts'))
+
+        # Las inserciones masivas no pasan por save() ni por las señales
+        if not options['skip_search_vectors']:
+            call_command('rebuild_search_vectors', batch_size=options['batch_size'], stdout=self.stdout)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(Post._meta.db_table)}')
+        invalidate_namespaces('posts')
+        return posts_created
 
+    def write_summary(self, categories, authors, posts_created):
         # Summary
         published_count = Post.objects.filter(status='published').count()
         draft_count = Post.objects.filter(status='draft').count()
@@ -1,6 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 from slugify import slugify
+from .search import search_vector_expression
+from .text_stats import TEXT_STATS_FIELDS, text_stats
 
 
 class Post(models.Model):
@@ -17,22 +21,55 @@ class Post(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     published_at = models.DateTimeField(null=True, blank=True)
     views = models.IntegerField(default=0)
+    # Derivados de body, recalculados en save() (ver posts.text_stats)
+    excerpt = models.CharField(max_length=153, blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='post_search_vector_gin'),
+            # Índices parciales sobre posts publicados, en el mismo orden que
+            # Meta.ordering (+ id para keyset): el feed general y los feeds por
+            # categoría o autor se resuelven como rangos de índice, sin sort.
+            models.Index(
+                fields=['-published_at', '-created_at', '-id'],
+                name='post_feed_keyset_idx',
+                condition=models.Q(status='published'),
+            ),
+            models.Index(
+                fields=['category', '-published_at', '-created_at', '-id'],
+                name='post_category_feed_idx',
+                condition=models.Q(status='published'),
+            ),
+            models.Index(
+                fields=['author', '-published_at', '-created_at', '-id'],
+                name='post_author_feed_idx',
+                condition=models.Q(status='published'),
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
         if self.status == 'published' and not self.published_at:
             self.published_at = timezone.now()
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'body' in update_fields:
+            for field, value in text_stats(self.body).items():
+                setattr(self, field, value)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *TEXT_STATS_FIELDS}
         super().save(*args, **kwargs)
 
-    @property
-    def excerpt(self):
-        return self.body[:150] + '...' if len(self.body) > 150 else self.body
+        # Mantener el vector de búsqueda cuando cambia el texto
+        if update_fields is None or {'title', 'body'} & set(update_fields):
+            Post.objects.filter(pk=self.pk).update(search_vector=search_vector_expression())
 
     def __str__(self):
         return self.title
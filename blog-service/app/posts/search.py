@@ -0,0 +1,35 @@
+"""
+Búsqueda full-text de posts con ``tsvector`` de Postgres.
+
+El vector se guarda en ``Post.search_vector`` (con índice GIN) y combina
+cada configuración de ``FULL_TEXT_SEARCH_CONFIGS`` para que las búsquedas
+funcionen con el stemming de español y de inglés.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+
+
+def get_search_configs():
+    return getattr(settings, 'FULL_TEXT_SEARCH_CONFIGS', ['spanish', 'english'])
+
+
+def search_vector_expression():
+    """Expresión que calcula el vector de un post: título con peso A, cuerpo con peso B."""
+    vector = None
+    for config in get_search_configs():
+        config_vector = (
+            SearchVector('title', weight='A', config=config)
+            + SearchVector('body', weight='B', config=config)
+        )
+        vector = config_vector if vector is None else vector + config_vector
+    return vector
+
+
+def update_search_vectors(queryset):
+    """
+    Recalcula ``search_vector`` en la base de datos para los posts del queryset.
+
+    Returns:
+        int: Número de filas actualizadas
+    """
+    return queryset.update(search_vector=search_vector_expression())
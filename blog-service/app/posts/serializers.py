@@ -13,14 +13,13 @@ class CategoryNestedSerializer(serializers.Serializer):
 
 
 class PostListSerializer(serializers.ModelSerializer):
-    """Serializer para la lista de posts (con excerpt)"""
+    """Serializer para la lista de posts (con excerpt, sin body)"""
     author = AuthorNestedSerializer(read_only=True)
     category = CategoryNestedSerializer(read_only=True)
-    excerpt = serializers.CharField(read_only=True)
 
     class Meta:
         model = Post
-        fields = ['id', 'title', 'slug', 'excerpt', 'author', 'category', 'published_at', 'views']
+        fields = ['id', 'title', 'slug', 'excerpt', 'author', 'category', 'published_at', 'views', 'word_count', 'reading_time']
 
 
 class PostDetailSerializer(serializers.ModelSerializer):
@@ -30,5 +29,5 @@ class PostDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
-        fields = ['id', 'title', 'slug', 'body', 'author', 'category', 'published_at', 'views', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'slug', 'body', 'author', 'category', 'published_at', 'views', 'word_count', 'reading_time', 'created_at', 'updated_at']
 
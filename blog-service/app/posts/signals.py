@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.cache_helpers import invalidate_namespaces
+from .cache import invalidate_post_detail
+from .models import Post
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_cache(sender, instance, **kwargs):
+    """Invalida listados y detalle cacheados cuando cambia un post."""
+    pk = instance.pk
+
+    def invalidate():
+        invalidate_namespaces('posts')
+        invalidate_post_detail(pk)
+
+    # Tras el commit, para que nadie vuelva a cachear la versión anterior
+    transaction.on_commit(invalidate)
@@ -0,0 +1,426 @@
+"""
+Presupuestos de consultas SQL de los endpoints públicos del blog.
+
+Cada test fija cuántas consultas hace un endpoint con las cachés vacías (el
+peor caso) y comprueba que el número no cambia con el tamaño de la página:
+un N+1 hace fallar el test en lugar de aparecer en producción.
+
+Necesitan PostgreSQL (búsqueda full-text) y Redis, como el servicio:
+    docker exec -it blog_service python manage.py test posts
+"""
+import base64
+import json
+import re
+import tempfile
+import threading
+import time
+from io import StringIO
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django_redis import get_redis_connection
+from authors.models import Author
+from categories.models import Category
+from categories.async_views import category_list
+from core.cache_helpers import CachedResult, get_or_compute, new_entry
+from core.db_router import ReplicaRouter
+from posts.async_views import post_detail, post_list
+from posts.counters import PENDING_VIEWS_KEY, PROCESSING_VIEWS_KEY, flush_views
+from posts.models import Post
+from posts.views import PostViewSet
+
+# Base de datos de Redis solo para tests: se vacía antes de cada petición
+TEST_REDIS_DB = 15
+
+
+def isolated_caches():
+    """Las cachés del servicio, todas en ``TEST_REDIS_DB`` y con prefijo propio."""
+    return {
+        alias: {
+            **conf,
+            'LOCATION': re.sub(r'/\d+$', f'/{TEST_REDIS_DB}', conf['LOCATION']),
+            'KEY_PREFIX': f'test:{alias}',
+        }
+        for alias, conf in settings.CACHES.items()
+    }
+
+
+@override_settings(CACHES=isolated_caches())
+class QueryBudgetTestCase(TestCase):
+    """Base de los tests de presupuesto de consultas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_blog', categories=5, authors=3, posts=60, stdout=StringIO())
+        cls.post = Post.objects.filter(status='published').order_by('id').first()
+        cls.category = Category.objects.order_by('id').first()
+        cls.author = Author.objects.order_by('id').first()
+
+    def reset_caches(self):
+        """
+        Todas las cachés vacías, también las copias en memoria del proceso.
+        Cada alias puede estar en un Redis distinto (``REDIS_CACHE_HOST``).
+        """
+        for alias in settings.CACHES:
+            caches[alias].clear()
+
+    def assertQueryBudget(self, url, queries, cold=True):
+        """GET ``url`` con exactamente ``queries`` consultas (con la caché vacía si ``cold``)."""
+        if cold:
+            self.reset_caches()
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response
+
+
+# Conteo en frío: estimación con EXPLAIN y, con tablas pequeñas, COUNT(*)
+COUNT_QUERIES = 2
+
+
+class PostListQueryBudgetTests(QueryBudgetTestCase):
+    # count + ids de la página + fragmentos que faltan
+    FRAGMENT_QUERIES = COUNT_QUERIES + 2
+    # count + página (con autor y categoría en el mismo JOIN)
+    SERIALIZER_QUERIES = COUNT_QUERIES + 1
+    # El filtro valida que la categoría o el autor existen
+    FILTER_QUERIES = FRAGMENT_QUERIES + 1
+
+    def test_list_does_not_grow_with_page_size(self):
+        for page_size in (5, 25):
+            self.assertQueryBudget(f'/api/posts/?page_size={page_size}', self.FRAGMENT_QUERIES)
+
+    def test_list_serializer_path(self):
+        with mock.patch.object(PostViewSet, 'list_fragment_cache', False):
+            for page_size in (5, 25):
+                self.assertQueryBudget(f'/api/posts/?page_size={page_size}', self.SERIALIZER_QUERIES)
+
+    def test_list_fast_path(self):
+        with mock.patch.object(PostViewSet, 'list_fragment_cache', False), \
+                mock.patch.object(PostViewSet, 'fast_list_serialization', True):
+            for page_size in (5, 25):
+                self.assertQueryBudget(f'/api/posts/?page_size={page_size}', self.SERIALIZER_QUERIES)
+
+    def test_list_reuses_fragments_across_pages(self):
+        self.assertQueryBudget('/api/posts/?page_size=25', self.FRAGMENT_QUERIES)
+        # Otra URL con los mismos posts: count cacheado y fragmentos en caché
+        self.assertQueryBudget('/api/posts/?page_size=20', 1, cold=False)
+
+    def test_list_is_served_from_page_cache(self):
+        self.assertQueryBudget('/api/posts/', self.FRAGMENT_QUERIES)
+        self.assertQueryBudget('/api/posts/', 0, cold=False)
+
+    def test_search(self):
+        self.assertQueryBudget('/api/posts/?search=django', self.FRAGMENT_QUERIES)
+
+    def test_filter_by_category(self):
+        self.assertQueryBudget(f'/api/posts/?category={self.category.pk}', self.FILTER_QUERIES)
+
+    def test_filter_by_author(self):
+        self.assertQueryBudget(f'/api/posts/?author={self.author.pk}', self.FILTER_QUERIES)
+
+    def test_deep_page(self):
+        published = Post.objects.filter(status='published').count()
+        last_page = (published + 4) // 5
+        self.assertQueryBudget(f'/api/posts/?page_size=5&page={last_page}', self.FRAGMENT_QUERIES)
+
+    def test_cursor_pagination(self):
+        # Sin count: ids de la página + fragmentos
+        response = self.assertQueryBudget('/api/posts/?pagination=cursor&page_size=5', 2)
+        self.assertQueryBudget(response.json()['next'], 2)
+
+
+class KeysetPaginationTests(QueryBudgetTestCase):
+    url = '/api/posts/?pagination=cursor&page_size=5'
+
+    def setUp(self):
+        self.reset_caches()
+
+    def cursor(self, payload):
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [post['id'] for post in response.json()['results']]
+
+    def test_tampered_cursors(self):
+        cursors = [
+            self.cursor({'p': ['x', 'y', 'z']}),
+            self.cursor({'p': [None, None, None]}),
+            self.cursor({'p': ['2024-01-01T00:00:00+00:00', '2024-01-01T00:00:00+00:00', 'x']}),
+            self.cursor({'p': [1, 2]}),
+            self.cursor(['x']),
+            'not-base64',
+        ]
+        for cursor in cursors:
+            response = self.client.get(f'{self.url}&cursor={cursor}')
+            self.assertEqual(response.status_code, 404, cursor)
+
+    def test_back_and_forth(self):
+        first = self.client.get(self.url).json()
+        second = self.client.get(first['next']).json()
+        third = self.client.get(second['next']).json()
+        self.assertIsNone(first['previous'])
+        self.assertEqual(self.ids(self.client.get(third['previous'])), [post['id'] for post in second['results']])
+        back = self.client.get(second['previous']).json()
+        self.assertEqual([post['id'] for post in back['results']], [post['id'] for post in first['results']])
+        self.assertIsNone(back['previous'])
+
+    def test_published_post_without_published_at(self):
+        # Sin published_at (SQL directo) no tiene posición: queda fuera del feed
+        Post.objects.filter(pk=self.post.pk).update(published_at=None)
+        response = self.client.get(self.url)
+        seen = self.ids(response)
+        while response.json()['next']:
+            response = self.client.get(response.json()['next'])
+            seen += self.ids(response)
+        self.assertNotIn(self.post.pk, seen)
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), Post.objects.filter(status='published', published_at__isnull=False).count())
+
+
+class PostDetailQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_detail(self):
+        url = f'/api/posts/{self.post.pk}/'
+        self.assertQueryBudget(url, 1)
+        # Payload cacheado; las views se cuentan en Redis
+        self.assertQueryBudget(url, 0, cold=False)
+
+    def test_detail_with_zero_padded_id_is_invalidated(self):
+        padded_url = f'/api/posts/0{self.post.pk}/'
+        self.assertQueryBudget(padded_url, 1)
+
+        post = Post.objects.get(pk=self.post.pk)
+        post.status = 'draft'
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+
+        self.assertEqual(self.client.get(f'/api/posts/{self.post.pk}/').status_code, 404)
+        self.assertEqual(self.client.get(padded_url).status_code, 404)
+
+
+class CategoryQueryBudgetTests(QueryBudgetTestCase):
+
+    def test_list(self):
+        # count + página
+        self.assertQueryBudget('/api/categories/', COUNT_QUERIES + 1)
+        self.assertQueryBudget('/api/categories/', 0, cold=False)
+
+
+class AsyncReadViewTests(QueryBudgetTestCase):
+    """Las vistas async (ASYNC_READ_VIEWS) responden lo mismo que las síncronas y con las mismas consultas."""
+
+    def assertSameResponse(self, url, view, queries, **kwargs):
+        """
+        GET ``url`` a la vista async con la caché vacía y en ``queries``
+        consultas; devuelve los datos de la síncrona y de la async.
+        """
+        self.reset_caches()
+        with self.assertNumQueries(queries):
+            response = async_to_sync(view)(RequestFactory().get(url), **kwargs)
+        self.assertEqual(response.status_code, 200, url)
+        # Después, para que las versiones de la caché (y el ETag) sean las mismas
+        expected = self.client.get(url)
+        self.assertEqual(response['ETag'], expected['ETag'], url)
+        return expected.json(), json.loads(response.content)
+
+    def test_post_list(self):
+        urls = [
+            ('/api/posts/?page_size=5', PostListQueryBudgetTests.FRAGMENT_QUERIES),
+            ('/api/posts/?search=django', PostListQueryBudgetTests.FRAGMENT_QUERIES),
+            (f'/api/posts/?category={self.category.pk}', PostListQueryBudgetTests.FILTER_QUERIES),
+            ('/api/posts/?pagination=cursor&page_size=5', 2),
+        ]
+        for url, queries in urls:
+            expected, data = self.assertSameResponse(url, post_list, queries)
+            self.assertEqual(data, expected, url)
+
+    def test_post_list_serializer_path(self):
+        with mock.patch.object(PostViewSet, 'list_fragment_cache', False):
+            expected, data = self.assertSameResponse(
+                '/api/posts/?page_size=5', post_list, PostListQueryBudgetTests.SERIALIZER_QUERIES
+            )
+        self.assertEqual(data, expected)
+
+    def test_post_detail(self):
+        expected, data = self.assertSameResponse(f'/api/posts/{self.post.pk}/', post_detail, 1, pk=self.post.pk)
+        # Cada petición suma su visita
+        self.assertEqual(expected.pop('views'), data.pop('views') + 1)
+        self.assertEqual(data, expected)
+
+    def test_post_detail_not_found(self):
+        response = async_to_sync(post_detail)(RequestFactory().get('/api/posts/0/'), pk=0)
+        self.assertEqual(response.status_code, 404)
+
+    def test_category_list(self):
+        expected, data = self.assertSameResponse('/api/categories/', category_list, COUNT_QUERIES + 1)
+        self.assertEqual(data, expected)
+
+    def test_only_reads(self):
+        response = async_to_sync(post_list)(RequestFactory().post('/api/posts/'))
+        self.assertEqual(response.status_code, 405)
+
+
+class GetOrComputeTests(QueryBudgetTestCase):
+    """Protección contra estampidas de ``get_or_compute`` (``cache_result`` y el conteo de la paginación)."""
+
+    def setUp(self):
+        self.reset_caches()
+        self.calls = []
+
+    def compute(self, value='fresh'):
+        def func():
+            self.calls.append(value)
+            return value
+        return func
+
+    def test_negative_caching(self):
+        for _ in range(2):
+            self.assertIsNone(get_or_compute('test:negative', self.compute(None), negative_timeout=30))
+        self.assertEqual(len(self.calls), 1)
+        # Sin negative_timeout, None no se guarda
+        for _ in range(2):
+            get_or_compute('test:not-cached', self.compute(None))
+        self.assertEqual(len(self.calls), 3)
+
+    def test_serves_stale_while_another_process_recomputes(self):
+        caches['default'].set('test:stale', CachedResult('stale', 0.1, time.time() - 1), 60)
+        lock = caches['default'].lock('test:stale:lock', timeout=10)
+        self.assertTrue(lock.acquire(blocking=False))
+        try:
+            self.assertEqual(get_or_compute('test:stale', self.compute(), stale_timeout=60, beta=0), 'stale')
+            self.assertEqual(self.calls, [])
+        finally:
+            lock.release()
+        # Sin nadie recalculando, la recalcula esta petición
+        self.assertEqual(get_or_compute('test:stale', self.compute(), stale_timeout=60, beta=0), 'fresh')
+
+    def test_miss_waits_for_the_lock_holder(self):
+        lock = caches['default'].lock('test:miss:lock', timeout=10)
+        self.assertTrue(lock.acquire(blocking=False))
+        results = []
+        waiter = threading.Thread(
+            target=lambda: results.append(get_or_compute('test:miss', self.compute('waiter'), beta=0))
+        )
+        waiter.start()
+        time.sleep(0.2)
+        # Quien tiene el lock deja el valor en la caché y lo suelta
+        caches['default'].set('test:miss', new_entry('holder', time.time(), 60), 60)
+        lock.release()
+        waiter.join(5)
+        self.assertEqual(results, ['holder'])
+        self.assertEqual(self.calls, [])
+
+    def test_page_count(self):
+        with mock.patch('core.pagination.get_or_compute', wraps=get_or_compute) as compute:
+            self.assertQueryBudget('/api/posts/', PostListQueryBudgetTests.FRAGMENT_QUERIES)
+        self.assertTrue(compute.call_args.args[0].startswith('count:'))
+
+
+class ReplicaRefillTests(QueryBudgetTestCase):
+    """Lo que se cachea justo después de una invalidación no puede salir de una réplica atrasada."""
+
+    def setUp(self):
+        self.reset_caches()
+
+    def read_aliases(self, url):
+        """Alias que elige el router para las lecturas de GET ``url``, con una réplica sana."""
+        aliases = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            aliases.append(db_for_read(router, model, **hints))
+            # En los tests no hay réplica: la consulta va igualmente al primario
+            return 'default'
+
+        with mock.patch('core.db_router.get_healthy_replicas', return_value=['replica1']), \
+                mock.patch.object(ReplicaRouter, 'db_for_read', spy):
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+        return aliases
+
+    def test_refill_after_write_reads_from_primary(self):
+        urls = ['/api/posts/', f'/api/posts/{self.post.pk}/', '/api/categories/']
+        with override_settings(REPLICA_ROUTING={'MAX_LAG_SECONDS': 0, 'LAG_CHECK_INTERVAL': 0}):
+            for url in urls:
+                self.read_aliases(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = 'Título nuevo'
+            self.post.save()
+            self.category.name = 'Categoría nueva'
+            self.category.save()
+        # Versiones recién creadas: una réplica puede no tener todavía la escritura
+        for url in urls:
+            self.assertNotIn('replica1', self.read_aliases(url), url)
+
+    def test_reads_go_to_replica_outside_the_lag_window(self):
+        with override_settings(REPLICA_ROUTING={'MAX_LAG_SECONDS': 0, 'LAG_CHECK_INTERVAL': 0}):
+            self.assertIn('replica1', self.read_aliases('/api/posts/'))
+
+
+class InstrumentationTests(QueryBudgetTestCase):
+
+    @override_settings(PERFORMANCE_INSTRUMENTATION={'SAMPLE_RATE': 1.0, 'SERVER_TIMING': True})
+    def test_fragment_io_is_not_serialization(self):
+        self.reset_caches()
+        get_many = caches['default'].get_many
+
+        def slow_get_many(*args, **kwargs):
+            time.sleep(0.1)
+            return get_many(*args, **kwargs)
+
+        with mock.patch.object(caches['default'], 'get_many', side_effect=slow_get_many):
+            response = self.client.get('/api/posts/')
+        timings = dict(re.findall(r'(\w+);dur=([\d.]+)', response['Server-Timing']))
+        # El MGET de los fragmentos cuenta en Redis, no en la serialización
+        self.assertLess(float(timings['serialize']), 100)
+        self.assertGreaterEqual(float(timings['total']), 100)
+
+
+class ViewCounterTests(QueryBudgetTestCase):
+
+    def test_flush_recovers_abandoned_processing_keys(self):
+        self.reset_caches()
+        redis = get_redis_connection('durable')
+        abandoned = PROCESSING_VIEWS_KEY.format(started=0, token='abandoned')
+        in_progress = PROCESSING_VIEWS_KEY.format(started=int(time.time()), token='in-progress')
+        redis.hset(abandoned, self.post.pk, 5)
+        redis.hset(in_progress, self.post.pk, 100)
+        redis.hset(PENDING_VIEWS_KEY, self.post.pk, 2)
+        views = self.post.views
+
+        self.assertEqual(flush_views(), 2)
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, views + 7)
+        self.assertFalse(redis.exists(abandoned))
+        # La de otro volcado en curso no se toca
+        self.assertEqual(int(redis.hget(in_progress, self.post.pk)), 100)
+        self.assertFalse(redis.exists(PENDING_VIEWS_KEY))
+
+    def test_flush_changes_list_etag(self):
+        self.reset_caches()
+        etag = self.client.get('/api/posts/')['ETag']
+        self.assertEqual(self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.get(f'/api/posts/{self.post.pk}/')
+        flush_views()
+        # Las views del listado han cambiado: el ETag anterior ya no vale
+        self.assertEqual(self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(CACHES=isolated_caches())
+class BulkSeedTests(TransactionTestCase):
+    """``seed_blog --bulk``; con varios workers los procesos hijos hacen commit por su cuenta."""
+
+    def test_bulk_seed_with_workers(self):
+        # La salida a un fichero: las opciones del comando no se pueden serializar
+        with tempfile.TemporaryFile(mode='w+') as output:
+            call_command(
+                'seed_blog', categories=2, authors=2, posts=40, bulk=True, workers=2,
+                batch_size=10, skip_search_vectors=True, stdout=output,
+            )
+        self.assertEqual(Post.objects.count(), 40)
@@ -0,0 +1,26 @@
+"""
+Datos derivados del cuerpo de un post que se guardan desnormalizados en
+``Post`` (excerpt, número de palabras y tiempo de lectura), para que los
+listados no tengan que cargar el ``body`` completo.
+"""
+import math
+
+EXCERPT_LENGTH = 150
+WORDS_PER_MINUTE = 200
+
+TEXT_STATS_FIELDS = ('excerpt', 'word_count', 'reading_time')
+
+
+def make_excerpt(body):
+    return body[:EXCERPT_LENGTH] + '...' if len(body) > EXCERPT_LENGTH else body
+
+
+def text_stats(body):
+    """Valores de ``TEXT_STATS_FIELDS`` para ``body``."""
+    word_count = len(body.split())
+    return {
+        'excerpt': make_excerpt(body),
+        'word_count': word_count,
+        # Minutos redondeados hacia arriba; 0 solo para un cuerpo vacío
+        'reading_time': math.ceil(word_count / WORDS_PER_MINUTE),
+    }
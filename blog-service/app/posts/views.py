@@ -1,46 +1,146 @@
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
 from django.shortcuts import get_object_or_404
-from django.db import models
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
+from django_filters.rest_framework import DjangoFilterBackend
+from core.filters import FullTextSearchFilter
+from core.instrumentation import timed_serialization
+from core.mixins import CacheMixin, ConditionalGetMixin, TimedSerializationMixin
+from core.pagination import KeysetPagination
 from .models import Post
+from .cache import (
+    fragment_projection, get_cached_detail, get_detail_version, get_list_fragments, set_cached_detail,
+)
+from .counters import VIEWS_NAMESPACE, increment_views
+from .fast_serialization import list_projection, serialize_list, serialize_list_row
 from .serializers import PostListSerializer, PostDetailSerializer
 
 
-class PostViewSet(viewsets.ReadOnlyModelViewSet):
+def detail_validators(data, version):
+    """ETag (id y versión del post) y Last-Modified (``updated_at``) del detalle."""
+    return f'W/"{data["id"]}-{version}"', int(parse_datetime(data['updated_at']).timestamp())
+
+
+class PostViewSet(ConditionalGetMixin, CacheMixin, TimedSerializationMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet para listar y obtener posts.
-    Cacheo en detalle: 60 segundos
+    Cacheo en listado: 10 minutos (las views mostradas pueden ir con retraso)
+    Cacheo en detalle: 1 hora, invalidado al guardar
     """
-    queryset = Post.objects.filter(status='published').select_related('author', 'category')
+    queryset = (
+        Post.objects.filter(status='published')
+        .select_related('author', 'category')
+        .defer('search_vector')
+    )
     permission_classes = [AllowAny]
-    search_fields = ['title', 'body']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
+    search_vector_field = 'search_vector'
     filterset_fields = ['category', 'author']
+    cache_timeout = 60 * 10
+    cache_actions = ['list']
+    cache_namespaces = ['posts', 'categories', 'authors']
+    # El detalle calcula sus propios validadores en retrieve()
+    conditional_actions = ['list']
+    # Cada volcado de views cambia el ETag del listado; la página cacheada
+    # se sigue sirviendo hasta cache_timeout
+    validator_namespaces = [VIEWS_NAMESPACE]
+    # El detalle se cachea por id: solo ids numéricos, normalizados en retrieve()
+    lookup_value_regex = r'\d+'
+    fast_list_serialization = settings.FAST_LIST_SERIALIZATION
+    list_fragment_cache = settings.LIST_FRAGMENT_CACHE
+
+    @property
+    def paginator(self):
+        """
+        Paginación por keyset con ``?pagination=cursor`` (o al seguir un
+        enlace con ``cursor``); por número de página en otro caso.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params:
+                self._paginator = KeysetPagination()
+        return super().paginator
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # El listado usa el excerpt guardado: no hace falta leer el body
+            queryset = queryset.defer('body')
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return PostDetailSerializer
         return PostListSerializer
 
-    @method_decorator(cache_page(60))
+    def list(self, request, *args, **kwargs):
+        """
+        Con ``LIST_FRAGMENT_CACHE`` la página solo consulta ids y el resto
+        sale de los fragmentos cacheados de cada post (``posts.cache``), así
+        que se reutilizan entre páginas, filtros y búsquedas.
+
+        Con ``FAST_LIST_SERIALIZATION`` el listado se serializa desde una
+        proyección ``.values()`` (``posts.fast_serialization``) en lugar de
+        con ``PostListSerializer``. En ambos casos el JSON es el mismo.
+        """
+        if self.list_fragment_cache:
+            queryset = fragment_projection(self.filter_queryset(self.get_queryset()))
+            page = self.paginate_queryset(queryset)
+            rows = list(page if page is not None else queryset)
+            results = get_list_fragments(rows, self.serialize_fragments)
+            if page is not None:
+                return self.get_paginated_response(results)
+            return Response(results)
+
+        if not self.fast_list_serialization:
+            return super().list(request, *args, **kwargs)
+
+        queryset = list_projection(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        rows = list(page if page is not None else queryset)
+        with timed_serialization():
+            data = serialize_list(rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def serialize_fragments(self, ids):
+        """
+        Fragmentos del listado de los posts ``ids`` que no estaban en caché.
+        Solo se mide como serialización la construcción de los fragmentos, no
+        la consulta ni la lectura de la caché.
+        """
+        rows = list(list_projection(self.get_queryset().filter(pk__in=ids)))
+        with timed_serialization():
+            return {row['id']: serialize_list_row(row) for row in rows}
+
     def retrieve(self, request, *args, **kwargs):
-        """Obtener detalle de un post con incremento de views"""
-        instance = self.get_object()
-        instance.views += 1
-        instance.save(update_fields=['views'])
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        """
+        Obtener detalle de un post con incremento de views.
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                models.Q(title__icontains=search) | 
-                models.Q(body__icontains=search)
-            )
-        return queryset
+        Solo se cachea el payload serializado, por id y versión del post; el
+        conteo de views y las cabeceras condicionales se resuelven en cada
+        petición, haya o no acierto de caché.
+        """
+        # Con el id canónico: /api/posts/01/ comparte caché e invalidación con /api/posts/1/
+        pk = int(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        version = get_detail_version(pk)
+        data = get_cached_detail(pk, version)
+        if data is None:
+            data = self.serialized_data(self.get_serializer(self.get_object()))
+            set_cached_detail(pk, version, data)
+
+        data = dict(data)
+        data['views'] += increment_views(data['id'])
+
+        response = Response(data)
+        etag, last_modified = detail_validators(data, version)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
 
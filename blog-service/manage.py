@@ -4,6 +4,8 @@ import sys
 # Agregar el directorio app al path para que Django pueda encontrar los módulos
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, os.path.join(BASE_DIR, 'app'))
+# Código común a los servicios (shared/service_core); en Docker, /shared
+sys.path.append(os.path.join(os.path.dirname(BASE_DIR), 'shared'))
 
 
 def main():
@@ -0,0 +1,345 @@
+"""
+Comprobación de las dependencias del servicio (Postgres y Redis).
+
+Sin argumentos comprueba la conexión y mide, con N clientes concurrentes:
+
+- Postgres: tiempo de conexión y latencia de ``SELECT 1``.
+- Redis (``REDIS_HOST`` y, si existe, ``REDIS_CACHE_HOST``): tiempo de
+  conexión, latencia de ``PING``/``GET``/``SET`` y throughput de ``GET`` con y
+  sin pipeline.
+- Capacidad: ops/s máximas subiendo los clientes (1, 2, 4...) mientras el p99
+  siga por debajo de ``--max-p99-ms``.
+
+Sale con código 1 si alguna conexión falla o se supera un umbral, así que
+sirve como control antes de desplegar:
+
+	python test_connection.py --quick
+	python test_connection.py --clients 16 --max-p99-ms 20 --json probe.json
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+def _get_env_int(name, default):
+	try:
+		return int(os.getenv(name, default))
+	except Exception:
+		return int(default)
+
+def try_import(name, install_hint):
+	try:
+		module = __import__(name)
+		return module
+	except ImportError:
+		print(f"Missing dependency '{name}'. Install with: {install_hint}", file=sys.stderr)
+		return None
+
+def percentile(ordered, quantile):
+	"""Percentil por rango más cercano de una lista ordenada."""
+	if not ordered:
+		return 0.0
+	index = min(len(ordered) - 1, max(0, int(round(quantile * len(ordered))) - 1))
+	return ordered[index]
+
+def summarize(latencies, elapsed, errors=0, ops_per_call=1):
+	"""Resumen de latencias (en ms) de una medida de ``elapsed`` segundos."""
+	ordered = sorted(latencies)
+	return {
+		'calls': len(ordered),
+		'errors': errors,
+		'ops_per_sec': round(len(ordered) * ops_per_call / elapsed, 1) if elapsed else 0.0,
+		'p50_ms': round(percentile(ordered, 0.50), 3),
+		'p99_ms': round(percentile(ordered, 0.99), 3),
+		'max_ms': round(ordered[-1], 3) if ordered else 0.0,
+	}
+
+def format_summary(name, stats):
+	line = (f"  {name:<22} p50={stats['p50_ms']:.3f}ms p99={stats['p99_ms']:.3f}ms "
+			f"max={stats['max_ms']:.3f}ms ops/s={stats['ops_per_sec']:.0f}")
+	if stats.get('errors'):
+		line += f" errores={stats['errors']}"
+	return line
+
+def run_concurrent(connect, operation, clients, duration, ops_per_call=1):
+	"""
+	``clients`` hilos, cada uno con su propia conexión (``connect()``),
+	repitiendo ``operation(conn)`` durante ``duration`` segundos. La medida
+	empieza cuando todos están conectados.
+	"""
+	latencies = []
+	errors = [0]
+	lock = threading.Lock()
+	clock = {}
+
+	def start():
+		clock['started'] = time.perf_counter()
+		clock['deadline'] = clock['started'] + duration
+
+	ready = threading.Barrier(clients + 1, action=start)
+
+	def client():
+		own, own_errors = [], 0
+		try:
+			conn = connect()
+		except Exception:
+			conn = None
+		try:
+			ready.wait()
+			if conn is None:
+				with lock:
+					errors[0] += 1
+				return
+			while time.perf_counter() < clock['deadline']:
+				started = time.perf_counter()
+				try:
+					operation(conn)
+					own.append((time.perf_counter() - started) * 1000)
+				except Exception:
+					own_errors += 1
+		finally:
+			if conn is not None:
+				try:
+					conn.close()
+				except Exception:
+					pass
+			with lock:
+				latencies.extend(own)
+				errors[0] += own_errors
+
+	threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+	for thread in threads:
+		thread.start()
+	ready.wait()
+	for thread in threads:
+		thread.join()
+	return summarize(latencies, time.perf_counter() - clock['started'], errors[0], ops_per_call)
+
+def measure_connect(connect, samples):
+	"""Tiempo de abrir una conexión nueva (y hacer la primera petición)."""
+	latencies = []
+	errors = 0
+	started = time.perf_counter()
+	for _ in range(samples):
+		begin = time.perf_counter()
+		try:
+			conn = connect()
+			latencies.append((time.perf_counter() - begin) * 1000)
+			conn.close()
+		except Exception:
+			errors += 1
+	return summarize(latencies, time.perf_counter() - started, errors)
+
+def find_capacity(connect, operation, max_clients, duration, max_p99_ms):
+	"""
+	Sube los clientes (1, 2, 4... hasta ``max_clients``) y devuelve el paso
+	con más ops/s cuyo p99 no supera ``max_p99_ms`` (sin límite si es 0).
+	Para al saturarse: cuando doblar los clientes no añade un 5 % de ops/s.
+	"""
+	steps = []
+	best = None
+	clients = 1
+	while clients <= max_clients:
+		stats = run_concurrent(connect, operation, clients, duration)
+		stats['clients'] = clients
+		steps.append(stats)
+		within_limit = not max_p99_ms or stats['p99_ms'] <= max_p99_ms
+		if within_limit and not stats['errors'] and (best is None or stats['ops_per_sec'] > best['ops_per_sec']):
+			best = stats
+		if not within_limit or (len(steps) > 1 and stats['ops_per_sec'] < steps[-2]['ops_per_sec'] * 1.05):
+			break
+		clients *= 2
+	return {
+		'max_ops_per_sec': best['ops_per_sec'] if best else 0.0,
+		'clients': best['clients'] if best else 0,
+		'steps': steps,
+	}
+
+def check_thresholds(name, stats, args, failures):
+	if args.max_p99_ms and stats['p99_ms'] > args.max_p99_ms:
+		failures.append(f"{name}: p99 {stats['p99_ms']:.3f}ms > {args.max_p99_ms}ms")
+	if stats['errors']:
+		failures.append(f"{name}: {stats['errors']} errores")
+
+def test_postgres(args, report, failures):
+	psycopg2 = try_import('psycopg2', 'pip install psycopg2-binary')
+	if not psycopg2:
+		return False
+
+	host = os.getenv('DB_HOST', 'localhost')
+	port = _get_env_int('DB_PORT', '5432')
+	db = os.getenv('DB_NAME', 'main_db')
+	user = os.getenv('DB_USER', 'devuser')
+	password = os.getenv('DB_PASS', 'devpass')
+	timeout = _get_env_int('POSTGRES_TIMEOUT', '5')
+
+	def connect():
+		conn = psycopg2.connect(host=host, port=port, dbname=db, user=user, password=password, connect_timeout=timeout)
+		conn.autocommit = True
+		return conn
+
+	try:
+		connect().close()
+		print(f"Postgres ({host}:{port}/{db}) - TODO BIEN")
+	except Exception as e:
+		print(f"Postgres ({host}:{port}/{db}) - FALLO: {e}")
+		failures.append(f"postgres: {e}")
+		return False
+	if args.quick:
+		return True
+
+	def select_one(conn):
+		with conn.cursor() as cursor:
+			cursor.execute('SELECT 1')
+			cursor.fetchone()
+
+	result = report['postgres'] = {
+		'connect': measure_connect(connect, args.connect_samples),
+		'select_1': run_concurrent(connect, select_one, args.clients, args.duration),
+	}
+	print(format_summary('connect', result['connect']))
+	print(format_summary(f"SELECT 1 x{args.clients}", result['select_1']))
+	check_thresholds('postgres SELECT 1', result['select_1'], args, failures)
+
+	if args.max_clients:
+		result['capacity'] = find_capacity(connect, select_one, args.max_clients, args.duration, args.max_p99_ms)
+		print(f"  {'capacidad SELECT 1':<22} {result['capacity']['max_ops_per_sec']:.0f} ops/s "
+			f"con {result['capacity']['clients']} clientes")
+	return True
+
+def redis_targets():
+	"""Redis duradero y, si es otra instancia, la caché LRU (``REDIS_CACHE_HOST``)."""
+	durable = (os.getenv('REDIS_HOST', 'localhost'), _get_env_int('REDIS_PORT', '6379'))
+	targets = [('redis', durable)]
+	cache = (os.getenv('REDIS_CACHE_HOST', durable[0]), _get_env_int('REDIS_CACHE_PORT', str(durable[1])))
+	if cache != durable:
+		targets.append(('redis_cache', cache))
+	return targets
+
+def test_redis(name, address, args, report, failures):
+	redis_mod = try_import('redis', 'pip install redis')
+	if not redis_mod:
+		return False
+
+	host, port = address
+	db = _get_env_int('REDIS_DB', '0')
+	password = os.getenv('REDIS_PASSWORD', None) or None
+	timeout = _get_env_int('REDIS_TIMEOUT', '5')
+
+	def connect():
+		client = redis_mod.Redis(
+			host=host, port=port, db=db, password=password,
+			socket_connect_timeout=timeout, socket_timeout=timeout,
+		)
+		client.ping()
+		return client
+
+	try:
+		connect().close()
+		print(f"Redis ({host}:{port}/{db}) - TODO BIEN")
+	except Exception as e:
+		print(f"Redis ({host}:{port}/{db}) - FALLO: {e}")
+		failures.append(f"{name}: {e}")
+		return False
+	if args.quick:
+		return True
+
+	# Claves propias con TTL: la prueba no pisa datos y no deja restos
+	key = f"probe:{uuid.uuid4().hex}"
+	value = b'x' * args.value_size
+	setup = connect()
+	setup.set(key, value, ex=60)
+	setup.close()
+
+	def pipelined_get(client):
+		pipe = client.pipeline(transaction=False)
+		for _ in range(args.pipeline_size):
+			pipe.get(key)
+		pipe.execute()
+
+	result = report[name] = {
+		'connect': measure_connect(connect, args.connect_samples),
+		'ping': run_concurrent(connect, lambda client: client.ping(), args.clients, args.duration),
+		'get': run_concurrent(connect, lambda client: client.get(key), args.clients, args.duration),
+		'set': run_concurrent(connect, lambda client: client.set(key, value, ex=60), args.clients, args.duration),
+		'pipelined_get': run_concurrent(connect, pipelined_get, args.clients, args.duration,
+										ops_per_call=args.pipeline_size),
+	}
+	print(format_summary('connect', result['connect']))
+	for op in ('ping', 'get', 'set'):
+		print(format_summary(f"{op.upper()} x{args.clients}", result[op]))
+		check_thresholds(f"{name} {op.upper()}", result[op], args, failures)
+	print(format_summary(f"GET pipeline({args.pipeline_size})", result['pipelined_get']))
+	if result['get']['ops_per_sec']:
+		speedup = result['pipelined_get']['ops_per_sec'] / result['get']['ops_per_sec']
+		result['pipeline_speedup'] = round(speedup, 1)
+		print(f"  {'pipeline vs sin pipeline':<22} x{speedup:.1f} ops/s")
+
+	if args.max_clients:
+		result['capacity'] = find_capacity(
+			connect, lambda client: client.get(key), args.max_clients, args.duration, args.max_p99_ms
+		)
+		print(f"  {'capacidad GET':<22} {result['capacity']['max_ops_per_sec']:.0f} ops/s "
+			f"con {result['capacity']['clients']} clientes")
+
+	cleanup = connect()
+	cleanup.delete(key)
+	cleanup.close()
+	return True
+
+def parse_args(argv=None):
+	parser = argparse.ArgumentParser(description='Conexión, latencia y capacidad de Postgres y Redis.')
+	parser.add_argument('--quick', action='store_true',
+						help='solo comprobar que las conexiones funcionan')
+	parser.add_argument('--clients', type=int, default=_get_env_int('PROBE_CLIENTS', '8'),
+						help='clientes concurrentes en las medidas de latencia (por defecto: 8)')
+	parser.add_argument('--duration', type=float, default=2.0,
+						help='segundos de cada medida (por defecto: 2)')
+	parser.add_argument('--connect-samples', type=int, default=20,
+						help='conexiones nuevas para medir el tiempo de conexión (por defecto: 20)')
+	parser.add_argument('--pipeline-size', type=int, default=50,
+						help='comandos por pipeline de Redis (por defecto: 50)')
+	parser.add_argument('--value-size', type=int, default=1024,
+						help='bytes del valor de GET/SET (por defecto: 1024)')
+	parser.add_argument('--max-clients', type=int, default=32,
+						help='clientes máximos al buscar la capacidad; 0 para no buscarla (por defecto: 32)')
+	parser.add_argument('--max-p99-ms', type=float, default=float(os.getenv('PROBE_MAX_P99_MS', '0')),
+						help='falla si el p99 de una operación lo supera; también limita la capacidad (0 = sin límite)')
+	parser.add_argument('--min-ops', type=float, default=0,
+						help='falla si la capacidad de alguna dependencia no llega a estas ops/s')
+	parser.add_argument('--json', metavar='FICHERO',
+						help='guardar las medidas en JSON')
+	return parser.parse_args(argv)
+
+def main():
+	args = parse_args()
+	report = {}
+	failures = []
+
+	pg_ok = test_postgres(args, report, failures)
+	rd_ok = all([test_redis(name, address, args, report, failures) for name, address in redis_targets()])
+
+	if args.min_ops:
+		for name, result in report.items():
+			capacity = result.get('capacity')
+			if capacity and capacity['max_ops_per_sec'] < args.min_ops:
+				failures.append(f"{name}: {capacity['max_ops_per_sec']:.0f} ops/s < {args.min_ops:.0f}")
+
+	if args.json:
+		with open(args.json, 'w') as f:
+			json.dump({'ok': not failures, 'failures': failures, 'results': report}, f, indent=2)
+
+	if pg_ok and rd_ok and not failures:
+		print("Todos los controles pasaron.")
+		sys.exit(0)
+	else:
+		for failure in failures:
+			print(f"  - {failure}")
+		print("Una o más comprobaciones fallaron.")
+		sys.exit(1)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,6 @@
+"""
+Código común a auth-service y blog-service.
+
+Cada imagen lo copia en ``/shared`` (en el ``PYTHONPATH``); un cambio aquí
+llega a los dos servicios en su siguiente build.
+"""
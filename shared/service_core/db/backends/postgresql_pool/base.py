@@ -0,0 +1,198 @@
+"""
+Backend PostgreSQL con pool de conexiones en el proceso.
+
+Igual que ``django.db.backends.postgresql``, pero al cerrar la conexión al
+final de cada petición no se corta la sesión con Postgres: la conexión vuelve
+a un pool del proceso y la siguiente petición (de cualquier hilo) la reutiliza
+sin repetir el handshake TCP y la autenticación.
+
+Configuración en ``DATABASES``::
+
+    'ENGINE': 'service_core.db.backends.postgresql_pool',
+    'CONN_MAX_AGE': 0,  # el pool es quien mantiene las conexiones
+    'POOL': {
+        'MAX_SIZE': 4,                # conexiones por worker (= hilos de gunicorn)
+        'TIMEOUT': 10,                # segundos esperando una conexión libre
+        'MAX_LIFETIME': 1800,         # se recicla la conexión pasado este tiempo
+        'HEALTH_CHECK_INTERVAL': 30,  # SELECT 1 si lleva más de esto ociosa
+    }
+"""
+import os
+import threading
+import time
+from collections import deque
+from functools import partial
+
+from django.db.backends.postgresql import base
+
+Database = base.Database
+
+POOL_DEFAULTS = {
+    'MAX_SIZE': 4,
+    'TIMEOUT': 10,
+    'MAX_LIFETIME': 30 * 60,
+    'HEALTH_CHECK_INTERVAL': 30,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones psycopg. Un semáforo limita las conexiones
+    abiertas a ``MAX_SIZE``; las ociosas se reparten en orden LIFO para que,
+    con poca carga, se reutilicen siempre las mismas y el resto caduque.
+    """
+
+    def __init__(self, options):
+        self.max_size = options['MAX_SIZE']
+        self.timeout = options['TIMEOUT']
+        self.max_lifetime = options['MAX_LIFETIME']
+        self.health_check_interval = options['HEALTH_CHECK_INTERVAL']
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        self._idle = deque()
+        self._created_at = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'in_use': 0,
+            'checkouts': 0,
+            'connections_created': 0,
+            'reconnects': 0,
+            'recycled': 0,
+            'timeouts': 0,
+            'wait_total_ms': 0.0,
+            'wait_max_ms': 0.0,
+        }
+
+    def acquire(self, connect):
+        """
+        Devuelve una conexión ociosa sana o abre una nueva con ``connect()``.
+        Si todas están ocupadas espera hasta ``TIMEOUT`` segundos.
+        """
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise Database.OperationalError(
+                f'Connection pool exhausted ({self.max_size} connections in use)'
+            )
+        wait_ms = (time.monotonic() - started) * 1000
+
+        try:
+            connection = self._get_idle() or self._connect(connect)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats['in_use'] += 1
+            self._stats['checkouts'] += 1
+            self._stats['wait_total_ms'] += wait_ms
+            self._stats['wait_max_ms'] = max(self._stats['wait_max_ms'], wait_ms)
+        return connection
+
+    def release(self, connection):
+        """Devuelve la conexión al pool, o la descarta si quedó inservible."""
+        try:
+            if not connection.closed:
+                status = connection.info.transaction_status
+                if status != Database.extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            if connection.closed:
+                self._discard(connection, 'reconnects')
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        except Database.Error:
+            self._discard(connection, 'reconnects')
+        finally:
+            with self._lock:
+                self._stats['in_use'] -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle'] = len(self._idle)
+        stats['max_size'] = self.max_size
+        stats['wait_avg_ms'] = round(stats['wait_total_ms'] / stats['checkouts'], 3) if stats['checkouts'] else 0.0
+        stats['wait_total_ms'] = round(stats['wait_total_ms'], 3)
+        stats['wait_max_ms'] = round(stats['wait_max_ms'], 3)
+        return stats
+
+    def _get_idle(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, idle_since = self._idle.pop()
+
+            if connection.closed:
+                self._discard(connection, 'reconnects')
+            elif now - self._created_at.get(id(connection), now) > self.max_lifetime:
+                self._discard(connection, 'recycled')
+            elif now - idle_since > self.health_check_interval and not self._is_usable(connection):
+                self._discard(connection, 'reconnects')
+            else:
+                return connection
+
+    def _connect(self, connect):
+        connection = connect()
+        with self._lock:
+            self._created_at[id(connection)] = time.monotonic()
+            self._stats['connections_created'] += 1
+        return connection
+
+    def _discard(self, connection, reason):
+        try:
+            connection.close()
+        except Database.Error:
+            pass
+        with self._lock:
+            self._created_at.pop(id(connection), None)
+            self._stats[reason] += 1
+
+    @staticmethod
+    def _is_usable(connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except Database.Error:
+            return False
+
+
+def get_pool(settings_dict):
+    """
+    Pool del proceso para la base de datos de ``settings_dict``. La clave
+    incluye el pid para no heredar conexiones del proceso padre tras un fork.
+    """
+    key = (
+        os.getpid(), settings_dict['HOST'], settings_dict['PORT'],
+        settings_dict['NAME'], settings_dict['USER'],
+    )
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool({**POOL_DEFAULTS, **settings_dict.get('POOL', {})})
+                _pools[key] = pool
+    return pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        return get_pool(self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        return self.pool.acquire(partial(super().get_new_connection, conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection)
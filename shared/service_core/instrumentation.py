@@ -0,0 +1,321 @@
+"""
+Núcleo de la instrumentación por petición de los servicios.
+
+``sample_request`` activa, durante una petición muestreada, un
+``RequestMetrics`` en un ``ContextVar`` donde suman:
+
+- SQL: número de consultas y tiempo, con ``connection.execute_wrapper`` (y
+  ``instrument_async_connections`` para las conexiones del ORM async).
+- Redis: llamadas, tiempo y aciertos/fallos de GET/MGET, con los clientes
+  ``InstrumentedRedis`` e ``InstrumentedAsyncRedis``.
+- Bloques medidos con ``timed``, como ``timed_serialization``.
+
+Cada servicio tiene su módulo ``instrumentation`` con un ``RequestMetrics``
+propio (subclase de este, con sus campos) y su ``PerformanceMiddleware``; el
+histograma de latencias por vista (``histograms``) y el log ``performance``
+son de aquí.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from redis.asyncio.client import Pipeline as AsyncPipeline, Redis as AsyncRedis
+from redis.client import Pipeline, Redis
+
+logger = logging.getLogger('performance')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0,
+    'SERVER_TIMING': True,
+    'LOG': True,
+}
+
+# Límite superior (ms) de cada bucket del histograma; el último es +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def instrumentation_settings():
+    return {**DEFAULTS, **getattr(settings, 'PERFORMANCE_INSTRUMENTATION', {})}
+
+
+class RequestMetrics:
+    """Contadores de una petición muestreada."""
+
+    __slots__ = (
+        'db_queries', 'db_ms', 'redis_calls', 'redis_ms',
+        'cache_hits', 'cache_misses', 'serialize_ms',
+    )
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.redis_calls = 0
+        self.redis_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serialize_ms = 0.0
+
+    def timing_entries(self):
+        """Entradas de ``Server-Timing``; las subclases añaden las suyas."""
+        return [
+            f'db;dur={self.db_ms:.2f};desc="{self.db_queries} queries"',
+            f'redis;dur={self.redis_ms:.2f};desc="{self.redis_calls} calls, '
+            f'{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'serialize;dur={self.serialize_ms:.2f}',
+        ]
+
+    def server_timing(self, total_ms):
+        return ', '.join([*self.timing_entries(), f'total;dur={total_ms:.2f}'])
+
+    def log_fields(self):
+        return {
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_ms, 2),
+            'redis_calls': self.redis_calls,
+            'redis_ms': round(self.redis_ms, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'serialize_ms': round(self.serialize_ms, 2),
+        }
+
+
+def current_metrics():
+    """Métricas de la petición en curso, o None si no se está muestreando."""
+    return _current.get()
+
+
+@contextmanager
+def timed(field):
+    """Suma lo que tarde el bloque (en ms) al campo ``field`` de las métricas de la petición."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, field, getattr(metrics, field) + (time.perf_counter() - started) * 1000)
+
+
+def timed_serialization():
+    """Suma al tiempo de serialización de la petición lo que tarde el bloque."""
+    return timed('serialize_ms')
+
+
+def _query_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_ms += (time.perf_counter() - started) * 1000
+
+
+def _count_reads(metrics, command, result):
+    """Aciertos y fallos de caché: solo GET y MGET leen entradas de caché."""
+    if isinstance(command, bytes):
+        command = command.decode()
+    command = str(command).upper()
+    if command == 'GET':
+        if result is None:
+            metrics.cache_misses += 1
+        elif not isinstance(result, Exception):
+            metrics.cache_hits += 1
+    elif command == 'MGET' and isinstance(result, list):
+        hits = sum(1 for value in result if value is not None)
+        metrics.cache_hits += hits
+        metrics.cache_misses += len(result) - hits
+
+
+class InstrumentedRedis(Redis):
+    """Cliente de redis-py que suma llamadas, tiempo y aciertos a la petición."""
+
+    def execute_command(self, *args, **options):
+        metrics = _current.get()
+        if metrics is None:
+            return super().execute_command(*args, **options)
+        started = time.perf_counter()
+        try:
+            result = super().execute_command(*args, **options)
+        finally:
+            metrics.redis_calls += 1
+            metrics.redis_ms += (time.perf_counter() - started) * 1000
+        _count_reads(metrics, args[0], result)
+        return result
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedPipeline(Pipeline):
+    """Un pipeline cuenta como una sola llamada (un viaje a Redis)."""
+
+    def execute(self, raise_on_error=True):
+        metrics = _current.get()
+        if metrics is None:
+            return super().execute(raise_on_error)
+        commands = [args[0] for args, _ in self.command_stack]
+        started = time.perf_counter()
+        try:
+            results = super().execute(raise_on_error)
+        finally:
+            metrics.redis_calls += 1
+            metrics.redis_ms += (time.perf_counter() - started) * 1000
+        for command, result in zip(commands, results):
+            _count_reads(metrics, command, result)
+        return results
+
+
+class InstrumentedAsyncRedis(AsyncRedis):
+    """``InstrumentedRedis`` para ``redis.asyncio``."""
+
+    async def execute_command(self, *args, **options):
+        metrics = _current.get()
+        if metrics is None:
+            return await super().execute_command(*args, **options)
+        started = time.perf_counter()
+        try:
+            result = await super().execute_command(*args, **options)
+        finally:
+            metrics.redis_calls += 1
+            metrics.redis_ms += (time.perf_counter() - started) * 1000
+        _count_reads(metrics, args[0], result)
+        return result
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedAsyncPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedAsyncPipeline(AsyncPipeline):
+
+    async def execute(self, raise_on_error=True):
+        metrics = _current.get()
+        if metrics is None:
+            return await super().execute(raise_on_error)
+        commands = [args[0] for args, _ in self.command_stack]
+        started = time.perf_counter()
+        try:
+            results = await super().execute(raise_on_error)
+        finally:
+            metrics.redis_calls += 1
+            metrics.redis_ms += (time.perf_counter() - started) * 1000
+        for command, result in zip(commands, results):
+            _count_reads(metrics, command, result)
+        return results
+
+
+def _install_query_wrapper(sender, connection, **kwargs):
+    if _query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_query_wrapper)
+
+
+def instrument_async_connections():
+    """
+    Instala ``_query_wrapper`` en cada conexión nueva a la base de datos.
+
+    Con ASGI, el ORM async ejecuta las consultas en hilos con sus propias
+    conexiones, donde ``sample_request`` no llega; el contexto (y con él las
+    métricas de la petición) sí pasa a esos hilos.
+    """
+    connection_created.connect(_install_query_wrapper, dispatch_uid='instrument_async_connections')
+
+
+class LatencyHistograms:
+    """Histogramas de latencia por vista, acumulados en memoria del proceso."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view, duration_ms):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if duration_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = {
+                    'count': 0, 'sum_ms': 0.0, 'max_ms': 0.0,
+                    'buckets': [0] * (len(self.buckets) + 1),
+                }
+            stats['count'] += 1
+            stats['sum_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+            stats['buckets'][index] += 1
+
+    def _percentile(self, stats, quantile):
+        """Límite superior del bucket donde cae el percentil (o el máximo)."""
+        target = quantile * stats['count']
+        cumulative = 0
+        for bound, count in zip(self.buckets, stats['buckets']):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, round(stats['max_ms'], 2))
+        return round(stats['max_ms'], 2)
+
+    def snapshot(self):
+        with self._lock:
+            views = {view: {**stats, 'buckets': list(stats['buckets'])} for view, stats in self._views.items()}
+        labels = [f'le_{bound}' for bound in self.buckets] + ['le_inf']
+        return {
+            view: {
+                'count': stats['count'],
+                'avg_ms': round(stats['sum_ms'] / stats['count'], 2),
+                'p50_ms': self._percentile(stats, 0.50),
+                'p95_ms': self._percentile(stats, 0.95),
+                'p99_ms': self._percentile(stats, 0.99),
+                'max_ms': round(stats['max_ms'], 2),
+                'buckets': dict(zip(labels, stats['buckets'])),
+            }
+            for view, stats in sorted(views.items())
+        }
+
+
+histograms = LatencyHistograms()
+
+
+def log_request(fields):
+    """Una línea ``request key=value ...`` por petición muestreada."""
+    logger.info('request ' + ' '.join(f'{key}={value}' for key, value in fields.items()))
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+@contextmanager
+def sample_request(metrics_class=RequestMetrics):
+    """
+    Activa la recogida de métricas detalladas durante el bloque y devuelve
+    las métricas de la petición (una instancia de ``metrics_class``).
+    """
+    metrics = metrics_class()
+    token = _current.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_query_wrapper))
+            yield metrics
+    finally:
+        _current.reset(token)